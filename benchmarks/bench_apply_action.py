@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Microbenchmark: per-joint setJointMotorControl2 loop vs vectorized setJointMotorControlArray in apply_action()"""
+
+import argparse
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+
+ENV_IDS = [
+    "InvertedPendulumBulletEnv-v0",
+    "InvertedDoublePendulumBulletEnv-v0",
+    "ReacherBulletEnv-v0",
+    "PusherBulletEnv-v0",
+    "ThrowerBulletEnv-v0",
+    "HopperBulletEnv-v0",
+    "Walker2DBulletEnv-v0",
+    "HalfCheetahBulletEnv-v0",
+    "AntBulletEnv-v0",
+    "HumanoidBulletEnv-v0",
+]
+
+
+def per_joint_apply_action(robot, a):
+    """The action path before vectorization: one clip and one pybullet call per joint"""
+    assert np.isfinite(a).all()
+    for joint, gain, x in zip(robot.motors, robot.motor_gains, a):
+        joint.set_motor_torque(gain * float(np.clip(x, -1, +1)))
+
+
+def time_per_call(fn, n_calls):
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        fn()
+    return (time.perf_counter() - start) / n_calls
+
+
+def benchmark(env_id, n_calls):
+    env = gym.make(env_id)
+    env.reset(seed=0)
+    robot = env.unwrapped.robot
+    action = env.action_space.sample()
+    # make sure the gains are computed
+    robot.apply_action(action)
+
+    per_joint = time_per_call(lambda: per_joint_apply_action(robot, action), n_calls)
+    vectorized = time_per_call(lambda: robot.apply_action(action), n_calls)
+    env.close()
+    return len(robot.motors), per_joint, vectorized
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=ENV_IDS, help="Environment ids")
+    parser.add_argument("-n", "--n-calls", type=int, default=20_000, help="Number of apply_action() calls per measure")
+    args = parser.parse_args()
+
+    print(f"{'env':38s} {'joints':>6s} {'per-joint (us)':>15s} {'vectorized (us)':>16s} {'saving (us)':>12s} {'speedup':>8s}")
+    for env_id in args.env:
+        n_joints, per_joint, vectorized = benchmark(env_id, args.n_calls)
+        print(
+            f"{env_id:38s} {n_joints:6d} {per_joint * 1e6:15.2f} {vectorized * 1e6:16.2f} "
+            f"{(per_joint - vectorized) * 1e6:12.2f} {per_joint / vectorized:7.2f}x"
+        )
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""AsyncEnvPool: throughput of step() and step_as_completed() vs a plain loop, and event loop latency"""
+
+import argparse
+import asyncio
+import time
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.envs.registration import load_env_creator
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.vector import AsyncEnvPool
+
+
+def benchmark_loop(env_id, num_envs, n_steps):
+    """
+    :return: environment steps per second of a plain Python loop over the environments
+    """
+    envs = [load_env_creator(gym.spec(env_id).entry_point)() for _ in range(num_envs)]
+    for i, env in enumerate(envs):
+        env.reset(seed=i)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, num_envs, *envs[0].action_space.shape))
+    start = time.perf_counter()
+    for t in range(n_steps):
+        for env, action in zip(envs, actions[t]):
+            env.step(action)
+    elapsed = time.perf_counter() - start
+    for env in envs:
+        env.close()
+    return n_steps * num_envs / elapsed
+
+
+def benchmark_pool(env_id, num_envs, n_steps, as_completed):
+    """
+    :return: environment steps per second, and the largest delay of a 1 ms ticker task of the event loop (ms)
+    """
+    pool = AsyncEnvPool(gym.spec(env_id).entry_point, num_envs=num_envs)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, num_envs, *pool.single_action_space.shape))
+
+    async def ticker(delays):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            delays.append(time.perf_counter() - start - 0.001)
+
+    async def run():
+        await pool.reset(seed=0)
+        delays = []
+        ticker_task = asyncio.ensure_future(ticker(delays))
+        start = time.perf_counter()
+        for t in range(n_steps):
+            if as_completed:
+                async for _ in pool.step_as_completed(actions[t]):
+                    pass
+            else:
+                await pool.step(actions[t])
+        elapsed = time.perf_counter() - start
+        ticker_task.cancel()
+        return n_steps * num_envs / elapsed, 1000 * max(delays, default=float("nan"))
+
+    result = asyncio.run(run())
+    pool.close()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=["HopperBulletEnv-v0", "HumanoidBulletEnv-v0"], help="Environment ids")
+    parser.add_argument("--num-envs", nargs="+", type=int, default=[16, 64], help="Numbers of environments")
+    parser.add_argument("-n", "--n-steps", type=int, default=50, help="Number of steps of each environment")
+    args = parser.parse_args()
+
+    print(f"{'env':24s} {'num_envs':>8s} {'loop':>8s} {'step':>8s} {'as_completed':>12s} {'max loop delay (ms)':>20s}")
+    for env_id in args.env:
+        for num_envs in args.num_envs:
+            loop_fps = benchmark_loop(env_id, num_envs, args.n_steps)
+            step_fps, _ = benchmark_pool(env_id, num_envs, args.n_steps, as_completed=False)
+            completed_fps, delay = benchmark_pool(env_id, num_envs, args.n_steps, as_completed=True)
+            print(f"{env_id:24s} {num_envs:8d} {loop_fps:8.0f} {step_fps:8.0f} {completed_fps:12.0f} {delay:20.1f}")
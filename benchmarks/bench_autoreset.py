@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Next step vs same step autoreset: useful transitions per second, and share of the vector steps spent on resets"""
+
+import argparse
+import time
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector import AutoresetMode
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.vector import BulletVectorEnv, SharedMemoryVectorEnv
+
+BACKENDS = {"bullet": BulletVectorEnv, "shared_memory": SharedMemoryVectorEnv}
+MODES = {"next_step": AutoresetMode.NEXT_STEP, "same_step": AutoresetMode.SAME_STEP}
+
+
+def benchmark(env_id, backend, mode, num_envs, n_steps, max_episode_steps):
+    """
+    :return: transitions per second (env steps with an action of the policy, not the ones that only reset),
+        and the fraction of the env steps that only reset
+    """
+    envs = BACKENDS[backend](
+        gym.spec(env_id).entry_point, num_envs=num_envs, max_episode_steps=max_episode_steps, autoreset_mode=MODES[mode]
+    )
+    envs.reset(seed=0)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, *envs.action_space.shape)).astype(np.float32)
+    autoreset = np.zeros(num_envs, dtype=bool)
+    n_resets = 0
+    start = time.perf_counter()
+    for t in range(n_steps):
+        _, _, terminations, truncations, _ = envs.step(actions[t])
+        # With next step autoreset, the envs that ended ignore the action of the next step and reset
+        n_resets += autoreset.sum()
+        if mode == "next_step":
+            np.logical_or(terminations, truncations, out=autoreset)
+    elapsed = time.perf_counter() - start
+    envs.close()
+    return (n_steps * num_envs - n_resets) / elapsed, n_resets / (n_steps * num_envs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=["HopperBulletEnv-v0", "Walker2DBulletEnv-v0"], help="Environment ids")
+    parser.add_argument("--num-envs", type=int, default=16, help="Number of environments")
+    parser.add_argument("--max-episode-steps", type=int, default=1000, help="Truncate episodes after that many steps")
+    parser.add_argument("-n", "--n-steps", type=int, default=500, help="Number of vector steps")
+    args = parser.parse_args()
+
+    print(f"{'env':24s} {'backend':>13s} {'autoreset':>9s} {'transitions/s':>13s} {'reset-only steps':>16s}")
+    for env_id in args.env:
+        for backend in BACKENDS:
+            for mode in MODES:
+                fps, reset_share = benchmark(env_id, backend, mode, args.num_envs, args.n_steps, args.max_episode_steps)
+                print(f"{env_id:24s} {backend:>13s} {mode:>9s} {fps:13.0f} {100 * reset_share:15.1f}%")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""clone_state() / restore_state() latency, and peak memory over many clones with a bounded state pool (Linux)"""
+
+import argparse
+import resource
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark(env_id, n_clones, state_pool_size, rollout_steps):
+    """
+    :return: clone and restore latencies (s), and the peak memory growth (MB) over the clones
+    """
+    env = gym.make(env_id, state_pool_size=state_pool_size).unwrapped
+    env.reset(seed=0)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(rollout_steps, *env.action_space.shape)).astype(np.float32)
+    # Fill the pool first: memory stays flat afterwards
+    root = env.clone_state()
+    for _ in range(state_pool_size - 1):
+        env.clone_state()
+    env.restore_state(root)
+    rss = max_rss_mb()
+    clone_time = restore_time = 0.0
+    for _ in range(n_clones):
+        # Expand a search tree node: save it, simulate a few steps, go back
+        start = time.perf_counter()
+        handle = env.clone_state()
+        clone_time += time.perf_counter() - start
+        for action in actions:
+            env.step(action)
+        start = time.perf_counter()
+        env.restore_state(handle)
+        restore_time += time.perf_counter() - start
+        env.restore_state(root)
+    growth = max_rss_mb() - rss
+    env.close()
+    return clone_time / n_clones, restore_time / n_clones, growth
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=["HopperBulletEnv-v0", "HumanoidBulletEnv-v0"], help="Environment ids")
+    parser.add_argument("--n-clones", type=int, default=20_000, help="Number of clones")
+    parser.add_argument("--state-pool-size", type=int, default=256, help="Saved states kept")
+    parser.add_argument("--rollout-steps", type=int, default=5, help="Steps between a clone and its restore")
+    args = parser.parse_args()
+
+    print(f"{'env':24s} {'clone (ms)':>10s} {'restore (ms)':>12s} {'memory growth (MB)':>18s}")
+    for env_id in args.env:
+        clone_time, restore_time, growth = benchmark(env_id, args.n_clones, args.state_pool_size, args.rollout_steps)
+        print(f"{env_id:24s} {1000 * clone_time:10.3f} {1000 * restore_time:12.3f} {growth:18.1f}")
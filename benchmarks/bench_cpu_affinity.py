@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""SharedMemoryVectorEnv throughput with the workers unpinned, or pinned with the compact and spread placements (Linux)"""
+
+import argparse
+import os
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.vector import SharedMemoryVectorEnv
+from pybullet_envs_gymnasium.vector.cpu_affinity import cpu_topology
+
+PLACEMENTS = {"none": None, "compact": "compact", "spread": "spread"}
+
+
+def benchmark(env_id, num_envs, num_workers, placement, n_steps):
+    """
+    :return: environment steps per second, and the placement report
+    """
+    envs = SharedMemoryVectorEnv(
+        gym.spec(env_id).entry_point,
+        num_envs=num_envs,
+        envs_per_worker=-(-num_envs // num_workers),
+        max_episode_steps=1000,
+        placement=placement,
+    )
+    envs.reset(seed=0)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, *envs.action_space.shape)).astype(np.float32)
+    # Warm up
+    for t in range(10):
+        envs.step(actions[t])
+    start = time.perf_counter()
+    for t in range(n_steps):
+        envs.step(actions[t])
+    elapsed = time.perf_counter() - start
+    report = envs.placement_report()
+    envs.close()
+    return n_steps * num_envs / elapsed, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=["HopperBulletEnv-v0", "HumanoidBulletEnv-v0"], help="Environment ids")
+    parser.add_argument("--num-envs", type=int, default=32, help="Number of environments")
+    parser.add_argument("--num-workers", type=int, help="Number of workers, one per CPU available by default")
+    parser.add_argument("--placements", nargs="+", default=list(PLACEMENTS), choices=list(PLACEMENTS), help="Placements")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per placement, to measure the variance")
+    parser.add_argument("-n", "--n-steps", type=int, default=300, help="Number of vector steps")
+    parser.add_argument("--verbose", action="store_true", help="Print the placement of the workers")
+    args = parser.parse_args()
+
+    topology = cpu_topology()
+    num_workers = args.num_workers or len(topology)
+    n_nodes = len({info.node for info in topology})
+    n_cores = len({(info.package, info.core) for info in topology})
+    print(f"{len(topology)} CPUs available, {n_cores} physical cores, {n_nodes} NUMA nodes, {num_workers} workers")
+    print(f"{'env':24s} {'placement':>9s} {'mean':>8s} {'std':>8s} {'min':>8s} {'max':>8s}  (env steps/s)")
+    for env_id in args.env:
+        for name in args.placements:
+            results = []
+            for _ in range(args.repeats):
+                fps, report = benchmark(env_id, args.num_envs, num_workers, PLACEMENTS[name], args.n_steps)
+                results.append(fps)
+            if args.verbose:
+                print(report)
+            print(
+                f"{env_id:24s} {name:>9s} {np.mean(results):8.0f} {np.std(results):8.0f}"
+                f" {np.min(results):8.0f} {np.max(results):8.0f}"
+            )
+    if not hasattr(os, "sched_setaffinity"):
+        print("os.sched_setaffinity() is not available: only the unpinned placement can run")
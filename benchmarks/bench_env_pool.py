@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+SharedMemoryEnvPool (first batch_size envs ready) vs SharedMemoryVectorEnv (whole batch),
+with mixed reset and step latencies
+"""
+
+import argparse
+import time
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.envs.registration import load_env_creator
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.vector import SharedMemoryEnvPool, SharedMemoryVectorEnv
+
+
+class SlowResetEnv:
+    """
+    Environment whose reset() takes ``reset_delay`` more seconds, like a reset that loads assets or waits for I/O.
+    Random actions make the locomotion robots fall early: resets are frequent and their delay stalls a whole batch.
+    """
+
+    def __init__(self, env_id, reset_delay=0.0, **kwargs):
+        self.env = load_env_creator(gym.spec(env_id).entry_point)(**kwargs)
+        self.reset_delay = reset_delay
+
+    def __getattr__(self, name):
+        return getattr(self.env, name)
+
+    def reset(self, **kwargs):
+        time.sleep(self.reset_delay)
+        return self.env.reset(**kwargs)
+
+
+def benchmark_vector_env(env_id, num_envs, n_steps, reset_delay):
+    """
+    :return: environment steps per second
+    """
+    envs = SharedMemoryVectorEnv(SlowResetEnv, num_envs=num_envs, env_id=env_id, reset_delay=reset_delay)
+    envs.reset(seed=0)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, *envs.action_space.shape))
+    start = time.perf_counter()
+    for t in range(n_steps):
+        envs.step(actions[t])
+    elapsed = time.perf_counter() - start
+    envs.close()
+    return n_steps * num_envs / elapsed
+
+
+def benchmark_pool(env_id, num_envs, batch_size, n_steps, reset_delay):
+    """
+    :return: environment steps per second, the same total number of environment steps as benchmark_vector_env()
+    """
+    pool = SharedMemoryEnvPool(SlowResetEnv, num_envs=num_envs, batch_size=batch_size, env_id=env_id, reset_delay=reset_delay)
+    pool.async_reset(seed=0)
+    n_recv = n_steps * num_envs // batch_size
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_recv, batch_size, *pool.single_action_space.shape))
+    start = time.perf_counter()
+    for t in range(n_recv):
+        *_, infos = pool.recv()
+        pool.send(actions[t], infos["env_id"])
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return n_recv * batch_size / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=["HopperBulletEnv-v0", "HumanoidBulletEnv-v0"], help="Environment ids")
+    parser.add_argument("--num-envs", type=int, default=16, help="Number of environments, one per worker")
+    parser.add_argument("--reset-delays", nargs="+", type=float, default=[0.0, 0.02], help="Extra reset latencies (s)")
+    parser.add_argument("-n", "--n-steps", type=int, default=300, help="Number of steps of each environment")
+    args = parser.parse_args()
+
+    batch_sizes = [args.num_envs, args.num_envs // 2, args.num_envs // 4]
+    print(
+        f"{'env':24s} {'reset delay':>11s} {'vector env':>10s} "
+        + " ".join(f"{'pool K=' + str(batch_size):>10s}" for batch_size in batch_sizes)
+        + "  (env steps/s)"
+    )
+    for env_id in args.env:
+        for reset_delay in args.reset_delays:
+            vector_fps = benchmark_vector_env(env_id, args.num_envs, args.n_steps, reset_delay)
+            pool_fps = [
+                benchmark_pool(env_id, args.num_envs, batch_size, args.n_steps, reset_delay) for batch_size in batch_sizes
+            ]
+            print(f"{env_id:24s} {reset_delay:11.3f} {vector_fps:10.0f} " + " ".join(f"{fps:10.0f}" for fps in pool_fps))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Latency and throughput of RemoteVectorEnv over localhost TCP and a Unix socket, vs the same vector env in-process"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.vector import EnvServer, RemoteVectorEnv, StadiumVectorEnv
+
+# All the robots of a batch run in one physics world: 256 envs fit in memory
+VECTOR_ENV_CLASS = StadiumVectorEnv
+
+
+def serve(env_id, num_envs, address, addresses):
+    server = EnvServer(env_id, num_envs=num_envs, address=address, vector_env_class=VECTOR_ENV_CLASS)
+    addresses.put(server.address)
+    server.serve_forever()
+
+
+def time_steps(envs, n_steps):
+    """
+    :return: mean step latency (s)
+    """
+    envs.reset(seed=0)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, *envs.action_space.shape)).astype(np.float32)
+    # Warm up
+    for t in range(min(10, n_steps)):
+        envs.step(actions[t])
+    start = time.perf_counter()
+    for t in range(n_steps):
+        envs.step(actions[t])
+    return (time.perf_counter() - start) / n_steps
+
+
+def benchmark(env_id, num_envs, n_steps, transport):
+    """
+    :return: mean step latency (s)
+    """
+    if transport == "local":
+        envs = VECTOR_ENV_CLASS(gym.spec(env_id).entry_point, num_envs=num_envs, max_episode_steps=1000)
+        latency = time_steps(envs, n_steps)
+        envs.close()
+        return latency
+    ctx = multiprocessing.get_context("fork")
+    addresses = ctx.Queue()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        address = ("127.0.0.1", 0) if transport == "tcp" else os.path.join(tmp_dir, "server.sock")
+        server = ctx.Process(target=serve, args=(env_id, num_envs, address, addresses), daemon=True)
+        server.start()
+        envs = RemoteVectorEnv([addresses.get()])
+        latency = time_steps(envs, n_steps)
+        envs.close()
+        server.terminate()
+        server.join()
+    return latency
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", default="HopperBulletEnv-v0", help="Environment id (locomotion)")
+    parser.add_argument("--num-envs", nargs="+", type=int, default=[1, 4, 16, 64, 256], help="Batch sizes")
+    parser.add_argument("-n", "--n-steps", type=int, default=200, help="Number of vector steps")
+    args = parser.parse_args()
+
+    transports = ["local", "tcp", "unix"]
+    print(
+        f"{'batch':>5s} "
+        + " ".join(f"{transport + ' (ms)':>10s}" for transport in transports)
+        + " "
+        + " ".join(f"{transport + ' overhead (ms)':>18s}" for transport in transports[1:])
+        + " "
+        + " ".join(f"{transport + ' (steps/s)':>15s}" for transport in transports)
+    )
+    for num_envs in args.num_envs:
+        latencies = [benchmark(args.env, num_envs, args.n_steps, transport) for transport in transports]
+        print(
+            f"{num_envs:5d} "
+            + " ".join(f"{1000 * latency:10.3f}" for latency in latencies)
+            + " "
+            + " ".join(f"{1000 * (latency - latencies[0]):18.3f}" for latency in latencies[1:])
+            + " "
+            + " ".join(f"{num_envs / latency:15.0f}" for latency in latencies)
+        )
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+ES population evaluation with a shared noise table: evaluations per second and scaling efficiency
+with the number of worker processes, for antithetic perturbations of a linear policy
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.vector import PopulationEvaluator, SharedNoiseTable
+
+
+def benchmark(env_id, noise_table, num_workers, pop_size, n_steps, generations):
+    """
+    :return: evaluations per second and env steps per second, after a warm-up generation that creates the envs
+    """
+    evaluator = PopulationEvaluator(env_id, noise_table, n_steps=n_steps, num_workers=num_workers)
+    rng = np.random.default_rng(0)
+    params = np.zeros(evaluator.n_params)
+
+    def generation():
+        offsets = np.repeat(noise_table.sample_offsets(rng, evaluator.n_params, pop_size // 2), 2)
+        signs = np.tile([1, -1], pop_size // 2)
+        returns, lengths = evaluator.evaluate(params, offsets, signs, seeds=int(rng.integers(2**31)))
+        # ES update, with centered ranks as in Salimans et al.
+        ranks = np.empty(len(returns))
+        ranks[np.argsort(returns)] = np.linspace(-0.5, 0.5, len(returns))
+        params[:] += (
+            0.01
+            / (pop_size * evaluator.noise_std)
+            * (ranks * signs)
+            @ np.stack([noise_table.get(offset, evaluator.n_params) for offset in offsets])
+        )
+        return lengths.sum()
+
+    generation()
+    n_env_steps = 0
+    start = time.perf_counter()
+    for _ in range(generations):
+        n_env_steps += generation()
+    elapsed = time.perf_counter() - start
+    evaluator.close()
+    return generations * pop_size / elapsed, n_env_steps / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=["HopperBulletEnv-v0", "HalfCheetahBulletEnv-v0"], help="Environment ids")
+    parser.add_argument("--num-workers", nargs="+", type=int, default=[1, 2, 4], help="Worker processes")
+    parser.add_argument("--pop-size", type=int, default=64, help="Perturbations per generation (antithetic pairs)")
+    parser.add_argument("--noise-size", type=int, default=25_000_000, help="Values in the noise table")
+    parser.add_argument("--generations", type=int, default=3, help="Timed generations")
+    parser.add_argument("-n", "--n-steps", type=int, default=200, help="Maximum episode length")
+    args = parser.parse_args()
+
+    n_cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    noise_table = SharedNoiseTable(size=args.noise_size)
+    print(f"{n_cpus} CPUs available, noise table of {noise_table.noise.nbytes / 1e6:.0f} MB in shared memory")
+    print(f"{'env':24s} {'workers':>7s} {'evals/s':>8s} {'steps/s':>8s} {'efficiency':>10s}")
+    for env_id in args.env:
+        single_worker = None
+        for num_workers in args.num_workers:
+            evals_per_s, steps_per_s = benchmark(
+                env_id, noise_table, num_workers, args.pop_size, args.n_steps, args.generations
+            )
+            if num_workers == 1:
+                single_worker = evals_per_s
+            # evaluations per second per worker, relative to a single worker
+            efficiency = f"{100 * evals_per_s / (num_workers * single_worker):9.0f}%" if single_worker else f"{'-':>10s}"
+            print(f"{env_id:24s} {num_workers:7d} {evals_per_s:8.1f} {steps_per_s:8.0f} {efficiency}")
+    noise_table.close(unlink=True)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Microbenchmark: per-foot getContactPoints queries vs one robot/ground query per step"""
+
+import argparse
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+
+ENV_IDS = [
+    "HopperBulletEnv-v0",
+    "Walker2DBulletEnv-v0",
+    "HalfCheetahBulletEnv-v0",
+    "AntBulletEnv-v0",
+    "HumanoidBulletEnv-v0",
+]
+
+
+def per_foot_contact(robot, ground_ids):
+    """The contact stage before batching: one query per foot, every contact turned into a set"""
+    for i, f in enumerate(robot.feet):
+        contact_ids = set((x[2], x[4]) for x in f.contact_list())
+        robot.feet_contact[i] = 1.0 if ground_ids & contact_ids else 0.0
+
+
+def benchmark(env_id, n_steps, n_repeats):
+    env = gym.make(env_id)
+    env.reset(seed=0)
+    unwrapped = env.unwrapped
+    robot = unwrapped.robot
+    per_foot, batched = 0.0, 0.0
+    for _ in range(n_steps):
+        _, _, terminated, truncated, _ = env.step(env.action_space.sample())
+        if terminated or truncated:
+            env.reset()
+        # Time both versions on the same contact state
+        start = time.perf_counter()
+        for _ in range(n_repeats):
+            per_foot_contact(robot, unwrapped.ground_ids)
+        per_foot += time.perf_counter() - start
+        expected = robot.feet_contact.copy()
+
+        start = time.perf_counter()
+        for _ in range(n_repeats):
+            robot.calc_feet_contact(unwrapped.ground_ids)
+        batched += time.perf_counter() - start
+        assert np.array_equal(robot.feet_contact, expected)
+    env.close()
+    n_calls = n_steps * n_repeats
+    return len(robot.feet), per_foot / n_calls, batched / n_calls
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=ENV_IDS, help="Environment ids")
+    parser.add_argument("-n", "--n-steps", type=int, default=500, help="Number of env steps")
+    parser.add_argument("-r", "--n-repeats", type=int, default=20, help="Number of measures per step")
+    args = parser.parse_args()
+
+    print(f"{'env':28s} {'feet':>5s} {'per-foot (us)':>14s} {'batched (us)':>13s} {'saving (us)':>12s} {'speedup':>8s}")
+    for env_id in args.env:
+        n_feet, per_foot, batched = benchmark(env_id, args.n_steps, args.n_repeats)
+        print(
+            f"{env_id:28s} {n_feet:5d} {per_foot * 1e6:14.2f} {batched * 1e6:13.2f} "
+            f"{(per_foot - batched) * 1e6:12.2f} {per_foot / batched:7.2f}x"
+        )
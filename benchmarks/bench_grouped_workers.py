@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Throughput curves of SharedMemoryVectorEnv for different numbers of envs per worker process"""
+
+import argparse
+import os
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.vector import SharedMemoryVectorEnv
+from pybullet_envs_gymnasium.vector.shared_memory_vector_env import auto_envs_per_worker
+
+ENV_IDS = ["HopperBulletEnv-v0", "HumanoidBulletEnv-v0"]
+
+
+def benchmark(env_id, num_envs, envs_per_worker, n_steps):
+    """
+    :return: environment steps per second
+    """
+    envs = SharedMemoryVectorEnv(
+        gym.spec(env_id).entry_point, num_envs=num_envs, envs_per_worker=envs_per_worker, max_episode_steps=1000
+    )
+    envs.reset(seed=0)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, *envs.action_space.shape)).astype(np.float32)
+    # Warm up
+    for t in range(10):
+        envs.step(actions[t])
+    start = time.perf_counter()
+    for t in range(n_steps):
+        envs.step(actions[t])
+    elapsed = time.perf_counter() - start
+    envs.close()
+    return n_steps * num_envs / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=ENV_IDS, help="Environment ids")
+    parser.add_argument("--num-envs", nargs="+", type=int, default=[16, 64], help="Numbers of environments")
+    parser.add_argument(
+        "-m", "--envs-per-worker", nargs="+", type=int, default=[1, 2, 4, 8, 16, 64], help="Numbers of envs per worker"
+    )
+    parser.add_argument("-n", "--n-steps", type=int, default=200, help="Number of vector steps")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'env':24s} {'num_envs':>8s} {'envs/worker':>11s} {'workers':>7s} {'steps/s':>9s}")
+    for env_id in args.env:
+        for num_envs in args.num_envs:
+            auto = auto_envs_per_worker(num_envs)
+            for envs_per_worker in sorted({m for m in args.envs_per_worker if m <= num_envs} | {auto}):
+                fps = benchmark(env_id, num_envs, envs_per_worker, args.n_steps)
+                label = f"{envs_per_worker}{' (auto)' if envs_per_worker == auto else ''}"
+                print(f"{env_id:24s} {num_envs:8d} {label:>11s} {-(-num_envs // envs_per_worker):7d} {fps:9.0f}")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""SharedMemoryVectorEnv step latency with and without reset prefetching, while the main process computes actions"""
+
+import argparse
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.vector import SharedMemoryVectorEnv
+from pybullet_envs_gymnasium.vector.bullet_vector_env import load_env_creator
+
+
+def make_slow_reset_env(env_id, reset_delay=0.0, **kwargs):
+    """
+    Environment whose robot_specific_reset() takes ``reset_delay`` more seconds,
+    like a reset that samples a terrain or solves for a feasible initial pose.
+    """
+    env = load_env_creator(gym.spec(env_id).entry_point)(**kwargs)
+    robot_specific_reset = env.robot.robot_specific_reset
+
+    def slow_robot_specific_reset(bullet_client):
+        time.sleep(reset_delay)
+        robot_specific_reset(bullet_client)
+
+    env.robot.robot_specific_reset = slow_robot_specific_reset
+    return env
+
+
+def benchmark(env_id, num_envs, envs_per_worker, prefetch_resets, n_steps, max_episode_steps, policy_time, reset_delay):
+    """
+    :return: mean time spent in step() (s), and the fraction of the resets that found a state ready
+    """
+    envs = SharedMemoryVectorEnv(
+        make_slow_reset_env,
+        num_envs=num_envs,
+        envs_per_worker=envs_per_worker,
+        max_episode_steps=max_episode_steps,
+        prefetch_resets=prefetch_resets,
+        env_id=env_id,
+        reset_delay=reset_delay,
+    )
+    envs.reset(seed=0)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, *envs.action_space.shape)).astype(np.float32)
+    step_time = 0.0
+    for t in range(n_steps):
+        # Stands for the policy inference, the workers are idle meanwhile
+        time.sleep(policy_time)
+        start = time.perf_counter()
+        envs.step(actions[t])
+        step_time += time.perf_counter() - start
+    hits, misses = envs.reset_pool_counters()
+    envs.close()
+    return step_time / n_steps, hits.sum() / max(hits.sum() + misses.sum(), 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=["HopperBulletEnv-v0", "HumanoidBulletEnv-v0"], help="Environment ids")
+    parser.add_argument("--num-envs", type=int, default=8, help="Number of environments")
+    parser.add_argument("--envs-per-worker", type=int, default=2, help="Environments per worker process")
+    parser.add_argument("--max-episode-steps", type=int, default=50, help="Truncate episodes after that many steps")
+    parser.add_argument("--policy-ms", type=float, default=2.0, help="Time the main process spends between steps (ms)")
+    parser.add_argument("--reset-delay-ms", nargs="+", type=float, default=[0.0, 5.0], help="Extra reset costs (ms)")
+    parser.add_argument("-n", "--n-steps", type=int, default=500, help="Number of vector steps")
+    args = parser.parse_args()
+
+    print(f"{'env':24s} {'reset delay (ms)':>16s} {'prefetch':>8s} {'step (ms)':>10s} {'hit rate':>8s}")
+    for env_id in args.env:
+        for reset_delay in args.reset_delay_ms:
+            for prefetch_resets in [False, True]:
+                latency, hit_rate = benchmark(
+                    env_id,
+                    args.num_envs,
+                    args.envs_per_worker,
+                    prefetch_resets,
+                    args.n_steps,
+                    args.max_episode_steps,
+                    args.policy_ms / 1000,
+                    reset_delay / 1000,
+                )
+                prefetch = "on" if prefetch_resets else "off"
+                print(f"{env_id:24s} {reset_delay:16.1f} {prefetch:>8s} {1000 * latency:10.3f} {100 * hit_rate:7.1f}%")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Benchmark: reset latency of the locomotion envs, ground parts resolved on every reset vs once"""
+
+import argparse
+import time
+
+import gymnasium as gym
+
+import pybullet_envs_gymnasium  # noqa: F401
+
+ENV_IDS = [
+    "HopperBulletEnv-v0",
+    "Walker2DBulletEnv-v0",
+    "HalfCheetahBulletEnv-v0",
+    "AntBulletEnv-v0",
+    "HumanoidBulletEnv-v0",
+]
+
+
+def benchmark(env_id, n_resets, n_steps, rebuild):
+    """
+    :return: mean reset duration (s), and env steps per second of a random policy
+        (resets included) over ``n_steps``
+    """
+    env = gym.make(env_id).unwrapped
+    env.reset(seed=0)
+
+    def reset():
+        if rebuild:
+            # Previous behavior: addToScene() and the ground ids on every reset
+            env.ground_ids = None
+        env.reset()
+
+    start = time.perf_counter()
+    for _ in range(n_resets):
+        reset()
+    reset_time = (time.perf_counter() - start) / n_resets
+
+    env.action_space.seed(0)
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        _, _, terminated, _, _ = env.step(env.action_space.sample())
+        if terminated:
+            reset()
+    steps_per_second = n_steps / (time.perf_counter() - start)
+    env.close()
+    return reset_time, steps_per_second
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=ENV_IDS, help="Environment ids")
+    parser.add_argument("-r", "--n-resets", type=int, default=200, help="Number of resets")
+    parser.add_argument("-n", "--n-steps", type=int, default=5000, help="Number of random policy steps")
+    args = parser.parse_args()
+
+    print(
+        f"{'env':28s} {'reset rebuild (us)':>19s} {'reset cached (us)':>18s} {'speedup':>8s} "
+        f"{'steps/s rebuild':>16s} {'steps/s cached':>15s}"
+    )
+    for env_id in args.env:
+        rebuild_reset, rebuild_fps = benchmark(env_id, args.n_resets, args.n_steps, rebuild=True)
+        cached_reset, cached_fps = benchmark(env_id, args.n_resets, args.n_steps, rebuild=False)
+        print(
+            f"{env_id:28s} {rebuild_reset * 1e6:19.1f} {cached_reset * 1e6:18.1f} {rebuild_reset / cached_reset:7.2f}x "
+            f"{rebuild_fps:16.0f} {cached_fps:15.0f}"
+        )
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Benchmark: reset latency with and without a pool of pre-sampled initial states"""
+
+import argparse
+import time
+
+import gymnasium as gym
+
+import pybullet_envs_gymnasium  # noqa: F401
+
+ENV_IDS = [
+    "InvertedDoublePendulumBulletEnv-v0",
+    "HopperBulletEnv-v0",
+    "AntBulletEnv-v0",
+    "HumanoidBulletEnv-v0",
+    "HumanoidFlagrunBulletEnv-v0",
+]
+
+
+def benchmark(env_id, n_resets, pool_size):
+    """
+    :return: mean reset duration (s) when the pool is filled outside of reset(),
+        and mean duration (s) of reset() plus pool filling
+    """
+    env = gym.make(env_id, reset_pool_size=pool_size).unwrapped
+    env.reset(seed=0)
+    reset_time, fill_time = 0.0, 0.0
+    for i in range(n_resets):
+        if pool_size > 0 and i % pool_size == 0:
+            # The pool is empty, refill it outside of reset()
+            start = time.perf_counter()
+            env.fill_reset_pool()
+            fill_time += time.perf_counter() - start
+        start = time.perf_counter()
+        env.reset()
+        reset_time += time.perf_counter() - start
+    env.close()
+    return reset_time / n_resets, (reset_time + fill_time) / n_resets
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=ENV_IDS, help="Environment ids")
+    parser.add_argument("-r", "--n-resets", type=int, default=200, help="Number of resets")
+    parser.add_argument("-p", "--pool-size", type=int, default=50, help="Number of pre-sampled initial states")
+    args = parser.parse_args()
+
+    print(f"{'env':36s} {'reset (us)':>11s} {'pooled reset (us)':>18s} {'speedup':>8s} {'incl. filling (us)':>19s}")
+    for env_id in args.env:
+        reset_time, _ = benchmark(env_id, args.n_resets, 0)
+        pooled_time, amortized_time = benchmark(env_id, args.n_resets, args.pool_size)
+        print(
+            f"{env_id:36s} {reset_time * 1e6:11.1f} {pooled_time * 1e6:18.1f} {reset_time / pooled_time:7.2f}x "
+            f"{amortized_time * 1e6:19.1f}"
+        )
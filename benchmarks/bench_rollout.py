@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Evaluation of a population of linear policies: the policies in the main process stepping a SharedMemoryVectorEnv
+(one IPC round trip per step), vs whole rollouts in the workers of a RolloutPool (one per episode)
+"""
+
+import argparse
+import functools
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.vector import RolloutPool, SharedMemoryVectorEnv, rollout
+from pybullet_envs_gymnasium.vector.rollout import n_policy_params
+
+
+def evaluate_vector_env(envs, population, n_steps):
+    """
+    :return: episode lengths, one env per policy and a batched linear policy in the main process
+    """
+    obs_dim, act_dim = envs.single_observation_space.shape[0], envs.single_action_space.shape[0]
+    weights = population[:, : act_dim * obs_dim].reshape(-1, act_dim, obs_dim)
+    biases = population[:, act_dim * obs_dim :]
+    obs, _ = envs.reset(seed=0)
+    returns = np.zeros(len(population))
+    lengths = np.zeros(len(population), dtype=np.int64)
+    running = np.ones(len(population), dtype=bool)
+    for _ in range(n_steps):
+        actions = np.clip(np.einsum("pij,pj->pi", weights, obs) + biases, -1, 1)
+        obs, rewards, terminations, _, _ = envs.step(actions)
+        returns += rewards * running
+        lengths += running
+        running &= ~terminations
+        if not running.any():
+            break
+    return lengths
+
+
+def benchmark(env_id, pop_size, n_steps, method, num_workers, generations):
+    """
+    :return: evaluations per second, env steps per second, after a first generation that creates the envs
+    """
+    env = gym.make(env_id)
+    n_params = n_policy_params("linear", env.observation_space.shape[0], env.action_space.shape[0])
+    env.close()
+    rng = np.random.default_rng(0)
+    if method == "vector env":
+        envs = SharedMemoryVectorEnv(
+            gym.spec(env_id).entry_point, num_envs=pop_size, envs_per_worker=-(-pop_size // num_workers)
+        )
+        evaluate = functools.partial(evaluate_vector_env, envs, n_steps=n_steps)
+    elif method == "in process":
+        envs = None
+
+        def evaluate(population):
+            return np.concatenate([rollout(env_id, params, n_steps=n_steps, seed=0).lengths for params in population])
+
+    else:
+        envs = RolloutPool(num_workers=num_workers)
+
+        def evaluate(population):
+            return np.concatenate([result.lengths for result in envs.map(env_id, population, n_steps=n_steps, seeds=0)])
+
+    evaluate(rng.normal(scale=0.1, size=(pop_size, n_params)))
+    n_env_steps = 0
+    start = time.perf_counter()
+    for _ in range(generations):
+        n_env_steps += evaluate(rng.normal(scale=0.1, size=(pop_size, n_params))).sum()
+    elapsed = time.perf_counter() - start
+    if envs is not None:
+        envs.close()
+    return generations * pop_size / elapsed, n_env_steps / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=["HopperBulletEnv-v0", "HalfCheetahBulletEnv-v0"], help="Environment ids")
+    parser.add_argument("--pop-size", type=int, default=32, help="Number of policies")
+    parser.add_argument("--num-workers", nargs="+", type=int, default=[1, 2, 4], help="Worker processes")
+    parser.add_argument("--generations", type=int, default=3, help="Timed generations")
+    parser.add_argument("-n", "--n-steps", type=int, default=200, help="Maximum episode length")
+    args = parser.parse_args()
+
+    print(f"{'env':24s} {'method':>12s} {'workers':>7s} {'evals/s':>8s} {'steps/s':>8s}")
+    for env_id in args.env:
+        evals_per_s, steps_per_s = benchmark(env_id, args.pop_size, args.n_steps, "in process", 0, args.generations)
+        print(f"{env_id:24s} {'in process':>12s} {0:7d} {evals_per_s:8.1f} {steps_per_s:8.0f}")
+        for method in ["vector env", "pool"]:
+            for num_workers in args.num_workers:
+                evals_per_s, steps_per_s = benchmark(
+                    env_id, args.pop_size, args.n_steps, method, num_workers, args.generations
+                )
+                print(f"{env_id:24s} {method:>12s} {num_workers:7d} {evals_per_s:8.1f} {steps_per_s:8.0f}")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Scaling benchmark: shared-memory subprocess vector env vs gymnasium AsyncVectorEnv, 1 to N workers"""
+
+import argparse
+import os
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.vector import BulletVectorEnv, SharedMemoryVectorEnv
+
+ENV_IDS = ["HopperBulletEnv-v0", "AntBulletEnv-v0", "HumanoidBulletEnv-v0"]
+
+
+def make_envs(env_id, backend, num_envs):
+    entry_point = gym.spec(env_id).entry_point
+    if backend == "bullet":
+        return BulletVectorEnv(entry_point, num_envs=num_envs, max_episode_steps=1000)
+    if backend == "shm":
+        return SharedMemoryVectorEnv(entry_point, num_envs=num_envs, max_episode_steps=1000)
+    return gym.make_vec(env_id, num_envs=num_envs, vectorization_mode="async")
+
+
+def benchmark(env_id, backend, num_envs, n_steps):
+    """
+    :return: environment steps per second
+    """
+    envs = make_envs(env_id, backend, num_envs)
+    envs.reset(seed=0)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, *envs.action_space.shape)).astype(np.float32)
+    # Warm up
+    for t in range(10):
+        envs.step(actions[t])
+    start = time.perf_counter()
+    for t in range(n_steps):
+        envs.step(actions[t])
+    elapsed = time.perf_counter() - start
+    envs.close()
+    return n_steps * num_envs / elapsed
+
+
+if __name__ == "__main__":
+    n_cpus = os.cpu_count() or 1
+    default_workers = [2**i for i in range(8) if 2**i <= max(4, n_cpus)]
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=ENV_IDS, help="Environment ids")
+    parser.add_argument("--workers", nargs="+", type=int, default=default_workers, help="Numbers of workers (one env each)")
+    parser.add_argument("-n", "--n-steps", type=int, default=1000, help="Number of vector steps")
+    args = parser.parse_args()
+
+    print(f"{n_cpus} CPUs, 'in-process' is BulletVectorEnv with the same number of envs")
+    print(
+        f"{'env':24s} {'workers':>7s} {'in-process (steps/s)':>21s} {'async (steps/s)':>16s} {'shm (steps/s)':>14s} "
+        f"{'shm/async':>10s} {'shm scaling':>12s}"
+    )
+    for env_id in args.env:
+        shm_single = None
+        for num_workers in args.workers:
+            bullet_fps, async_fps, shm_fps = (
+                benchmark(env_id, backend, num_workers, args.n_steps) for backend in ("bullet", "async", "shm")
+            )
+            if shm_single is None:
+                shm_single = shm_fps
+            print(
+                f"{env_id:24s} {num_workers:7d} {bullet_fps:21.0f} {async_fps:16.0f} {shm_fps:14.0f} "
+                f"{shm_fps / async_fps:9.2f}x {shm_fps / shm_single:11.2f}x"
+            )
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Throughput benchmark: K robots in one Bullet world (StadiumVectorEnv) vs K worlds (BulletVectorEnv)"""
+
+import argparse
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.vector import BulletVectorEnv, StadiumVectorEnv
+
+ENV_IDS = ["HopperBulletEnv-v0", "AntBulletEnv-v0", "HumanoidBulletEnv-v0"]
+BACKENDS = {"worlds": BulletVectorEnv, "stadium": StadiumVectorEnv}
+
+
+def benchmark(env_id, backend, num_envs, n_steps):
+    """
+    :return: environment steps per second, and setup (construction and first reset) duration (s)
+    """
+    start = time.perf_counter()
+    envs = BACKENDS[backend](gym.spec(env_id).entry_point, num_envs=num_envs, max_episode_steps=1000)
+    envs.reset(seed=0)
+    setup_time = time.perf_counter() - start
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, *envs.action_space.shape)).astype(np.float32)
+    # Warm up
+    for t in range(10):
+        envs.step(actions[t])
+    start = time.perf_counter()
+    for t in range(n_steps):
+        envs.step(actions[t])
+    elapsed = time.perf_counter() - start
+    envs.close()
+    return n_steps * num_envs / elapsed, setup_time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=ENV_IDS, help="Environment ids")
+    parser.add_argument("--num-envs", nargs="+", type=int, default=[1, 4, 16, 64], help="Numbers of robots")
+    parser.add_argument("-n", "--n-steps", type=int, default=500, help="Number of vector steps")
+    args = parser.parse_args()
+
+    print(
+        f"{'env':24s} {'robots':>6s} {'worlds (steps/s)':>17s} {'stadium (steps/s)':>18s} {'speedup':>8s} "
+        f"{'worlds setup (s)':>17s} {'stadium setup (s)':>18s}"
+    )
+    for env_id in args.env:
+        for num_envs in args.num_envs:
+            worlds_fps, worlds_setup = benchmark(env_id, "worlds", num_envs, args.n_steps)
+            stadium_fps, stadium_setup = benchmark(env_id, "stadium", num_envs, args.n_steps)
+            print(
+                f"{env_id:24s} {num_envs:6d} {worlds_fps:17.0f} {stadium_fps:18.0f} {stadium_fps / worlds_fps:7.2f}x "
+                f"{worlds_setup:17.2f} {stadium_setup:18.2f}"
+            )
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Memory benchmark: transient allocations of calc_state() and step(), copied vs read-only view observations"""
+
+import argparse
+import time
+import tracemalloc
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+
+ENV_IDS = [
+    "InvertedDoublePendulumBulletEnv-v0",
+    "ReacherBulletEnv-v0",
+    "HopperBulletEnv-v0",
+    "AntBulletEnv-v0",
+    "HumanoidBulletEnv-v0",
+]
+
+
+def peak_memory(fn, n_steps):
+    """Mean peak traced memory (bytes) above the starting point during one call"""
+    peak = 0
+    for _ in range(n_steps):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        fn()
+        peak += tracemalloc.get_traced_memory()[1] - current
+    return peak / n_steps
+
+
+def benchmark(env_id, n_steps, obs_view, reward_info):
+    # Bypass the wrappers, they are not part of the observation pipeline
+    env = gym.make(env_id, obs_view=obs_view, reward_info=reward_info).unwrapped
+    env.reset(seed=0)
+    action = np.zeros(env.action_space.shape, dtype=np.float32)
+
+    def step():
+        _, _, terminated, _, _ = env.step(action)
+        if terminated:
+            env.reset()
+
+    # Warm up the lazily built buffers
+    for _ in range(10):
+        step()
+    tracemalloc.start()
+    state_peak = peak_memory(env.robot.calc_state, n_steps)
+    step_peak = peak_memory(step, n_steps)
+    tracemalloc.stop()
+    # Time without tracing, tracemalloc slows down every allocation
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        step()
+    step_time = (time.perf_counter() - start) / n_steps
+    env.close()
+    return state_peak, step_peak, step_time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=ENV_IDS, help="Environment ids")
+    parser.add_argument("-n", "--n-steps", type=int, default=1000, help="Number of env steps")
+    parser.add_argument("--reward-info", action="store_true", help="Return the reward breakdown in the info dict")
+    args = parser.parse_args()
+
+    print(f"{'env':36s} {'obs':>5s} {'calc_state peak (B)':>20s} {'step peak (B)':>14s} {'step (us)':>10s}")
+    for env_id in args.env:
+        for obs_view in (False, True):
+            state_peak, step_peak, step_time = benchmark(env_id, args.n_steps, obs_view, args.reward_info)
+            print(
+                f"{env_id:36s} {'view' if obs_view else 'copy':>5s} {state_peak:20.0f} {step_peak:14.0f} "
+                f"{step_time * 1e6:10.2f}"
+            )
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Open-loop rollouts: step() through the gym.make() wrappers, step() of the unwrapped env, and step_many()"""
+
+import argparse
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+
+
+def step_loop(env, actions):
+    for action in actions:
+        _, _, terminated, _, _ = env.step(action)
+        if terminated:
+            break
+
+
+METHODS = {
+    "wrapped step()": lambda env, actions: step_loop(env, actions),
+    "step()": lambda env, actions: step_loop(env.unwrapped, actions),
+    "step_many()": lambda env, actions: env.unwrapped.step_many(actions),
+    "step_many(last obs)": lambda env, actions: env.unwrapped.step_many(actions, all_observations=False),
+}
+
+
+def benchmark(env_id, n_steps, repeats):
+    """
+    :return: microseconds per step of each method, best of ``repeats`` rollouts, the methods take turns
+    """
+    env = gym.make(env_id, max_episode_steps=n_steps)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, *env.action_space.shape)).astype(np.float32)
+    env.reset(seed=0)
+    best = dict.fromkeys(METHODS, np.inf)
+    for _ in range(repeats):
+        for method, run in METHODS.items():
+            env.reset(seed=0)
+            start = time.perf_counter()
+            run(env, actions)
+            best[method] = min(best[method], time.perf_counter() - start)
+    env.close()
+    return {method: 1e6 * elapsed / n_steps for method, elapsed in best.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--env",
+        nargs="+",
+        default=["ReacherBulletEnv-v0", "HalfCheetahBulletEnv-v0"],
+        help="Environments that do not terminate",
+    )
+    parser.add_argument("-n", "--n-steps", type=int, default=1000, help="Length of the action sequence")
+    parser.add_argument("--repeats", type=int, default=10, help="Rollouts per method, the best one counts")
+    args = parser.parse_args()
+
+    print(f"{'env':24s} {'method':>20s} {'us/step':>8s} {'speedup':>8s}")
+    for env_id in args.env:
+        results = benchmark(env_id, args.n_steps, args.repeats)
+        baseline = results["wrapped step()"]
+        for method, us_per_step in results.items():
+            print(f"{env_id:24s} {method:>20s} {us_per_step:8.1f} {baseline / us_per_step:7.2f}x")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Benchmark: thread-pool physics (ThreadedVectorEnv) vs in-process and subprocess vector envs, and GIL release"""
+
+import argparse
+import os
+import threading
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.vector import BulletVectorEnv, SharedMemoryVectorEnv, ThreadedVectorEnv
+
+ENV_IDS = ["HopperBulletEnv-v0", "AntBulletEnv-v0", "HumanoidBulletEnv-v0"]
+
+
+def make_envs(env_id, backend, num_envs, num_threads):
+    entry_point = gym.spec(env_id).entry_point
+    if backend == "sync":
+        return BulletVectorEnv(entry_point, num_envs=num_envs, max_episode_steps=1000)
+    if backend == "subprocess":
+        return SharedMemoryVectorEnv(entry_point, num_envs=num_envs, envs_per_worker="auto", max_episode_steps=1000)
+    return ThreadedVectorEnv(entry_point, num_envs=num_envs, num_threads=num_threads, max_episode_steps=1000)
+
+
+def benchmark(env_id, backend, num_envs, n_steps, num_threads=None):
+    """
+    :return: environment steps per second
+    """
+    envs = make_envs(env_id, backend, num_envs, num_threads)
+    envs.reset(seed=0)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, *envs.action_space.shape)).astype(np.float32)
+    # Warm up
+    for t in range(10):
+        envs.step(actions[t])
+    start = time.perf_counter()
+    for t in range(n_steps):
+        envs.step(actions[t])
+    elapsed = time.perf_counter() - start
+    envs.close()
+    return n_steps * num_envs / elapsed
+
+
+def python_progress(background, duration):
+    """
+    :return: iterations per second of a pure Python loop while ``background`` runs in a loop on another thread
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.is_set():
+            background()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    count, end = 0, time.perf_counter() + duration
+    while time.perf_counter() < end:
+        count += 1
+    stop.set()
+    thread.join()
+    return count / duration
+
+
+def gil_release_ratio(env_id, duration):
+    """
+    Progress of the main thread while another thread calls stepSimulation(), relative to
+    its progress while the other thread sleeps in time.sleep(), which releases the GIL.
+    Close to 1 if stepSimulation() releases the GIL and a second CPU is free,
+    0.5 or less if the GIL serializes the two threads (or if there is a single CPU).
+    """
+    env = gym.make(env_id).unwrapped
+    env.reset(seed=0)
+    sleeping = python_progress(lambda: time.sleep(0.001), duration)
+    simulating = python_progress(env._p.stepSimulation, duration)
+    env.close()
+    return simulating / sleeping
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=ENV_IDS, help="Environment ids")
+    parser.add_argument("--num-envs", type=int, default=16, help="Number of environments")
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, 2, 4, 8], help="Numbers of threads")
+    parser.add_argument("-n", "--n-steps", type=int, default=200, help="Number of vector steps")
+    parser.add_argument("--gil-duration", type=float, default=1.0, help="Duration (s) of each GIL measurement")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.num_envs} envs, speedups relative to sync (BulletVectorEnv)")
+    print(
+        f"{'env':24s} {'GIL ratio':>9s} {'sync (steps/s)':>15s} {'subprocess':>11s} "
+        + " ".join(f"{f'{n} threads':>10s}" for n in args.threads)
+    )
+    for env_id in args.env:
+        ratio = gil_release_ratio(env_id, args.gil_duration)
+        sync_fps = benchmark(env_id, "sync", args.num_envs, args.n_steps)
+        subprocess_fps = benchmark(env_id, "subprocess", args.num_envs, args.n_steps)
+        threads_fps = [benchmark(env_id, "threads", args.num_envs, args.n_steps, n) for n in args.threads]
+        print(
+            f"{env_id:24s} {ratio:9.2f} {sync_fps:15.0f} {subprocess_fps / sync_fps:10.2f}x "
+            + " ".join(f"{fps / sync_fps:9.2f}x" for fps in threads_fps)
+        )
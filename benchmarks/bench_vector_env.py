@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Throughput benchmark: BulletVectorEnv vs gymnasium SyncVectorEnv and AsyncVectorEnv"""
+
+import argparse
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import pybullet_envs_gymnasium  # noqa: F401
+
+ENV_IDS = ["HopperBulletEnv-v0", "AntBulletEnv-v0", "HumanoidBulletEnv-v0"]
+# vectorization_mode of gym.make_vec, the registered vector entry point is BulletVectorEnv
+BACKENDS = {"bullet": "vector_entry_point", "sync": "sync", "async": "async"}
+
+
+def benchmark(env_id, backend, num_envs, n_steps):
+    """
+    :return: environment steps per second
+    """
+    envs = gym.make_vec(env_id, num_envs=num_envs, vectorization_mode=BACKENDS[backend])
+    envs.reset(seed=0)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(n_steps, *envs.action_space.shape)).astype(np.float32)
+    # Warm up
+    for t in range(10):
+        envs.step(actions[t])
+    start = time.perf_counter()
+    for t in range(n_steps):
+        envs.step(actions[t])
+    elapsed = time.perf_counter() - start
+    envs.close()
+    return n_steps * num_envs / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--env", nargs="+", default=ENV_IDS, help="Environment ids")
+    parser.add_argument("--num-envs", nargs="+", type=int, default=[1, 4, 16], help="Numbers of environments")
+    parser.add_argument("-n", "--n-steps", type=int, default=1000, help="Number of vector steps")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS), help="Vector envs")
+    args = parser.parse_args()
+
+    print(f"{'env':24s} {'num_envs':>8s} " + " ".join(f"{backend + ' (steps/s)':>16s}" for backend in args.backends))
+    for env_id in args.env:
+        for num_envs in args.num_envs:
+            results = [benchmark(env_id, backend, num_envs, args.n_steps) for backend in args.backends]
+            print(f"{env_id:24s} {num_envs:8d} " + " ".join(f"{fps:16.0f}" for fps in results))
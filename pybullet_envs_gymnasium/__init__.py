@@ -1,10 +1,21 @@
+from functools import partial
+
 from gymnasium.envs.registration import register
 
+
+def _make_vector_env(entry_point, **kwargs):
+    # Imported on demand, single environments do not need it
+    from pybullet_envs_gymnasium.vector import BulletVectorEnv
+
+    return BulletVectorEnv(entry_point, **kwargs)
+
+
 # ------------bullet-------------
 
 register(
     id="InvertedPendulumBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_pendulum_envs:InvertedPendulumBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_pendulum_envs:InvertedPendulumBulletEnv"),
     max_episode_steps=1000,
     reward_threshold=950.0,
 )
@@ -12,6 +23,7 @@ register(
 register(
     id="InvertedDoublePendulumBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_pendulum_envs:InvertedDoublePendulumBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_pendulum_envs:InvertedDoublePendulumBulletEnv"),
     max_episode_steps=1000,
     reward_threshold=9100.0,
 )
@@ -19,6 +31,7 @@ register(
 register(
     id="InvertedPendulumSwingupBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_pendulum_envs:InvertedPendulumSwingupBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_pendulum_envs:InvertedPendulumSwingupBulletEnv"),
     max_episode_steps=1000,
     reward_threshold=800.0,
 )
@@ -26,6 +39,7 @@ register(
 register(
     id="ReacherBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_manipulator_envs:ReacherBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_manipulator_envs:ReacherBulletEnv"),
     max_episode_steps=150,
     reward_threshold=18.0,
 )
@@ -33,6 +47,7 @@ register(
 register(
     id="PusherBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_manipulator_envs:PusherBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_manipulator_envs:PusherBulletEnv"),
     max_episode_steps=150,
     reward_threshold=18.0,
 )
@@ -40,6 +55,7 @@ register(
 register(
     id="ThrowerBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_manipulator_envs:ThrowerBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_manipulator_envs:ThrowerBulletEnv"),
     max_episode_steps=100,
     reward_threshold=18.0,
 )
@@ -48,12 +64,14 @@ register(
 register(
     id="Walker2DBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_locomotion_envs:Walker2DBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_locomotion_envs:Walker2DBulletEnv"),
     max_episode_steps=1000,
     reward_threshold=2500.0,
 )
 register(
     id="HalfCheetahBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_locomotion_envs:HalfCheetahBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_locomotion_envs:HalfCheetahBulletEnv"),
     max_episode_steps=1000,
     reward_threshold=3000.0,
 )
@@ -61,6 +79,7 @@ register(
 register(
     id="AntBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_locomotion_envs:AntBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_locomotion_envs:AntBulletEnv"),
     max_episode_steps=1000,
     reward_threshold=2500.0,
 )
@@ -68,6 +87,7 @@ register(
 register(
     id="HopperBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_locomotion_envs:HopperBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_locomotion_envs:HopperBulletEnv"),
     max_episode_steps=1000,
     reward_threshold=2500.0,
 )
@@ -75,12 +95,14 @@ register(
 register(
     id="HumanoidBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_locomotion_envs:HumanoidBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_locomotion_envs:HumanoidBulletEnv"),
     max_episode_steps=1000,
 )
 
 register(
     id="HumanoidFlagrunBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_locomotion_envs:HumanoidFlagrunBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_locomotion_envs:HumanoidFlagrunBulletEnv"),
     max_episode_steps=1000,
     reward_threshold=2000.0,
 )
@@ -88,5 +110,6 @@ register(
 register(
     id="HumanoidFlagrunHarderBulletEnv-v0",
     entry_point="pybullet_envs_gymnasium.gym_locomotion_envs:HumanoidFlagrunHarderBulletEnv",
+    vector_entry_point=partial(_make_vector_env, "pybullet_envs_gymnasium.gym_locomotion_envs:HumanoidFlagrunHarderBulletEnv"),
     max_episode_steps=1000,
 )
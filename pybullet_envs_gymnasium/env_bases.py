@@ -1,3 +1,8 @@
+import abc
+import asyncio
+import collections
+import copy
+import functools
 import os
 import time
 from typing import ClassVar
@@ -17,7 +22,7 @@ except ImportError:
     pass
 
 
-class MJCFBaseBulletEnv(gymnasium.Env):
+class MJCFBaseBulletEnv(gymnasium.Env, abc.ABC):
     """
     Base class for Bullet physics simulation loading MJCF (MuJoCo .xml) environments in a Scene.
     These environments create single-player scenes and behave like normal Gym environments, if
@@ -25,8 +30,22 @@ class MJCFBaseBulletEnv(gymnasium.Env):
     """
 
     metadata: ClassVar = {"render_modes": ["human", "rgb_array"], "render_fps": 60}  # type: ignore[misc]
+    # names of the reward components, see self.rewards
+    reward_fields: ClassVar[tuple[str, ...]] = ("reward",)
+    # Python attributes of the current episode besides the bullet state and the robot ones, see clone_state()
+    episode_attributes: ClassVar[tuple[str, ...]] = ("frame", "done", "reward", "potential")
+    # runs the blocking calls of areset() and astep(), None for the default executor of the event loop
+    executor = None
 
-    def __init__(self, robot, render_mode=None):
+    def __init__(
+        self,
+        robot,
+        render_mode=None,
+        obs_view=False,
+        reward_info=False,
+        reset_pool_size=0,
+        state_pool_size=256,
+    ):
         self.scene = None
         self.physicsClientId = -1
         self.ownsPhysicsClient = 0
@@ -34,6 +53,21 @@ class MJCFBaseBulletEnv(gymnasium.Env):
         self.render_mode = render_mode
         self.should_render = render_mode == "human"
         self.robot = robot
+        # reset_pool_size > 0: resets restore pre-sampled initial states, see fill_reset_pool()
+        if reset_pool_size > 0 and not hasattr(self, "stateId"):
+            raise ValueError(f"{type(self).__name__} does not restore a saved state on reset, it cannot use a reset pool")
+        self.reset_pool_size = reset_pool_size
+        self._reset_pool = collections.deque()  # (bullet state id, robot episode state)
+        # resets that restored a pre-sampled state, and resets that found the pool empty and had to fill it
+        self.reset_pool_hits = 0
+        self.reset_pool_misses = 0
+        # States saved by clone_state(), least recently used first: handle -> (bullet state id, episode state).
+        # Beyond state_pool_size, the least recently used one is removed from the physics server
+        if state_pool_size < 1:
+            raise ValueError(f"state_pool_size must be at least 1, got {state_pool_size}")
+        self.state_pool_size = state_pool_size
+        self._saved_states = collections.OrderedDict()
+        self._next_state_handle = 0
         self.seed()
         self._cam_dist = 3
         self._cam_yaw = 0
@@ -43,6 +77,25 @@ class MJCFBaseBulletEnv(gymnasium.Env):
 
         self.action_space = robot.action_space
         self.observation_space = robot.observation_space
+        # obs_view=True returns a read-only view of robot.obs_buffer instead of a copy,
+        # valid until the next step() or reset()
+        self.obs_view = obs_view
+        # the view, and the buffer it was made from: numpy collapses .base to the owner of the memory,
+        # which is not the buffer when it is itself a view (e.g. a row of a shared batch array)
+        self._obs_view = None
+        self._obs_view_source = None
+        # Reward components of the last step, overwritten in place by step():
+        # self.rewards is a record of reward_buffer, indexable by position or by field name.
+        # reward_info=True adds reward_buffer to the step() info dict, under "rewards"
+        self.reward_buffer = np.zeros((), dtype=[(name, np.float64) for name in self.reward_fields])
+        self.rewards = self.reward_buffer[()]
+        self._reward_values = self.reward_buffer.reshape(1).view(np.float64)
+        self.reward_info = reward_info
+        # autoreset=True: step() resets a terminated episode right away (same step autoreset) and returns
+        # the first observation of the next one, the last ones are in the info dict: "final_obs" and "final_info".
+        # Set by the vector envs on the environments they create without wrappers: not a constructor argument,
+        # since under gym.make() the reset would bypass the wrappers, e.g. the step counter of TimeLimit
+        self.autoreset = False
         # self.reset()
 
     def configure(self, args):
@@ -51,6 +104,7 @@ class MJCFBaseBulletEnv(gymnasium.Env):
     def seed(self, seed=None):
         self.np_random, seed = gymnasium.utils.seeding.np_random(seed)
         self.robot.np_random = self.np_random  # use the same np_randomizer for robot as for env
+        self.clear_reset_pool()  # sampled from the previous random stream
         return [seed]
 
     def reset(self, seed=None, options=None):
@@ -87,13 +141,302 @@ class MJCFBaseBulletEnv(gymnasium.Env):
             self.scene.episode_restart(self._p)
 
         self.robot.scene = self.scene
+        self.scene.advance_sim_frame()  # the state may have been restored
 
         self.frame = 0
         self.done = 0
         self.reward = 0
-        s = self.robot.reset(self._p)
+        if self.reset_pool_size > 0 and self.stateId >= 0:
+            s = self._reset_from_pool()
+        else:
+            s = self._reset_robot()
         self.potential = self.robot.calc_potential()
-        return s.astype(np.float32), {}
+        return self._get_obs(s), {}
+
+    def _reset_robot(self):
+        """
+        Reset the robot, loading it on the first call.
+
+        :return: the state of the robot, read by calc_potential()
+        """
+        return self.robot.reset(self._p)
+
+    def join_scene(self, bullet_client, scene, player_n):
+        """
+        Put the robot into a multiplayer scene shared with other environments, instead of a
+        single-player scene in a physics client of its own. Call it before the first reset().
+        The owner of the scene restarts it, applies the actions of all the robots and calls
+        ``scene.global_step()``, step() then only computes the observation and the reward.
+
+        :param bullet_client: physics client of the scene, not closed by close()
+        :param scene: a multiplayer scene
+        :param player_n: index of the robot in the scene
+        """
+        if self.physicsClientId >= 0:
+            raise RuntimeError("join_scene() must be called before the first reset()")
+        if self.reset_pool_size > 0:
+            raise ValueError("Robots in a shared world cannot use a reset pool, it restores the whole world")
+        self._p = bullet_client
+        self.physicsClientId = bullet_client._client
+        self.ownsPhysicsClient = False
+        self.scene = scene
+        self.robot.player_n = player_n
+
+    async def areset(self, seed=None, options=None):
+        """
+        reset() for asyncio code: it runs in ``executor`` and the event loop serves other tasks meanwhile.
+        Do not call it while another reset() or step() of this environment is running.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(self.reset, seed=seed, options=options))
+
+    async def astep(self, a):
+        """
+        step() for asyncio code: it runs in ``executor`` and the event loop serves other tasks meanwhile.
+        Do not call it while another reset() or step() of this environment is running.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.step, a)
+
+    def step(self, a):
+        # if multiplayer, action first applied to all robots,
+        # then global step() called, then step() for all robots with the same actions
+        if not self.scene.multiplayer:
+            self.simulate(a)
+        return self.finish_step(a)
+
+    def simulate(self, a):
+        """
+        First half of step(): apply the action and advance the simulation, nothing but bullet calls.
+
+        :param a: action
+        """
+        self.robot.apply_action(a)
+        self.scene.global_step()
+
+    @abc.abstractmethod
+    def observe(self, a):
+        """
+        Second half of step(): observation, reward and termination after the simulation step.
+
+        :param a: action of the step
+        :return: observation, reward, terminated, truncated and info, like step()
+        """
+
+    def finish_step(self, a):
+        """
+        observe(), then with ``autoreset``, reset the episode if it terminated.
+
+        :param a: action of the step
+        :return: observation, reward, terminated, truncated and info, like step()
+        """
+        obs, reward, terminated, truncated, info = self.observe(a)
+        if self.autoreset and terminated:
+            # the observation may be a view of the robot buffer, that reset() overwrites
+            final = {"final_obs": np.array(obs), "final_info": info}
+            obs, info = self.reset()
+            info = {**info, **final}
+        return obs, reward, terminated, truncated, info
+
+    def step_many(self, actions, all_observations=True, out=None):
+        """
+        Run an open-loop sequence of steps in a tight loop, without the info dicts, the observation copies
+        and the wrappers of step(). It stops after the step that terminates the episode, which is not reset,
+        even with ``autoreset``. Episode truncation (``max_episode_steps``) is left to the caller.
+
+        :param actions: the T actions, shape ``(T, *action_space.shape)``
+        :param all_observations: write the observation of every step, or only return the last one
+            when only the rewards or the final state are needed
+        :param out: ``(observations, rewards, terminations)`` arrays of shapes ``(T, *obs_shape)``, ``(T,)`` and ``(T,)``
+            to write into instead of new ones, ``observations`` is ignored without ``all_observations``
+        :return: observations (``(T, *obs_shape)``, or the last one without ``all_observations``),
+            rewards, terminations and the number of steps run n. Rows from n on are left untouched.
+        """
+        if self.scene is None or self.scene.multiplayer:
+            raise RuntimeError("step_many() needs a single player environment, call reset() first")
+        n_steps = len(actions)
+        obs_buffer = self.robot.obs_buffer
+        if out is None:
+            observations = np.zeros((n_steps, *obs_buffer.shape), dtype=obs_buffer.dtype) if all_observations else None
+            rewards = np.zeros(n_steps)
+            terminations = np.zeros(n_steps, dtype=np.bool_)
+        else:
+            observations, rewards, terminations = out
+        obs_view = self.obs_view
+        # observe() hands out views of the buffer calc_state() wrote into, not copies
+        self.obs_view = True
+        t = 0
+        try:
+            while t < n_steps:
+                if all_observations:
+                    # calc_state() writes the observation straight into its row
+                    self.robot.obs_buffer = observations[t]
+                self.simulate(actions[t])
+                _, rewards[t], terminated, _, _ = self.observe(actions[t])
+                terminations[t] = terminated
+                t += 1
+                if terminated:
+                    break
+        finally:
+            self.robot.obs_buffer = obs_buffer
+            self.obs_view = obs_view
+        if not all_observations:
+            return obs_buffer.copy(), rewards, terminations, t
+        if t > 0:
+            obs_buffer[:] = observations[t - 1]
+        return observations, rewards, terminations, t
+
+    def fill_reset_pool(self, keep_current_state=True, n_states=None):
+        """
+        Pre-sample initial states until the reset pool holds ``reset_pool_size`` of them.
+        Each one is sampled like a reset does: restore the initial saved state, then ``robot_specific_reset()``,
+        drawing from ``np_random`` in the same order as the same number of consecutive resets.
+        The episode start distribution is unchanged, and for robots that only use the random generator
+        on reset, so is the sequence of episodes for a given seed.
+
+        The pool is refilled lazily by reset() when it is empty, call this method to refill it
+        at a more convenient time, e.g. at startup.
+
+        :param keep_current_state: save the current episode and restore it afterwards,
+            set to False when the simulation is about to be reset anyway
+        :param n_states: add at most that many states, all the missing ones by default
+        """
+        if self.stateId < 0:
+            raise RuntimeError("Call reset() once before filling the reset pool")
+        size = self.reset_pool_size if n_states is None else min(self.reset_pool_size, len(self._reset_pool) + n_states)
+        if len(self._reset_pool) >= size:
+            return
+        if keep_current_state:
+            current_state_id = self._p.saveState()
+            episode_state = self.robot.get_episode_state()
+        while len(self._reset_pool) < size:
+            self._p.restoreState(self.stateId)
+            self.scene.advance_sim_frame()
+            self.robot.robot_specific_reset(self._p)
+            self._reset_pool.append((self._p.saveState(), self.robot.get_episode_state()))
+        if keep_current_state:
+            self._p.restoreState(current_state_id)
+            self._p.removeState(current_state_id)
+            self.robot.set_episode_state(episode_state)
+        self.scene.advance_sim_frame()
+
+    def missing_reset_states(self):
+        """
+        :return: the number of states fill_reset_pool() would add, 0 before the first reset()
+        """
+        if self.reset_pool_size == 0 or self.physicsClientId < 0 or self.stateId < 0:
+            return 0
+        return self.reset_pool_size - len(self._reset_pool)
+
+    def clear_reset_pool(self):
+        """
+        Discard the pre-sampled initial states.
+        """
+        while self._reset_pool:
+            state_id, _ = self._reset_pool.popleft()
+            if self.physicsClientId >= 0:
+                self._p.removeState(state_id)
+
+    def _reset_from_pool(self):
+        if self._reset_pool:
+            self.reset_pool_hits += 1
+        else:
+            self.reset_pool_misses += 1
+            self.fill_reset_pool(keep_current_state=False)
+        state_id, episode_state = self._reset_pool.popleft()
+        self._p.restoreState(state_id)
+        self._p.removeState(state_id)
+        self.scene.advance_sim_frame()
+        self.robot.set_episode_state(episode_state)
+        return self.robot.calc_state()
+
+    def clone_state(self):
+        """
+        Save the current state of the episode: the bullet state, the episode attributes of the environment
+        and of the robot (e.g. potential, initial height, feet contacts, flag target), the random generator
+        state and the last observation. Only the ``state_pool_size`` most recently used states are kept,
+        the older ones are removed from the physics server.
+
+        :return: handle for restore_state()
+        """
+        if self.scene is None or self.scene.multiplayer:
+            raise RuntimeError("clone_state() needs a single player environment, call reset() first")
+        episode_state = {
+            "env": {name: copy.copy(getattr(self, name)) for name in self.episode_attributes},
+            "robot": self.robot.get_episode_state(),
+            "np_random": copy.deepcopy(self.np_random.bit_generator.state),
+            "obs": self.robot.obs_buffer.copy(),
+        }
+        handle = self._next_state_handle
+        self._next_state_handle += 1
+        self._saved_states[handle] = (self._p.saveState(), episode_state)
+        if len(self._saved_states) > self.state_pool_size:
+            self.release_state(next(iter(self._saved_states)))
+        return handle
+
+    def restore_state(self, handle):
+        """
+        Go back to a state saved by clone_state(), the handle stays valid.
+
+        :param handle: result of clone_state()
+        :return: the observation of that state
+        """
+        if handle not in self._saved_states:
+            raise ValueError(
+                f"Unknown state handle {handle!r}: released, or evicted from the {self.state_pool_size} most recent states"
+            )
+        self._saved_states.move_to_end(handle)
+        state_id, episode_state = self._saved_states[handle]
+        self._p.restoreState(state_id)
+        self.scene.advance_sim_frame()
+        for name, value in episode_state["env"].items():
+            setattr(self, name, copy.copy(value))
+        self.robot.set_episode_state(episode_state["robot"])
+        # in place, the robot shares the generator
+        self.np_random.bit_generator.state = copy.deepcopy(episode_state["np_random"])
+        self.robot.obs_buffer[:] = episode_state["obs"]
+        return self._get_obs(self.robot.obs_buffer)
+
+    def release_state(self, handle):
+        """
+        Remove a state saved by clone_state() from the physics server, its handle becomes invalid.
+
+        :param handle: result of clone_state()
+        """
+        state_id, _ = self._saved_states.pop(handle)
+        if self.physicsClientId >= 0:
+            self._p.removeState(state_id)
+
+    def _get_obs(self, state):
+        """
+        Observation handed out by reset() and step().
+
+        :param state: the robot observation buffer filled by ``calc_state()``
+        :return: a copy of ``state``, or a read-only view of it if ``obs_view`` is set
+        """
+        if not self.obs_view:
+            return state.copy()
+        if self._obs_view_source is not state:
+            self._obs_view = state.view()
+            self._obs_view.flags.writeable = False
+            self._obs_view_source = state
+        return self._obs_view
+
+    def _get_reward(self):
+        """
+        :return: the sum of the reward components of the last step
+        """
+        return self._reward_values.sum()
+
+    def _get_info(self):
+        """
+        info dict returned by step().
+
+        :return: ``{"rewards": reward_buffer}`` if ``reward_info`` is set, an empty dict otherwise.
+            The reward breakdown is a view, overwritten by the next step()
+        """
+        if self.reward_info:
+            return {"rewards": self.reward_buffer}
+        return {}
 
     def camera_adjust(self):
         pass
@@ -124,7 +467,7 @@ class MJCFBaseBulletEnv(gymnasium.Env):
             proj_matrix = self._p.computeProjectionMatrixFOV(
                 fov=60, aspect=float(self._render_width) / self._render_height, nearVal=0.1, farVal=100.0
             )
-            (_, _, px, _, _) = self._p.getCameraImage(
+            _, _, px, _, _ = self._p.getCameraImage(
                 width=self._render_width,
                 height=self._render_height,
                 viewMatrix=view_matrix,
@@ -145,6 +488,9 @@ class MJCFBaseBulletEnv(gymnasium.Env):
             if self.physicsClientId >= 0:
                 self._p.disconnect()
         self.physicsClientId = -1
+        # the saved states are gone with the physics server
+        self._reset_pool.clear()
+        self._saved_states.clear()
 
     def HUD(self, state, a, done):
         pass
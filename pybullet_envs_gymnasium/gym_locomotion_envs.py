@@ -24,62 +24,66 @@ class WalkerBaseBulletEnv(MJCFBaseBulletEnv):
     foot_collision_cost = -1.0  # touches another leg, or other objects, that cost makes robot avoid smashing feet into itself
     foot_ground_object_names: ClassVar = set(["floor"])  # to distinguish ground and other objects
     joints_at_limit_cost = -0.1  # discourage stuck joints
+    reward_fields: ClassVar[tuple[str, ...]] = ("alive", "progress", "electricity", "joints_at_limit", "feet_collision")
 
-    def __init__(self, robot, render_mode=None):
+    def __init__(self, robot, render_mode=None, **kwargs):
         # print("WalkerBase::__init__ start")
         self.camera_x = 0
         self.walk_target_x = 1e3  # kilometer away
         self.walk_target_y = 0
         self.stateId = -1
-        MJCFBaseBulletEnv.__init__(self, robot, render_mode=render_mode)
+        self.ground_ids = None
+        MJCFBaseBulletEnv.__init__(self, robot, render_mode=render_mode, **kwargs)
 
     def create_single_player_scene(self, bullet_client):
         self.stadium_scene = SinglePlayerStadiumScene(bullet_client, gravity=9.8, timestep=0.0165 / 4, frame_skip=4)
         return self.stadium_scene
 
+    def join_scene(self, bullet_client, scene, player_n):
+        MJCFBaseBulletEnv.join_scene(self, bullet_client, scene, player_n)
+        self.stadium_scene = scene
+
     def reset(self, seed=None, options=None):
-        if self.stateId >= 0:
+        if self.scene is not None and self.scene.multiplayer:
+            if self.ground_ids is not None:
+                # The world is shared with other robots, only reset this one
+                self.robot.set_body_states(self.robot.loaded_body_states)
+        elif self.stateId >= 0:
             # print("restoreState self.stateId:",self.stateId)
             self._p.restoreState(self.stateId)
 
         r, info = MJCFBaseBulletEnv.reset(self, seed=seed, options=options)
-        self._p.configureDebugVisualizer(pybullet.COV_ENABLE_RENDERING, 0)
-
-        self.parts, self.jdict, self.ordered_joints, self.robot_body = self.robot.addToScene(
-            self._p, self.stadium_scene.ground_plane_mjcf
-        )
-        self.ground_ids = set(
-            [
-                (self.parts[f].bodies[self.parts[f].bodyIndex], self.parts[f].bodyPartIndex)
-                for f in self.foot_ground_object_names
-            ]
-        )
-        self._p.configureDebugVisualizer(pybullet.COV_ENABLE_RENDERING, 1)
-        if self.stateId < 0:
+        if self.stateId < 0 and not self.scene.multiplayer:
             self.stateId = self._p.saveState()
             # print("saving state self.stateId:",self.stateId)
 
         return r, info
 
+    def _reset_robot(self):
+        if self.ground_ids is None:
+            # Resolve the ground parts, joint tables and ground ids once: the bodies do not change
+            # afterwards and restoreState() puts them back in their saved configuration.
+            # Before the first robot reset, since the ground parts count in the mean position
+            # of the parts (robot.body_xyz), thus in the potential
+            self.robot.load(self._p)
+            self._p.configureDebugVisualizer(pybullet.COV_ENABLE_RENDERING, 0)
+
+            self.parts, self.jdict, self.ordered_joints, self.robot_body = self.robot.addToScene(
+                self._p, self.stadium_scene.ground_plane_mjcf
+            )
+            self.ground_ids = set(
+                [
+                    (self.parts[f].bodies[self.parts[f].bodyIndex], self.parts[f].bodyPartIndex)
+                    for f in self.foot_ground_object_names
+                ]
+            )
+            self._p.configureDebugVisualizer(pybullet.COV_ENABLE_RENDERING, 1)
+        return MJCFBaseBulletEnv._reset_robot(self)
+
     def _isDone(self):
         return self._alive < 0
 
-    def move_robot(self, init_x, init_y, init_z):
-        "Used by multiplayer stadium to move sideways, to another running lane."
-        self.cpp_robot.query_position()
-        pose = self.cpp_robot.root_part.pose()
-        pose.move_xyz(
-            init_x, init_y, init_z
-        )  # Works because robot loads around (0,0,0), and some robots have z != 0 that is left intact
-        self.cpp_robot.set_pose(pose)
-
-    def step(self, a):
-        # if multiplayer, action first applied to all robots,
-        # then global step() called, then _step() for all robots with the same actions
-        if not self.scene.multiplayer:
-            self.robot.apply_action(a)
-            self.scene.global_step()
-
+    def observe(self, a):
         state = self.robot.calc_state()  # also calculates self.joints_at_limit
 
         self._alive = float(
@@ -92,25 +96,19 @@ class WalkerBaseBulletEnv(MJCFBaseBulletEnv):
 
         potential_old = self.potential
         self.potential = self.robot.calc_potential()
-        progress = float(self.potential - potential_old)
+        progress = self.potential - potential_old
 
         feet_collision_cost = 0.0
-        for i, f in enumerate(self.robot.feet):  # TODO: Maybe calculating feet contacts could be done within the robot code
-            contact_ids = set((x[2], x[4]) for x in f.contact_list())
-            # print("CONTACT OF '%d' WITH %d" % (contact_ids, ",".join(contact_names)) )
-            if self.ground_ids & contact_ids:
-                # see Issue 63: https://github.com/openai/roboschool/issues/63
-                # feet_collision_cost += self.foot_collision_cost
-                self.robot.feet_contact[i] = 1.0
-            else:
-                self.robot.feet_contact[i] = 0.0
+        # see Issue 63: https://github.com/openai/roboschool/issues/63
+        # feet_collision_cost += self.foot_collision_cost for each foot in contact
+        self.robot.calc_feet_contact(self.ground_ids)
 
         electricity_cost = self.electricity_cost * float(
             np.abs(a * self.robot.joint_speeds).mean()
         )  # let's assume we have DC motor with controller, and reverse current braking
         electricity_cost += self.stall_torque_cost * float(np.square(a).mean())
 
-        joints_at_limit_cost = float(self.joints_at_limit_cost * self.robot.joints_at_limit)
+        joints_at_limit_cost = self.joints_at_limit_cost * self.robot.joints_at_limit
         debugmode = 0
         if debugmode:
             print("alive=")
@@ -124,16 +122,22 @@ class WalkerBaseBulletEnv(MJCFBaseBulletEnv):
             print("feet_collision_cost")
             print(feet_collision_cost)
 
-        self.rewards = [self._alive, progress, electricity_cost, joints_at_limit_cost, feet_collision_cost]
+        rewards = self.rewards
+        rewards["alive"] = self._alive
+        rewards["progress"] = progress
+        rewards["electricity"] = electricity_cost
+        rewards["joints_at_limit"] = joints_at_limit_cost
+        rewards["feet_collision"] = feet_collision_cost
+        reward = self._get_reward()
         if debugmode:
             print("rewards=")
             print(self.rewards)
             print("sum rewards")
-            print(sum(self.rewards))
+            print(reward)
         self.HUD(state, a, done)
-        self.reward += sum(self.rewards)
+        self.reward += reward
 
-        return state, sum(self.rewards), bool(done), False, {}
+        return self._get_obs(state), reward, bool(done), False, self._get_info()
 
     def camera_adjust(self):
         x, y, z = self.robot.body_real_xyz
@@ -143,39 +147,39 @@ class WalkerBaseBulletEnv(MJCFBaseBulletEnv):
 
 
 class HopperBulletEnv(WalkerBaseBulletEnv):
-    def __init__(self, render_mode=None):
+    def __init__(self, render_mode=None, **kwargs):
         self.robot = Hopper()
-        WalkerBaseBulletEnv.__init__(self, self.robot, render_mode=render_mode)
+        WalkerBaseBulletEnv.__init__(self, self.robot, render_mode=render_mode, **kwargs)
 
 
 class Walker2DBulletEnv(WalkerBaseBulletEnv):
-    def __init__(self, render_mode=None):
+    def __init__(self, render_mode=None, **kwargs):
         self.robot = Walker2D()
-        WalkerBaseBulletEnv.__init__(self, self.robot, render_mode=render_mode)
+        WalkerBaseBulletEnv.__init__(self, self.robot, render_mode=render_mode, **kwargs)
 
 
 class HalfCheetahBulletEnv(WalkerBaseBulletEnv):
-    def __init__(self, render_mode=None):
+    def __init__(self, render_mode=None, **kwargs):
         self.robot = HalfCheetah()
-        WalkerBaseBulletEnv.__init__(self, self.robot, render_mode=render_mode)
+        WalkerBaseBulletEnv.__init__(self, self.robot, render_mode=render_mode, **kwargs)
 
     def _isDone(self):
         return False
 
 
 class AntBulletEnv(WalkerBaseBulletEnv):
-    def __init__(self, render_mode=None):
+    def __init__(self, render_mode=None, **kwargs):
         self.robot = Ant()
-        WalkerBaseBulletEnv.__init__(self, self.robot, render_mode=render_mode)
+        WalkerBaseBulletEnv.__init__(self, self.robot, render_mode=render_mode, **kwargs)
 
 
 class HumanoidBulletEnv(WalkerBaseBulletEnv):
-    def __init__(self, robot=None, render_mode=None):
+    def __init__(self, robot=None, render_mode=None, **kwargs):
         if robot is None:
             self.robot = Humanoid()
         else:
             self.robot = robot
-        WalkerBaseBulletEnv.__init__(self, self.robot, render_mode=render_mode)
+        WalkerBaseBulletEnv.__init__(self, self.robot, render_mode=render_mode, **kwargs)
         self.electricity_cost = 4.25 * WalkerBaseBulletEnv.electricity_cost
         self.stall_torque_cost = 4.25 * WalkerBaseBulletEnv.stall_torque_cost
 
@@ -183,9 +187,9 @@ class HumanoidBulletEnv(WalkerBaseBulletEnv):
 class HumanoidFlagrunBulletEnv(HumanoidBulletEnv):
     random_yaw = True
 
-    def __init__(self, render_mode=None):
+    def __init__(self, render_mode=None, **kwargs):
         self.robot = HumanoidFlagrun()
-        HumanoidBulletEnv.__init__(self, self.robot, render_mode=render_mode)
+        HumanoidBulletEnv.__init__(self, self.robot, render_mode=render_mode, **kwargs)
 
     def create_single_player_scene(self, bullet_client):
         s = HumanoidBulletEnv.create_single_player_scene(self, bullet_client)
@@ -196,10 +200,10 @@ class HumanoidFlagrunBulletEnv(HumanoidBulletEnv):
 class HumanoidFlagrunHarderBulletEnv(HumanoidBulletEnv):
     random_lean = True  # can fall on start
 
-    def __init__(self, render_mode=None):
+    def __init__(self, render_mode=None, **kwargs):
         self.robot = HumanoidFlagrunHarder()
         self.electricity_cost /= 4  # don't care that much about electricity, just stand up!
-        HumanoidBulletEnv.__init__(self, self.robot, render_mode=render_mode)
+        HumanoidBulletEnv.__init__(self, self.robot, render_mode=render_mode, **kwargs)
 
     def create_single_player_scene(self, bullet_client):
         s = HumanoidBulletEnv.create_single_player_scene(self, bullet_client)
@@ -1,3 +1,5 @@
+from typing import ClassVar
+
 import numpy as np
 
 from pybullet_envs_gymnasium.env_bases import MJCFBaseBulletEnv
@@ -6,18 +8,17 @@ from pybullet_envs_gymnasium.scene_abstract import SingleRobotEmptyScene
 
 
 class ReacherBulletEnv(MJCFBaseBulletEnv):
-    def __init__(self, render_mode=None):
+    reward_fields: ClassVar[tuple[str, ...]] = ("progress", "electricity", "stuck_joint")
+
+    def __init__(self, render_mode=None, **kwargs):
         self.robot = Reacher()
-        MJCFBaseBulletEnv.__init__(self, self.robot, render_mode)
+        MJCFBaseBulletEnv.__init__(self, self.robot, render_mode, **kwargs)
 
     def create_single_player_scene(self, bullet_client):
         return SingleRobotEmptyScene(bullet_client, gravity=0.0, timestep=0.0165, frame_skip=1)
 
-    def step(self, a):
+    def observe(self, a):
         assert not self.scene.multiplayer
-        self.robot.apply_action(a)
-        self.scene.global_step()
-
         state = self.robot.calc_state()  # sets self.to_target_vec
 
         potential_old = self.potential
@@ -29,9 +30,12 @@ class ReacherBulletEnv(MJCFBaseBulletEnv):
             np.abs(a[0]) + np.abs(a[1])
         )  # stall torque require some energy
         stuck_joint_cost = -0.1 if np.abs(np.abs(self.robot.gamma) - 1) < 0.01 else 0.0
-        self.rewards = [float(self.potential - potential_old), float(electricity_cost), float(stuck_joint_cost)]
+        rewards = self.rewards
+        rewards["progress"] = self.potential - potential_old
+        rewards["electricity"] = electricity_cost
+        rewards["stuck_joint"] = stuck_joint_cost
         self.HUD(state, a, False)
-        return state.astype(np.float32), sum(self.rewards), False, False, {}
+        return self._get_obs(state), self._get_reward(), False, False, self._get_info()
 
     def camera_adjust(self):
         x, y, z = self.robot.fingertip.pose().xyz()
@@ -41,17 +45,16 @@ class ReacherBulletEnv(MJCFBaseBulletEnv):
 
 
 class PusherBulletEnv(MJCFBaseBulletEnv):
-    def __init__(self, render_mode=None):
+    reward_fields: ClassVar[tuple[str, ...]] = ("progress", "electricity", "stuck_joint")
+
+    def __init__(self, render_mode=None, **kwargs):
         self.robot = Pusher()
-        MJCFBaseBulletEnv.__init__(self, self.robot, render_mode)
+        MJCFBaseBulletEnv.__init__(self, self.robot, render_mode, **kwargs)
 
     def create_single_player_scene(self, bullet_client):
         return SingleRobotEmptyScene(bullet_client, gravity=9.81, timestep=0.0020, frame_skip=5)
 
-    def step(self, a):
-        self.robot.apply_action(a)
-        self.scene.global_step()
-
+    def observe(self, a):
         state = self.robot.calc_state()  # sets self.to_target_vec
 
         potential_old = self.potential
@@ -81,9 +84,12 @@ class PusherBulletEnv(MJCFBaseBulletEnv):
             if np.abs(j.current_relative_position()[0]) - 1 < 0.01:
                 stuck_joint_cost += -0.1
 
-        self.rewards = [float(self.potential - potential_old), float(electricity_cost), float(stuck_joint_cost)]
+        rewards = self.rewards
+        rewards["progress"] = self.potential - potential_old
+        rewards["electricity"] = electricity_cost
+        rewards["stuck_joint"] = stuck_joint_cost
         self.HUD(state, a, False)
-        return state.astype(np.float32), sum(self.rewards), False, False, {}
+        return self._get_obs(state), self._get_reward(), False, False, self._get_info()
 
     def calc_potential(self):
         return -100 * np.linalg.norm(self.to_target_vec)
@@ -96,16 +102,16 @@ class PusherBulletEnv(MJCFBaseBulletEnv):
 
 
 class ThrowerBulletEnv(MJCFBaseBulletEnv):
-    def __init__(self, render_mode=None):
+    reward_fields: ClassVar[tuple[str, ...]] = ("progress", "electricity", "stuck_joint", "distance", "control")
+
+    def __init__(self, render_mode=None, **kwargs):
         self.robot = Thrower()
-        MJCFBaseBulletEnv.__init__(self, self.robot, render_mode)
+        MJCFBaseBulletEnv.__init__(self, self.robot, render_mode, **kwargs)
 
     def create_single_player_scene(self, bullet_client):
         return SingleRobotEmptyScene(bullet_client, gravity=0.0, timestep=0.0020, frame_skip=5)
 
-    def step(self, a):
-        self.robot.apply_action(a)
-        self.scene.global_step()
+    def observe(self, a):
         state = self.robot.calc_state()  # sets self.to_target_vec
 
         potential_old = self.potential
@@ -151,15 +157,14 @@ class ThrowerBulletEnv(MJCFBaseBulletEnv):
             reward_dist = -np.linalg.norm(object_xy - target_xy)
         reward_ctrl = -np.square(a).sum()
 
-        self.rewards = [
-            float(self.potential - potential_old),
-            float(electricity_cost),
-            float(stuck_joint_cost),
-            reward_dist,
-            0.002 * reward_ctrl,
-        ]
+        rewards = self.rewards
+        rewards["progress"] = self.potential - potential_old
+        rewards["electricity"] = electricity_cost
+        rewards["stuck_joint"] = stuck_joint_cost
+        rewards["distance"] = reward_dist
+        rewards["control"] = 0.002 * reward_ctrl
         self.HUD(state, a, False)
-        return state.astype(np.float32), sum(self.rewards), False, False, {}
+        return self._get_obs(state), self._get_reward(), False, False, self._get_info()
 
     def camera_adjust(self):
         x, y, z = self.robot.fingertip.pose().xyz()
@@ -1,3 +1,5 @@
+from typing import ClassVar
+
 import numpy as np
 
 from pybullet_envs_gymnasium.env_bases import MJCFBaseBulletEnv
@@ -6,10 +8,12 @@ from pybullet_envs_gymnasium.scene_abstract import SingleRobotEmptyScene
 
 
 class InvertedPendulumBulletEnv(MJCFBaseBulletEnv):
-    def __init__(self, render_mode=None):
+    reward_fields: ClassVar[tuple[str, ...]] = ("balance",)
+
+    def __init__(self, render_mode=None, **kwargs):
         self.robot = InvertedPendulum()
-        MJCFBaseBulletEnv.__init__(self, self.robot, render_mode)
         self.stateId = -1
+        MJCFBaseBulletEnv.__init__(self, self.robot, render_mode, **kwargs)
 
     def create_single_player_scene(self, bullet_client):
         return SingleRobotEmptyScene(bullet_client, gravity=9.8, timestep=0.0165, frame_skip=1)
@@ -22,11 +26,9 @@ class InvertedPendulumBulletEnv(MJCFBaseBulletEnv):
         if self.stateId < 0:
             self.stateId = self._p.saveState()
             # print("InvertedPendulumBulletEnv reset self.stateId=",self.stateId)
-        return r.astype(np.float32), info
+        return r, info
 
-    def step(self, a):
-        self.robot.apply_action(a)
-        self.scene.global_step()
+    def observe(self, a):
         state = self.robot.calc_state()  # sets self.pos_x self.pos_y
         if self.robot.swingup:
             reward = np.cos(self.robot.theta)
@@ -34,26 +36,28 @@ class InvertedPendulumBulletEnv(MJCFBaseBulletEnv):
         else:
             reward = 1.0
             done = np.abs(self.robot.theta) > 0.2
-        self.rewards = [float(reward)]
+        self.rewards["balance"] = reward
         self.HUD(state, a, done)
-        return state.astype(np.float32), sum(self.rewards), bool(done), False, {}
+        return self._get_obs(state), self._get_reward(), bool(done), False, self._get_info()
 
     def camera_adjust(self):
         self.camera.move_and_look_at(0, 1.2, 1.0, 0, 0, 0.5)
 
 
 class InvertedPendulumSwingupBulletEnv(InvertedPendulumBulletEnv):
-    def __init__(self, render_mode=None):
+    def __init__(self, render_mode=None, **kwargs):
         self.robot = InvertedPendulumSwingup()
-        MJCFBaseBulletEnv.__init__(self, self.robot, render_mode)
         self.stateId = -1
+        MJCFBaseBulletEnv.__init__(self, self.robot, render_mode, **kwargs)
 
 
 class InvertedDoublePendulumBulletEnv(MJCFBaseBulletEnv):
-    def __init__(self, render_mode=None):
+    reward_fields: ClassVar[tuple[str, ...]] = ("alive", "distance", "velocity")
+
+    def __init__(self, render_mode=None, **kwargs):
         self.robot = InvertedDoublePendulum()
-        MJCFBaseBulletEnv.__init__(self, self.robot, render_mode)
         self.stateId = -1
+        MJCFBaseBulletEnv.__init__(self, self.robot, render_mode, **kwargs)
 
     def create_single_player_scene(self, bullet_client):
         return SingleRobotEmptyScene(bullet_client, gravity=9.8, timestep=0.0165, frame_skip=1)
@@ -64,11 +68,9 @@ class InvertedDoublePendulumBulletEnv(MJCFBaseBulletEnv):
         r, info = MJCFBaseBulletEnv.reset(self, seed=seed, options=options)
         if self.stateId < 0:
             self.stateId = self._p.saveState()
-        return r.astype(np.float32), info
+        return r, info
 
-    def step(self, a):
-        self.robot.apply_action(a)
-        self.scene.global_step()
+    def observe(self, a):
         state = self.robot.calc_state()  # sets self.pos_x self.pos_y
         # upright position: 0.6 (one pole) + 0.6 (second pole) * 0.5 (middle of second pole) = 0.9
         # using <site> tag in original xml, upright position is 0.6 + 0.6 = 1.2, difference +0.3
@@ -78,9 +80,12 @@ class InvertedDoublePendulumBulletEnv(MJCFBaseBulletEnv):
         vel_penalty = 0
         alive_bonus = 10
         done = self.robot.pos_y + 0.3 <= 1
-        self.rewards = [float(alive_bonus), float(-dist_penalty), float(-vel_penalty)]
+        rewards = self.rewards
+        rewards["alive"] = alive_bonus
+        rewards["distance"] = -dist_penalty
+        rewards["velocity"] = -vel_penalty
         self.HUD(state, a, done)
-        return state.astype(np.float32), sum(self.rewards), bool(done), False, {}
+        return self._get_obs(state), self._get_reward(), bool(done), False, self._get_info()
 
     def camera_adjust(self):
         self.camera.move_and_look_at(0, 1.2, 1.2, 0, 0, 0.5)
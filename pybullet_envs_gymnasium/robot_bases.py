@@ -1,4 +1,7 @@
+import copy
 import os
+from typing import ClassVar
+from xml.etree import ElementTree
 
 import gymnasium
 import gymnasium.spaces
@@ -14,6 +17,9 @@ class XmlBasedRobot:
     """
 
     self_collision = True
+    # Python attributes that describe the current episode besides the bullet state,
+    # see get_episode_state()
+    episode_attributes: ClassVar[tuple[str, ...]] = ()
 
     def __init__(self, robot_name, action_dim, obs_dim, self_collision):
         self.parts = None
@@ -21,11 +27,16 @@ class XmlBasedRobot:
         self.jdict = None
         self.ordered_joints = None
         self.robot_body = None
+        self.joint_group = None
+        self.scene = None
+        self._part_pose_plan = None
 
         high = np.ones([action_dim], dtype=np.float32)
         self.action_space = gymnasium.spaces.Box(-high, high, dtype=np.float32)
         high = np.inf * np.ones([obs_dim], dtype=np.float32)
         self.observation_space = gymnasium.spaces.Box(-high, high, dtype=np.float32)
+        # calc_state() writes the observation in this buffer
+        self.obs_buffer = np.zeros(obs_dim, dtype=np.float32)
 
         # self.model_xml = model_xml
         self.robot_name = robot_name
@@ -33,6 +44,7 @@ class XmlBasedRobot:
 
     def addToScene(self, bullet_client, bodies):
         self._p = bullet_client
+        self._part_pose_plan = None  # parts may change, see calc_part_poses()
 
         if self.parts is not None:
             parts = self.parts
@@ -101,11 +113,104 @@ class XmlBasedRobot:
                 # self.ordered_joints.append(joints[joint_name])
                 # self.jdict[joint_name] = joints[joint_name]
 
+        # From now on, ordered joints are views onto the arrays of the joint group
+        self.joint_group = JointGroup.from_joints(self._p, ordered_joints)
+        # Poses and joint states are cached per simulation frame of the scene
+        self.joint_group.scene = self.scene
+        for part in parts.values():
+            part.scene = self.scene
+
         return parts, joints, ordered_joints, self.robot_body
 
     def reset_pose(self, position, orientation):
         self.parts[self.robot_name].reset_pose(position, orientation)
 
+    def get_episode_state(self):
+        """
+        Snapshot of the episode attributes that the bullet state does not hold,
+        e.g. the walk target or the initial height.
+
+        :return: dict of copies of the ``episode_attributes``
+        """
+        return {name: copy.copy(getattr(self, name)) for name in self.episode_attributes}
+
+    def set_episode_state(self, episode_state):
+        """
+        :param episode_state: a snapshot returned by ``get_episode_state()``, left unchanged
+        """
+        for name, value in episode_state.items():
+            setattr(self, name, copy.copy(value))
+
+    def get_body_states(self):
+        """
+        Snapshot of the base pose and joint positions of the bodies of the robot.
+
+        :return: list of (body id, base position, base orientation, joint indices, joint positions),
+            fixed joints are left out
+        """
+        body_states = []
+        for body_id in self.objects:
+            position, orientation = self._p.getBasePositionAndOrientation(body_id)
+            joint_indices = [
+                j for j in range(self._p.getNumJoints(body_id)) if self._p.getJointInfo(body_id, j)[2] != pybullet.JOINT_FIXED
+            ]
+            joint_positions = [[s[0]] for s in self._p.getJointStates(body_id, joint_indices)] if joint_indices else []
+            body_states.append((body_id, position, orientation, joint_indices, joint_positions))
+        return body_states
+
+    def set_body_states(self, body_states):
+        """
+        Reset the bodies of the robot, at rest. Unlike restoreState(), the rest of the world is left untouched.
+
+        :param body_states: a snapshot returned by ``get_body_states()``
+        """
+        for body_id, position, orientation, joint_indices, joint_positions in body_states:
+            self._p.resetBasePositionAndOrientation(body_id, position, orientation)
+            self._p.resetBaseVelocity(body_id, [0, 0, 0], [0, 0, 0])
+            if joint_indices:
+                self._p.resetJointStatesMultiDof(
+                    body_id, joint_indices, targetValues=joint_positions, targetVelocities=[[0.0]] * len(joint_indices)
+                )
+        if self.scene is not None:
+            self.scene.advance_sim_frame()
+
+    def _build_part_pose_plan(self):
+        tracked = list(self.parts.values())
+        if self.robot_body is not None and self.robot_body not in tracked:
+            tracked.append(self.robot_body)
+        links = [(n, part) for n, part in enumerate(tracked) if part.bodyPartIndex != -1]
+        link_groups = group_by_body(
+            [part.bodies[part.bodyIndex] for _, part in links],
+            [part.bodyPartIndex for _, part in links],
+            [n for n, _ in links],
+        )
+        bases = [(n, part.bodies[part.bodyIndex]) for n, part in enumerate(tracked) if part.bodyPartIndex == -1]
+        self._part_pose_plan = (link_groups, bases)
+        self._part_poses = np.zeros((len(tracked), 7), dtype=np.float64)
+        self.robot_body_slot = tracked.index(self.robot_body) if self.robot_body is not None else None
+
+    def calc_part_poses(self):
+        """
+        Gather the pose of every part with one getLinkStates() call per body,
+        plus one getBasePositionAndOrientation() call per base part.
+
+        :return: array of shape (N, 7) with the position and orientation (quaternion) of each part,
+            rows follow the order of ``self.parts.values()``, followed by ``self.robot_body``
+            if it is not one of the parts (row ``self.robot_body_slot``).
+            The array is reused and overwritten by the next call.
+        """
+        if self._part_pose_plan is None:
+            self._build_part_pose_plan()
+        link_groups, bases = self._part_pose_plan
+        poses = self._part_poses
+        for body_id, slots, indices in link_groups:
+            states = self._p.getLinkStates(body_id, indices)
+            poses[slots, :3] = [s[0] for s in states]
+            poses[slots, 3:] = [s[1] for s in states]
+        for n, body_id in bases:
+            poses[n, :3], poses[n, 3:] = self._p.getBasePositionAndOrientation(body_id)
+        return poses
+
 
 class MJCFBasedRobot(XmlBasedRobot):
     """
@@ -116,8 +221,17 @@ class MJCFBasedRobot(XmlBasedRobot):
         XmlBasedRobot.__init__(self, robot_name, action_dim, obs_dim, self_collision)
         self.model_xml = model_xml
         self.doneLoading = 0
+        # Joints driven by the actions, torque = motor_gains * clip(action, -1, 1), see apply_action()
+        self.motors = None
+        self.motor_group = None
+        self.motor_gains = None
 
-    def reset(self, bullet_client):
+    def load(self, bullet_client):
+        """
+        Load the model into the physics client on the first call, the next calls do nothing.
+
+        :param bullet_client: physics client
+        """
         self._p = bullet_client
         # print("Created bullet_client with id=", self._p._client)
         if self.doneLoading == 0:
@@ -138,16 +252,68 @@ class MJCFBasedRobot(XmlBasedRobot):
                     )
                 )
                 self.parts, self.jdict, self.ordered_joints, self.robot_body = self.addToScene(self._p, self.objects)
+            # Robots that share their world cannot restoreState() it, they reset their bodies to this state instead
+            self.loaded_body_states = self.get_body_states()
+
+    def reset(self, bullet_client):
+        self.load(bullet_client)
         self.robot_specific_reset(self._p)
 
         s = self.calc_state()  # optimization: calc_state() can calculate something in self.* for calc_potential() to use
 
         return s
 
+    def geom_collision_filter(self):
+        """
+        Collision type and affinity of the geoms of the MJCF file,
+        loaded by pybullet as the collision group and mask of the links.
+
+        :return: (contype, conaffinity), or None if they are not the same for all the geoms
+        """
+        root = ElementTree.parse(os.path.join(pybullet_data.getDataPath(), "mjcf", self.model_xml)).getroot()
+        default = root.find("default/geom")
+        default = {} if default is None else default.attrib
+        collision_filter = (int(default.get("contype", 1)), int(default.get("conaffinity", 1)))
+        for geom in root.find("worldbody").iter("geom"):
+            if (int(geom.get("contype", collision_filter[0])), int(geom.get("conaffinity", collision_filter[1]))) != (
+                collision_filter
+            ):
+                return None
+        return collision_filter
+
+    def apply_action(self, a):
+        assert np.isfinite(a).all()
+        self.motor_group.apply_torques(self.motor_gains * np.clip(a, -1, +1))
+
     def calc_potential(self):
         return 0
 
 
+def group_by_body(body_ids, indices, slots=None):
+    """
+    Group joint or link indices per body, for the pybullet calls that work on several indices of one body.
+
+    :param body_ids: body unique id of each entry
+    :param indices: joint or link index of each entry
+    :param slots: position of each entry in the caller arrays, defaults to ``range(len(indices))``
+    :return: list of (body_id, slots, indices), ``slots`` is a slice when the entries of a body are contiguous
+    """
+    if slots is None:
+        slots = range(len(indices))
+    bodies = {}
+    for slot, body_id, index in zip(slots, body_ids, indices):
+        body_slots, body_indices = bodies.setdefault(body_id, ([], []))
+        body_slots.append(slot)
+        body_indices.append(index)
+    groups = []
+    for body_id, (body_slots, body_indices) in bodies.items():
+        if body_slots == list(range(body_slots[0], body_slots[0] + len(body_slots))):
+            groups.append((body_id, slice(body_slots[0], body_slots[0] + len(body_slots)), body_indices))
+        else:
+            groups.append((body_id, np.array(body_slots), body_indices))
+    return groups
+
+
 class Pose_Helper:  # dummy class to comply to original interface
     def __init__(self, body_part):
         self.body_part = body_part
@@ -163,11 +329,16 @@ class Pose_Helper:  # dummy class to comply to original interface
 
 
 class BodyPart:
+    # When set, pose and speed are cached until the simulation frame of the scene changes
+    scene = None
+
     def __init__(self, bullet_client, body_name, bodies, bodyIndex, bodyPartIndex):
         self.bodies = bodies
         self._p = bullet_client
         self.bodyIndex = bodyIndex
         self.bodyPartIndex = bodyPartIndex
+        self._pose_frame = -1
+        self._speed_frame = -1
         self.initialPosition = self.current_position()
         self.initialOrientation = self.current_orientation()
         self.bp_pose = Pose_Helper(self)
@@ -185,21 +356,39 @@ class BodyPart:
         return self.current_position()
 
     def get_pose(self):
-        return self.state_fields_of_pose_of(self.bodies[self.bodyIndex], self.bodyPartIndex)
+        if self.scene is not None and self._pose_frame == self.scene.sim_frame:
+            return self._pose
+        pose = self.state_fields_of_pose_of(self.bodies[self.bodyIndex], self.bodyPartIndex)
+        if self.scene is not None:
+            # the cached arrays are shared by all the readers of this frame
+            pose.flags.writeable = False
+            self._pose, self._position, self._orientation = pose, pose[:3], pose[3:]
+            self._pose_frame = self.scene.sim_frame
+        return pose
 
     def speed(self):
+        if self.scene is not None and self._speed_frame == self.scene.sim_frame:
+            return self._speed
         if self.bodyPartIndex == -1:
             (vx, vy, vz), _ = self._p.getBaseVelocity(self.bodies[self.bodyIndex])
         else:
             (x, y, z), (a, b, c, d), _, _, _, _, (vx, vy, vz), (vr, vp, vy) = self._p.getLinkState(
                 self.bodies[self.bodyIndex], self.bodyPartIndex, computeLinkVelocity=1
             )
-        return np.array([vx, vy, vz])
+        speed = np.array([vx, vy, vz])
+        if self.scene is not None:
+            speed.flags.writeable = False
+            self._speed, self._speed_frame = speed, self.scene.sim_frame
+        return speed
 
     def current_position(self):
+        if self.scene is not None and self._pose_frame == self.scene.sim_frame:
+            return self._position
         return self.get_pose()[:3]
 
     def current_orientation(self):
+        if self.scene is not None and self._pose_frame == self.scene.sim_frame:
+            return self._orientation
         return self.get_pose()[3:]
 
     def get_orientation(self):
@@ -207,9 +396,11 @@ class BodyPart:
 
     def reset_position(self, position):
         self._p.resetBasePositionAndOrientation(self.bodies[self.bodyIndex], position, self.get_orientation())
+        self._state_changed()
 
     def reset_orientation(self, orientation):
         self._p.resetBasePositionAndOrientation(self.bodies[self.bodyIndex], self.get_position(), orientation)
+        self._state_changed()
 
     def reset_velocity(self, linearVelocity=None, angularVelocity=None):
         if angularVelocity is None:
@@ -217,9 +408,15 @@ class BodyPart:
         if linearVelocity is None:
             linearVelocity = [0, 0, 0]
         self._p.resetBaseVelocity(self.bodies[self.bodyIndex], linearVelocity, angularVelocity)
+        self._state_changed()
 
     def reset_pose(self, position, orientation):
         self._p.resetBasePositionAndOrientation(self.bodies[self.bodyIndex], position, orientation)
+        self._state_changed()
+
+    def _state_changed(self):
+        if self.scene is not None:
+            self.scene.advance_sim_frame()
 
     def pose(self):
         return self.bp_pose
@@ -228,6 +425,160 @@ class BodyPart:
         return self._p.getContactPoints(self.bodies[self.bodyIndex], -1, self.bodyPartIndex, -1)
 
 
+class JointGroup:
+    """
+    Joints stored as contiguous arrays (body ids, joint indices, limits, mid points and power coefficients),
+    so that they can be read, reset and driven with one batched pybullet call per body.
+    ``Joint`` objects are thin views onto one slot of a group.
+    """
+
+    # When set, joint states are cached until the simulation frame of the scene changes
+    scene = None
+
+    def __init__(self, bullet_client, body_ids, joint_indices, lower_limits, upper_limits, power_coefs=None):
+        self._p = bullet_client
+        self.body_ids = np.array(body_ids, dtype=np.int64)
+        self.joint_indices = np.array(joint_indices, dtype=np.int64)
+        self.lower_limits = np.array(lower_limits, dtype=np.float64)
+        self.upper_limits = np.array(upper_limits, dtype=np.float64)
+        self.ranges = self.upper_limits - self.lower_limits
+        self.mid_points = 0.5 * (self.lower_limits + self.upper_limits)
+        if power_coefs is None:
+            power_coefs = np.zeros(len(self.joint_indices))
+        self.power_coef = np.array(power_coefs, dtype=np.float64)
+
+        self.positions = np.zeros(len(self.joint_indices), dtype=np.float64)
+        self.velocities = np.zeros(len(self.joint_indices), dtype=np.float64)
+        self._relative_state = np.zeros((len(self.joint_indices), 2), dtype=np.float32)
+        self._state_frame = -1
+        self._relative_state_frame = -1
+        # pybullet batched calls work on one body at a time
+        self._bodies = group_by_body(self.body_ids.tolist(), self.joint_indices.tolist())
+
+    @classmethod
+    def from_joints(cls, bullet_client, joints):
+        """
+        Create a group from existing joints and turn them into views onto the new group.
+
+        :param bullet_client:
+        :param joints: list of ``Joint``
+        :return: the new group, slots follow the order of ``joints``
+        """
+        group = cls(
+            bullet_client,
+            [j.bodies[j.bodyIndex] for j in joints],
+            [j.jointIndex for j in joints],
+            [j.lowerLimit for j in joints],
+            [j.upperLimit for j in joints],
+            [j.power_coef for j in joints],
+        )
+        for slot, joint in enumerate(joints):
+            joint._group, joint._slot = group, slot
+        return group
+
+    def select(self, joints):
+        """
+        Create a group with some joints of this group only, e.g. the ones driven by the actions.
+        The joints stay views onto this group.
+
+        :param joints: list of ``Joint`` of this group
+        :return: the new group, slots follow the order of ``joints``
+        """
+        assert all(j._group is self for j in joints), "The joints must belong to this group"
+        slots = [j._slot for j in joints]
+        group = JointGroup(
+            self._p,
+            self.body_ids[slots],
+            self.joint_indices[slots],
+            self.lower_limits[slots],
+            self.upper_limits[slots],
+            self.power_coef[slots],
+        )
+        group.scene = self.scene
+        return group
+
+    def __len__(self):
+        return len(self.joint_indices)
+
+    def read_state(self):
+        """
+        Read the position and velocity of all joints.
+
+        :return: (positions, velocities), arrays that are reused and overwritten by the next
+            simulation frame
+        """
+        if self.scene is not None and self._state_frame == self.scene.sim_frame:
+            return self.positions, self.velocities
+        for body_id, slots, indices in self._bodies:
+            states = self._p.getJointStates(body_id, indices)
+            self.positions[slots] = [s[0] for s in states]
+            self.velocities[slots] = [s[1] for s in states]
+        if self.scene is not None:
+            self._state_frame = self.scene.sim_frame
+        return self.positions, self.velocities
+
+    def relative_state(self):
+        """
+        Same values as ``Joint.current_relative_position()`` for all joints.
+
+        :return: float32 array of shape (n_joints, 2), positions scaled to -1..+1 between limits
+            and velocities scaled by 0.1. The array is reused and overwritten by the next simulation frame.
+        """
+        if self.scene is not None and self._relative_state_frame == self.scene.sim_frame:
+            return self._relative_state
+        positions, velocities = self.read_state()
+        # Note: limits seems to be wrong for cheetah
+        self._relative_state[:, 0] = 2 * (positions - self.lower_limits) / self.ranges - 1.0
+        self._relative_state[:, 1] = 0.1 * velocities
+        if self.scene is not None:
+            self._relative_state_frame = self.scene.sim_frame
+        return self._relative_state
+
+    def apply_torques(self, torques):
+        """
+        :param torques: one torque per joint, in slot order
+        """
+        torques = np.asarray(torques)
+        for body_id, slots, indices in self._bodies:
+            self._p.setJointMotorControlArray(
+                body_id, indices, controlMode=pybullet.TORQUE_CONTROL, forces=torques[slots].tolist()
+            )
+
+    def reset_states(self, positions, velocities=0.0):
+        """
+        Reset the state of all joints and disable their motors,
+        the batched equivalent of ``Joint.reset_current_position()``.
+
+        :param positions: one position per joint, in slot order
+        :param velocities: one velocity per joint, or a scalar for all of them
+        """
+        positions = np.broadcast_to(np.asarray(positions, dtype=np.float64), self.positions.shape)
+        velocities = np.broadcast_to(np.asarray(velocities, dtype=np.float64), self.velocities.shape)
+        for body_id, slots, indices in self._bodies:
+            n = len(indices)
+            self._p.resetJointStatesMultiDof(
+                body_id,
+                indices,
+                targetValues=[[x] for x in positions[slots].tolist()],
+                targetVelocities=[[v] for v in velocities[slots].tolist()],
+            )
+            self._p.setJointMotorControlArray(
+                body_id,
+                indices,
+                controlMode=pybullet.POSITION_CONTROL,
+                targetPositions=[0] * n,
+                targetVelocities=[0] * n,
+                positionGains=[0.1] * n,
+                velocityGains=[0.1] * n,
+                forces=[0] * n,
+            )
+        self._state_changed()
+
+    def _state_changed(self):
+        if self.scene is not None:
+            self.scene.advance_sim_frame()
+
+
 class Joint:
     def __init__(self, bullet_client, joint_name, bodies, bodyIndex, jointIndex):
         self.bodies = bodies
@@ -237,19 +588,39 @@ class Joint:
         self.joint_name = joint_name
 
         jointInfo = self._p.getJointInfo(self.bodies[self.bodyIndex], self.jointIndex)
-        self.lowerLimit = jointInfo[8]
-        self.upperLimit = jointInfo[9]
+        # A joint starts as the only member of its own group, until it is gathered in a bigger one
+        self._group = JointGroup(
+            bullet_client, [self.bodies[self.bodyIndex]], [self.jointIndex], [jointInfo[8]], [jointInfo[9]]
+        )
+        self._slot = 0
 
         self.power_coeff = 0
 
+    @property
+    def lowerLimit(self):
+        return self._group.lower_limits[self._slot]
+
+    @property
+    def upperLimit(self):
+        return self._group.upper_limits[self._slot]
+
+    @property
+    def power_coef(self):
+        return self._group.power_coef[self._slot]
+
+    @power_coef.setter
+    def power_coef(self, value):
+        self._group.power_coef[self._slot] = value
+
     def set_state(self, x, vx):
         self._p.resetJointState(self.bodies[self.bodyIndex], self.jointIndex, x, vx)
+        self._group._state_changed()
 
     def current_position(self):  # just some synonyme method
         return self.get_state()
 
     def get_mid_point(self):
-        return 0.5 * (self.lowerLimit + self.upperLimit)
+        return self._group.mid_points[self._slot]
 
     def current_relative_position(self):
         pos, vel = self.get_state()
@@ -259,6 +630,10 @@ class Joint:
         return scaled_pos, 0.1 * vel
 
     def get_state(self):
+        if self._group.scene is not None:
+            # one batched read for all the joints of the group, at most once per simulation frame
+            positions, velocities = self._group.read_state()
+            return float(positions[self._slot]), float(velocities[self._slot])
         x, vx, _, _ = self._p.getJointState(self.bodies[self.bodyIndex], self.jointIndex)
         return x, vx
 
@@ -300,6 +675,7 @@ class Joint:
 
     def reset_position(self, position, velocity):
         self._p.resetJointState(self.bodies[self.bodyIndex], self.jointIndex, targetValue=position, targetVelocity=velocity)
+        self._group._state_changed()
         self.disable_motor()
 
     def disable_motor(self):
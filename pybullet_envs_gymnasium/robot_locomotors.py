@@ -2,12 +2,15 @@ import os
 from typing import ClassVar
 
 import numpy as np
+import pybullet
 import pybullet_data
 
 from pybullet_envs_gymnasium.robot_bases import BodyPart, MJCFBasedRobot
 
 
 class WalkerBase(MJCFBasedRobot):
+    episode_attributes: ClassVar[tuple[str, ...]] = ("initial_z", "walk_target_x", "walk_target_y", "feet_contact")
+
     def __init__(self, fn, robot_name, action_dim, obs_dim, power):
         MJCFBasedRobot.__init__(self, fn, robot_name, action_dim, obs_dim)
         self.power = power
@@ -16,63 +19,142 @@ class WalkerBase(MJCFBasedRobot):
         self.walk_target_x = 1e3  # kilometer away
         self.walk_target_y = 0
         self.body_xyz = [0, 0, 0]
+        self.body_real_xyz = np.zeros(3)
+        # calc_state() buffers
+        self._walk_target_delta = np.zeros(2)
+        self._rot_speed = np.eye(3)
+        self._body_speed = np.zeros(3)
 
     def robot_specific_reset(self, bullet_client):
         self._p = bullet_client
-        for j in self.ordered_joints:
-            j.reset_current_position(self.np_random.uniform(low=-0.1, high=0.1), 0)
+        self.joint_group.reset_states(self.np_random.uniform(low=-0.1, high=0.1, size=len(self.joint_group)), 0)
 
         self.feet = [self.parts[f] for f in self.foot_list]
         self.feet_contact = np.array([0.0 for f in self.foot_list], dtype=np.float32)
+        self._abs_joint_positions = np.zeros(len(self.joint_group), dtype=np.float32)
+        self._joint_at_limit = np.zeros(len(self.joint_group), dtype=bool)
         self.scene.actor_introduce(self)
         self.initial_z = None
+        self.motors = self.ordered_joints
+        self.motor_group = self.joint_group
+        self.motor_gains = None  # computed by apply_action(), once subclasses have set the power coefficients
+        self._feet_contact_plan = None
+
+    def move_robot(self, init_x, init_y, init_z):
+        "Used by multiplayer stadium to move sideways, to another running lane."
+        # Works because robot loads around (0,0,0), and some robots have z != 0 that is left intact
+        for body_id in self.objects:
+            position, orientation = self._p.getBasePositionAndOrientation(body_id)
+            self._p.resetBasePositionAndOrientation(body_id, np.add(position, (init_x, init_y, init_z)), orientation)
+        self.scene.advance_sim_frame()
+        self.start_pos_x, self.start_pos_y, self.start_pos_z = init_x, init_y, init_z
+        # Keep running straight ahead, along the lane. body_xyz is the mean position of all the parts,
+        # the ground ones included: it only moves by the share of the parts that belong to the robot
+        robot_parts = sum(part.bodies[part.bodyIndex] in self.objects for part in self.parts.values())
+        self.walk_target_y = init_y * robot_parts / len(self.parts)
+
+    def _build_feet_contact_plan(self, ground_ids):
+        ground_links = {}
+        for ground_body, ground_link in ground_ids:
+            ground_links.setdefault(ground_body, set()).add(ground_link)
+        link_to_foot = {}
+        for n, foot in enumerate(self.feet):
+            body_id = foot.bodies[foot.bodyIndex]
+            if body_id not in link_to_foot:
+                # lookup table indexed by link index + 1 (the base is -1)
+                link_to_foot[body_id] = [-1] * (self._p.getNumJoints(body_id) + 1)
+            link_to_foot[body_id][foot.bodyPartIndex + 1] = n
+        self._feet_contact_plan = [
+            (body_id, ground_body, links, table)
+            for body_id, table in link_to_foot.items()
+            for ground_body, links in ground_links.items()
+        ]
+
+    def calc_feet_contact(self, ground_ids):
+        """
+        Update ``self.feet_contact`` in place: 1.0 for the feet touching the ground, 0.0 otherwise.
+        Uses one getContactPoints(bodyA=robot, bodyB=ground) query per pair of bodies,
+        instead of one query per foot.
+
+        :param ground_ids: set of (body unique id, link index) of the ground
+        """
+        if self._feet_contact_plan is None:
+            self._build_feet_contact_plan(ground_ids)
+        self.feet_contact[:] = 0.0
+        for body_id, ground_body, ground_links, link_to_foot in self._feet_contact_plan:
+            for contact in self._p.getContactPoints(bodyA=body_id, bodyB=ground_body):
+                foot = link_to_foot[contact[3] + 1]
+                if foot >= 0 and contact[4] in ground_links:
+                    self.feet_contact[foot] = 1.0
+        return self.feet_contact
+
+    def calc_joint_state(self):
+        """
+        Read all joint positions and velocities with one getJointStates() call per body.
+
+        :return: array of shape (n_joints, 2), positions scaled to -1..+1 between limits
+            and velocities scaled by 0.1, same values as ``Joint.current_relative_position()``
+        """
+        return self.joint_group.relative_state()
 
     def apply_action(self, a):
         assert np.isfinite(a).all()
-        for n, j in enumerate(self.ordered_joints):
-            j.set_motor_torque(self.power * j.power_coef * float(np.clip(a[n], -1, +1)))
+        if self.motor_gains is None:
+            self.motor_gains = self.power * self.motor_group.power_coef
+        self.motor_group.apply_torques(self.motor_gains * np.clip(a, -1, +1))
 
     def calc_state(self):
-        j = np.array([j.current_relative_position() for j in self.ordered_joints], dtype=np.float32).flatten()
-        # even elements [0::2] position, scaled to -1..+1 between limits
-        # odd elements  [1::2] angular speed, scaled to show -1..+1
-        self.joint_speeds = j[1::2]
-        self.joints_at_limit = np.count_nonzero(np.abs(j[0::2]) > 0.99)
-
-        body_pose = self.robot_body.pose()
-        parts_xyz = np.array([p.pose().xyz() for p in self.parts.values()]).flatten()
+        """
+        Write the observation into ``self.obs_buffer`` without allocating temporary arrays.
+
+        :return: ``self.obs_buffer``, overwritten by the next call
+        """
+        obs = self.obs_buffer
+        j = self.calc_joint_state()
+        # j[:, 0] position, scaled to -1..+1 between limits
+        # j[:, 1] angular speed, scaled to show -1..+1
+        self.joint_speeds = j[:, 1]
+        np.abs(j[:, 0], out=self._abs_joint_positions)
+        self.joints_at_limit = np.count_nonzero(np.greater(self._abs_joint_positions, 0.99, out=self._joint_at_limit))
+
+        poses = self.calc_part_poses()
+        body_pose = poses[self.robot_body_slot]
+        n_parts = len(self.parts)
         self.body_xyz = (
-            parts_xyz[0::3].mean(),
-            parts_xyz[1::3].mean(),
-            body_pose.xyz()[2],
+            poses[:n_parts, 0].mean(),
+            poses[:n_parts, 1].mean(),
+            body_pose[2],
         )  # torso z is more informative than mean z
-        self.body_real_xyz = body_pose.xyz()
-        self.body_rpy = body_pose.rpy()
+        self.body_real_xyz[:] = body_pose[:3]
+        self.body_rpy = pybullet.getEulerFromQuaternion(body_pose[3:])
         z = self.body_xyz[2]
         if self.initial_z is None:
             self.initial_z = z
         r, p, yaw = self.body_rpy
-        self.walk_target_theta = np.arctan2(self.walk_target_y - self.body_xyz[1], self.walk_target_x - self.body_xyz[0])
-        self.walk_target_dist = np.linalg.norm([self.walk_target_y - self.body_xyz[1], self.walk_target_x - self.body_xyz[0]])
+        self._walk_target_delta[0] = self.walk_target_y - self.body_xyz[1]
+        self._walk_target_delta[1] = self.walk_target_x - self.body_xyz[0]
+        self.walk_target_theta = np.arctan2(self._walk_target_delta[0], self._walk_target_delta[1])
+        self.walk_target_dist = np.linalg.norm(self._walk_target_delta)
         angle_to_target = self.walk_target_theta - yaw
 
-        rot_speed = np.array([[np.cos(-yaw), -np.sin(-yaw), 0], [np.sin(-yaw), np.cos(-yaw), 0], [0, 0, 1]])
-        vx, vy, vz = np.dot(rot_speed, self.robot_body.speed())  # rotate speed back to body point of view
-
-        more = np.array(
-            [
-                z - self.initial_z,
-                np.sin(angle_to_target),
-                np.cos(angle_to_target),
-                0.3 * vx,
-                0.3 * vy,
-                0.3 * vz,  # 0.3 is just scaling typical speed into -1..+1, no physical sense here
-                r,
-                p,
-            ],
-            dtype=np.float32,
-        )
-        return np.clip(np.concatenate([more, j, self.feet_contact]), -5, +5)
+        rot_speed = self._rot_speed
+        rot_speed[0, 0] = rot_speed[1, 1] = np.cos(-yaw)
+        rot_speed[1, 0] = np.sin(-yaw)
+        rot_speed[0, 1] = -rot_speed[1, 0]
+        # rotate speed back to body point of view
+        vx, vy, vz = np.dot(rot_speed, self.robot_body.speed(), out=self._body_speed)
+
+        obs[0] = z - self.initial_z
+        obs[1] = np.sin(angle_to_target)
+        obs[2] = np.cos(angle_to_target)
+        obs[3] = 0.3 * vx
+        obs[4] = 0.3 * vy
+        obs[5] = 0.3 * vz  # 0.3 is just scaling typical speed into -1..+1, no physical sense here
+        obs[6] = r
+        obs[7] = p
+        obs[8 : 8 + j.size] = j.reshape(-1)
+        obs[8 + j.size :] = self.feet_contact
+        return np.clip(obs, -5, +5, out=obs)
 
     def calc_potential(self):
         # progress in potential field is speed*dt, typical speed is about 2-3 meter per second,
@@ -175,6 +257,8 @@ class Humanoid(WalkerBase):
         self.motor_names += ["left_shoulder1", "left_shoulder2", "left_elbow"]
         self.motor_power += [75, 75, 75]
         self.motors = [self.jdict[n] for n in self.motor_names]
+        self.motor_group = self.joint_group.select(self.motors)
+        self.motor_gains = self.power * np.array(self.motor_power, dtype=np.float64)
         if self.random_yaw:
             position = [0, 0, 0]
             orientation = [0, 0, 0]
@@ -199,12 +283,6 @@ class Humanoid(WalkerBase):
     random_yaw = False
     random_lean = False
 
-    def apply_action(self, a):
-        assert np.isfinite(a).all()
-        force_gain = 1
-        for i, m, power in zip(range(17), self.motors, self.motor_power):
-            m.set_motor_torque(float(force_gain * power * self.power * np.clip(a[i], -1, +1)))
-
     def alive_bonus(self, z, pitch):
         # 2 here because 17 joints produce a lot of electricity cost just from policy noise,
         # living must be better than dying
@@ -229,6 +307,8 @@ def get_sphere(_p, x, y, z):
 
 
 class HumanoidFlagrun(Humanoid):
+    episode_attributes: ClassVar[tuple[str, ...]] = (*Humanoid.episode_attributes, "flag_timeout")
+
     def __init__(self):
         Humanoid.__init__(self)
         self.flag = None
@@ -266,6 +346,14 @@ class HumanoidFlagrun(Humanoid):
 
 
 class HumanoidFlagrunHarder(HumanoidFlagrun):
+    episode_attributes: ClassVar[tuple[str, ...]] = (
+        *HumanoidFlagrun.episode_attributes,
+        "frame",
+        "on_ground_frame_counter",
+        "crawl_start_potential",
+        "crawl_ignored_potential",
+    )
+
     def __init__(self):
         HumanoidFlagrun.__init__(self)
         self.flag = None
@@ -1,3 +1,5 @@
+from typing import ClassVar
+
 import numpy as np
 
 from pybullet_envs_gymnasium.robot_bases import MJCFBasedRobot
@@ -8,6 +10,7 @@ class Reacher(MJCFBasedRobot):
 
     def __init__(self):
         MJCFBasedRobot.__init__(self, "reacher.xml", "body0", action_dim=2, obs_dim=9)
+        self.to_target_vec = np.zeros(3)
 
     def robot_specific_reset(self, bullet_client):
         self.jdict["target_x"].reset_current_position(self.np_random.uniform(low=-self.TARG_LIMIT, high=self.TARG_LIMIT), 0)
@@ -19,36 +22,34 @@ class Reacher(MJCFBasedRobot):
         self.central_joint.reset_current_position(self.np_random.uniform(low=-3.14, high=3.14), 0)
         self.elbow_joint.reset_current_position(self.np_random.uniform(low=-3.14, high=3.14), 0)
 
-    def apply_action(self, a):
-        assert np.isfinite(a).all()
-        self.central_joint.set_motor_torque(0.05 * float(np.clip(a[0], -1, +1)))
-        self.elbow_joint.set_motor_torque(0.05 * float(np.clip(a[1], -1, +1)))
+        self.motors = [self.central_joint, self.elbow_joint]
+        self.motor_group = self.joint_group.select(self.motors)
+        self.motor_gains = np.full(len(self.motors), 0.05)
 
     def calc_state(self):
         theta, self.theta_dot = self.central_joint.current_relative_position()
         self.gamma, self.gamma_dot = self.elbow_joint.current_relative_position()
         target_x, _ = self.jdict["target_x"].current_position()
         target_y, _ = self.jdict["target_y"].current_position()
-        self.to_target_vec = np.array(self.fingertip.pose().xyz()) - np.array(self.target.pose().xyz())
-        return np.array(
-            [
-                target_x,
-                target_y,
-                self.to_target_vec[0],
-                self.to_target_vec[1],
-                np.cos(theta),
-                np.sin(theta),
-                self.theta_dot,
-                self.gamma,
-                self.gamma_dot,
-            ]
-        )
+        np.subtract(self.fingertip.current_position(), self.target.current_position(), out=self.to_target_vec)
+        obs = self.obs_buffer
+        obs[0] = target_x
+        obs[1] = target_y
+        obs[2] = self.to_target_vec[0]
+        obs[3] = self.to_target_vec[1]
+        obs[4] = np.cos(theta)
+        obs[5] = np.sin(theta)
+        obs[6] = self.theta_dot
+        obs[7] = self.gamma
+        obs[8] = self.gamma_dot
+        return obs
 
     def calc_potential(self):
         return -100 * np.linalg.norm(self.to_target_vec)
 
 
 class Pusher(MJCFBasedRobot):
+    episode_attributes: ClassVar[tuple[str, ...]] = ("target_pos", "object_pos", "to_target_vec")
     min_target_placement_radius = 0.5
     max_target_placement_radius = 0.8
     min_object_to_target_distance = 0.1
@@ -71,6 +72,17 @@ class Pusher(MJCFBasedRobot):
         self.forearm_roll_joint = self.jdict["forearm_roll_joint"]
         self.wrist_flex_joint = self.jdict["wrist_flex_joint"]
         self.wrist_roll_joint = self.jdict["wrist_roll_joint"]
+        self.motors = [
+            self.shoulder_pan_joint,
+            self.shoulder_lift_joint,
+            self.upper_arm_roll_joint,
+            self.elbow_flex_joint,
+            self.forearm_roll_joint,
+            self.wrist_flex_joint,
+            self.wrist_roll_joint,
+        ]
+        self.motor_group = self.joint_group.select(self.motors)
+        self.motor_gains = np.full(len(self.motors), 0.05)
 
         self.target_pos = np.concatenate(
             [self.np_random.uniform(low=-1, high=1, size=1), self.np_random.uniform(low=-1, high=1, size=1)]
@@ -100,6 +112,8 @@ class Pusher(MJCFBasedRobot):
         self.jdict["target_y"].reset_current_position(self.target_pos[1] - self.zero_offset[1], 0)
         self.jdict["object_x"].reset_current_position(self.object_pos[0] - self.zero_offset[0], 0)
         self.jdict["object_y"].reset_current_position(self.object_pos[1] - self.zero_offset[1], 0)
+        # target and object are not tracked, calc_state() reports their initial offset
+        self.to_target_vec = self.target_pos - self.object_pos
 
         # randomize all joints TODO: Will this work or do we have to constrain this resetting in some way?
         self.shoulder_pan_joint.reset_current_position(self.np_random.uniform(low=-3.14, high=3.14), 0)
@@ -110,31 +124,29 @@ class Pusher(MJCFBasedRobot):
         self.wrist_flex_joint.reset_current_position(self.np_random.uniform(low=-3.14, high=3.14), 0)
         self.wrist_roll_joint.reset_current_position(self.np_random.uniform(low=-3.14, high=3.14), 0)
 
-    def apply_action(self, a):
-        assert np.isfinite(a).all()
-        self.shoulder_pan_joint.set_motor_torque(0.05 * float(np.clip(a[0], -1, +1)))
-        self.shoulder_lift_joint.set_motor_torque(0.05 * float(np.clip(a[1], -1, +1)))
-        self.upper_arm_roll_joint.set_motor_torque(0.05 * float(np.clip(a[2], -1, +1)))
-        self.elbow_flex_joint.set_motor_torque(0.05 * float(np.clip(a[3], -1, +1)))
-        self.forearm_roll_joint.set_motor_torque(0.05 * float(np.clip(a[4], -1, +1)))
-        self.wrist_flex_joint.set_motor_torque(0.05 * float(np.clip(a[5], -1, +1)))
-        self.wrist_roll_joint.set_motor_torque(0.05 * float(np.clip(a[6], -1, +1)))
-
     def calc_state(self):
-        self.to_target_vec = self.target_pos - self.object_pos
-        return np.concatenate(
-            [
-                np.array([j.current_position() for j in self.ordered_joints]).flatten(),  # all positions
-                np.array([j.current_relative_position() for j in self.ordered_joints]).flatten(),  # all speeds
-                self.to_target_vec,
-                self.fingertip.pose().xyz(),
-                self.object.pose().xyz(),
-                self.target.pose().xyz(),
-            ]
-        )
+        obs = self.obs_buffer
+        n = len(self.joint_group)
+        relative_state = self.joint_group.relative_state()
+        obs[0 : 2 * n : 2] = self.joint_group.positions  # all positions
+        obs[1 : 2 * n : 2] = self.joint_group.velocities
+        obs[2 * n : 4 * n] = relative_state.reshape(-1)  # all speeds
+        k = 4 * n + len(self.to_target_vec)
+        obs[4 * n : k] = self.to_target_vec
+        obs[k : k + 3] = self.fingertip.current_position()
+        obs[k + 3 : k + 6] = self.object.current_position()
+        obs[k + 6 : k + 9] = self.target.current_position()
+        return obs
 
 
 class Thrower(MJCFBasedRobot):
+    episode_attributes: ClassVar[tuple[str, ...]] = (
+        "target_pos",
+        "object_pos",
+        "to_target_vec",
+        "_object_hit_ground",
+        "_object_hit_location",
+    )
     min_target_placement_radius = 0.1
     max_target_placement_radius = 0.8
     min_object_placement_radius = 0.1
@@ -157,6 +169,17 @@ class Thrower(MJCFBasedRobot):
         self.forearm_roll_joint = self.jdict["forearm_roll_joint"]
         self.wrist_flex_joint = self.jdict["wrist_flex_joint"]
         self.wrist_roll_joint = self.jdict["wrist_roll_joint"]
+        self.motors = [
+            self.shoulder_pan_joint,
+            self.shoulder_lift_joint,
+            self.upper_arm_roll_joint,
+            self.elbow_flex_joint,
+            self.forearm_roll_joint,
+            self.wrist_flex_joint,
+            self.wrist_roll_joint,
+        ]
+        self.motor_group = self.joint_group.select(self.motors)
+        self.motor_gains = np.full(len(self.motors), 0.05)
 
         self._object_hit_ground = False
         self._object_hit_location = None
@@ -206,26 +229,18 @@ class Thrower(MJCFBasedRobot):
         )
 
         self.parts["target"].reset_pose(self.target_pos - self.zero_offset, np.array([0, 0, 0, 1]))
-
-    def apply_action(self, a):
-        assert np.isfinite(a).all()
-        self.shoulder_pan_joint.set_motor_torque(0.05 * float(np.clip(a[0], -1, +1)))
-        self.shoulder_lift_joint.set_motor_torque(0.05 * float(np.clip(a[1], -1, +1)))
-        self.upper_arm_roll_joint.set_motor_torque(0.05 * float(np.clip(a[2], -1, +1)))
-        self.elbow_flex_joint.set_motor_torque(0.05 * float(np.clip(a[3], -1, +1)))
-        self.forearm_roll_joint.set_motor_torque(0.05 * float(np.clip(a[4], -1, +1)))
-        self.wrist_flex_joint.set_motor_torque(0.05 * float(np.clip(a[5], -1, +1)))
-        self.wrist_roll_joint.set_motor_torque(0.05 * float(np.clip(a[6], -1, +1)))
+        self.to_target_vec = self.target_pos - self.object_pos
 
     def calc_state(self):
-        self.to_target_vec = self.target_pos - self.object_pos
-        return np.concatenate(
-            [
-                np.array([j.current_position() for j in self.ordered_joints]).flatten(),  # all positions
-                np.array([j.current_relative_position() for j in self.ordered_joints]).flatten(),  # all speeds
-                self.to_target_vec,
-                self.fingertip.pose().xyz(),
-                self.object.pose().xyz(),
-                self.target.pose().xyz(),
-            ]
-        )
+        obs = self.obs_buffer
+        n = len(self.joint_group)
+        relative_state = self.joint_group.relative_state()
+        obs[0 : 2 * n : 2] = self.joint_group.positions  # all positions
+        obs[1 : 2 * n : 2] = self.joint_group.velocities
+        obs[2 * n : 4 * n] = relative_state.reshape(-1)  # all speeds
+        k = 4 * n + len(self.to_target_vec)
+        obs[4 * n : k] = self.to_target_vec
+        obs[k : k + 3] = self.fingertip.current_position()
+        obs[k + 3 : k + 6] = self.object.current_position()
+        obs[k + 6 : k + 9] = self.target.current_position()
+        return obs
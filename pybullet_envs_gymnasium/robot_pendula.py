@@ -17,13 +17,16 @@ class InvertedPendulum(MJCFBasedRobot):
         u = self.np_random.uniform(low=-0.1, high=0.1)
         self.j1.reset_current_position(u if not self.swingup else 3.1415 + u, 0)
         self.j1.set_motor_torque(0)
+        self.motors = [self.slider]
+        self.motor_group = self.joint_group.select(self.motors)
+        self.motor_gains = np.array([100.0])
 
     def apply_action(self, a):
         assert np.isfinite(a).all()
         if not np.isfinite(a).all():
             print("a is inf")
             a[0] = 0
-        self.slider.set_motor_torque(100 * float(np.clip(a[0], -1, +1)))
+        self.motor_group.apply_torques(self.motor_gains * np.clip(a, -1, +1))
 
     def calc_state(self):
         self.theta, theta_dot = self.j1.current_position()
@@ -46,7 +49,13 @@ class InvertedPendulum(MJCFBasedRobot):
             print("theta_dot is inf")
             theta_dot = 0
 
-        return np.array([x, vx, np.cos(self.theta), np.sin(self.theta), theta_dot])
+        obs = self.obs_buffer
+        obs[0] = x
+        obs[1] = vx
+        obs[2] = np.cos(self.theta)
+        obs[3] = np.sin(self.theta)
+        obs[4] = theta_dot
+        return obs
 
 
 class InvertedPendulumSwingup(InvertedPendulum):
@@ -68,27 +77,24 @@ class InvertedDoublePendulum(MJCFBasedRobot):
         self.j2.reset_current_position(float(u[1]), 0)
         self.j1.set_motor_torque(0)
         self.j2.set_motor_torque(0)
-
-    def apply_action(self, a):
-        assert np.isfinite(a).all()
-        self.slider.set_motor_torque(200 * float(np.clip(a[0], -1, +1)))
+        self.motors = [self.slider]
+        self.motor_group = self.joint_group.select(self.motors)
+        self.motor_gains = np.array([200.0])
 
     def calc_state(self):
         theta, theta_dot = self.j1.current_position()
         gamma, gamma_dot = self.j2.current_position()
         x, vx = self.slider.current_position()
-        self.pos_x, _, self.pos_y = self.pole2.pose().xyz()
+        self.pos_x, _, self.pos_y = self.pole2.current_position()
         assert np.isfinite(x)
-        return np.array(
-            [
-                x,
-                vx,
-                self.pos_x,
-                np.cos(theta),
-                np.sin(theta),
-                theta_dot,
-                np.cos(gamma),
-                np.sin(gamma),
-                gamma_dot,
-            ]
-        )
+        obs = self.obs_buffer
+        obs[0] = x
+        obs[1] = vx
+        obs[2] = self.pos_x
+        obs[3] = np.cos(theta)
+        obs[4] = np.sin(theta)
+        obs[5] = theta_dot
+        obs[6] = np.cos(gamma)
+        obs[7] = np.sin(gamma)
+        obs[8] = gamma_dot
+        return obs
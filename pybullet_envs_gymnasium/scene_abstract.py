@@ -17,6 +17,9 @@ class Scene:
         self.human_render_detected = False  # if user wants render("human"), we open test window
 
         self.multiplayer_robots = {}
+        # Incremented every time the simulation state changes,
+        # body part poses and joint states are cached for the current frame
+        self.sim_frame = 0
 
     def test_window(self):
         "Call this function every frame, to see what's going on. Not necessary in learning."
@@ -47,6 +50,15 @@ class Scene:
         observations from robots using step() with the same action.
         """
         self.cpp_world.step(self.frame_skip)
+        self.sim_frame += 1
+
+    def advance_sim_frame(self):
+        """
+        Invalidate the cached poses and joint states.
+        Call it after changing the simulation state outside of global_step(),
+        e.g. after restoreState() or a direct reset of a body or joint through the bullet client.
+        """
+        self.sim_frame += 1
 
 
 class SingleRobotEmptyScene(Scene):
@@ -44,10 +44,42 @@ class SinglePlayerStadiumScene(StadiumScene):
 
 
 class MultiplayerStadiumScene(StadiumScene):
+    "Several robots in one world, each one running in its own lane, see StadiumVectorEnv."
+
     multiplayer = True
     players_count = 3
+    lane_width = 1.0
+    robot_collisions = False  # if False, robots go through each other
+
+    def lane_y(self, player_n):
+        """
+        :return: y coordinate of the lane of player ``player_n``, the lanes are centered on y = 0
+        """
+        return (player_n - (self.players_count - 1) / 2) * self.lane_width  # 0 1 2 => -1 0 +1
 
     def actor_introduce(self, robot):
+        if not self.robot_collisions and self.multiplayer_robots.get(robot.player_n) is not robot:
+            self.set_collision_group(robot)
         StadiumScene.actor_introduce(self, robot)
-        i = robot.player_n - 1  # 0 1 2 => -1 0 +1
-        robot.move_robot(0, i, 0)
+        robot.move_robot(0, self.lane_y(robot.player_n), 0)
+
+    def set_collision_group(self, robot):
+        """
+        Put the links of the robot in a collision group of its own, so that it does not collide with
+        the other robots. Pybullet loads the contype and conaffinity of the MJCF geoms as collision
+        group and mask, and two links collide if the group of one of them matches the mask of the other:
+        the robot keeps its self-collisions, and its collisions with the ground and the other objects.
+        There are 29 robot groups, robots 29 lanes apart share one.
+        """
+        collision_filter = robot.geom_collision_filter()
+        if collision_filter is None:
+            raise ValueError(f"The geoms of {robot.model_xml} have different contype or conaffinity")
+        contype, conaffinity = collision_filter
+        group = 1 << (2 + robot.player_n % 29)  # bits 0 and 1 are the default and static filters of bullet
+        mask = group if contype & conaffinity else 0
+        for body_id in robot.objects:
+            for link in range(-1, self._p.getNumJoints(body_id)):
+                # Links without collision shape have an empty bounding box
+                lower, upper = self._p.getAABB(body_id, link)
+                if lower != upper:
+                    self._p.setCollisionFilterGroupMask(body_id, link, group, mask)
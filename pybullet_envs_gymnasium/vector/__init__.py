@@ -0,0 +1,24 @@
+from pybullet_envs_gymnasium.vector.async_env_pool import AsyncEnvPool
+from pybullet_envs_gymnasium.vector.bullet_vector_env import BulletVectorEnv
+from pybullet_envs_gymnasium.vector.env_server import EnvServer, RemoteVectorEnv
+from pybullet_envs_gymnasium.vector.es_evaluator import PopulationEvaluator, SharedNoiseTable
+from pybullet_envs_gymnasium.vector.rollout import RolloutPool, rollout
+from pybullet_envs_gymnasium.vector.shared_memory_env_pool import SharedMemoryEnvPool
+from pybullet_envs_gymnasium.vector.shared_memory_vector_env import SharedMemoryVectorEnv
+from pybullet_envs_gymnasium.vector.stadium_vector_env import StadiumVectorEnv
+from pybullet_envs_gymnasium.vector.threaded_vector_env import ThreadedVectorEnv
+
+__all__ = [
+    "AsyncEnvPool",
+    "BulletVectorEnv",
+    "EnvServer",
+    "PopulationEvaluator",
+    "RemoteVectorEnv",
+    "RolloutPool",
+    "SharedMemoryEnvPool",
+    "SharedMemoryVectorEnv",
+    "SharedNoiseTable",
+    "StadiumVectorEnv",
+    "ThreadedVectorEnv",
+    "rollout",
+]
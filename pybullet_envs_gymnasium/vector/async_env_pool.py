@@ -0,0 +1,96 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from gymnasium.envs.registration import load_env_creator
+
+
+class AsyncEnvPool:
+    """
+    Environments served from one asyncio event loop. Their resets and steps run on a shared thread pool
+    (``areset()`` and ``astep()`` of the environments), so the event loop keeps serving other tasks,
+    e.g. policy inference requests, and there is no thread per environment.
+    pybullet holds the GIL during its calls: the simulation of the environments is not parallel,
+    but the event loop gets control back between two pybullet calls.
+
+    Each environment has at most one reset or step in flight. Environments are not reset automatically.
+
+    :param entry_point: environment class, or its "module:Class" path
+    :param num_envs: number of environments
+    :param max_workers: number of threads of the pool, see ``concurrent.futures.ThreadPoolExecutor``
+    :param kwargs: keyword arguments for the environment constructor
+    """
+
+    def __init__(self, entry_point, num_envs=1, max_workers=None, **kwargs):
+        env_creator = load_env_creator(entry_point) if isinstance(entry_point, str) else entry_point
+        self.envs = [env_creator(**kwargs) for _ in range(num_envs)]
+        self.num_envs = num_envs
+        self.single_observation_space = self.envs[0].observation_space
+        self.single_action_space = self.envs[0].action_space
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=type(self).__name__)
+        for env in self.envs:
+            env.executor = self.executor
+        self._in_flight = set()
+
+    async def reset(self, seed=None, env_ids=None):
+        """
+        Reset environments concurrently.
+
+        :param seed: ``None``, or an int: env ``i`` is seeded with ``seed + i``
+        :param env_ids: ids of the environments to reset, all of them by default
+        :return: batch of observations, in the order of ``env_ids``, and list of infos
+        """
+        env_ids = range(self.num_envs) if env_ids is None else env_ids
+        results = await asyncio.gather(
+            *(self._run(i, self.envs[i].areset(seed=None if seed is None else seed + i)) for i in env_ids)
+        )
+        return np.stack([obs for _, obs, _ in results]), [info for _, _, info in results]
+
+    async def step(self, actions, env_ids=None):
+        """
+        Step environments concurrently and wait for all of them.
+
+        :param actions: one action per environment of ``env_ids``
+        :param env_ids: ids of the environments to step, all of them by default
+        :return: batch of observations, rewards, terminations, truncations, in the order of ``env_ids``,
+            and list of infos
+        """
+        env_ids = range(self.num_envs) if env_ids is None else env_ids
+        results = await asyncio.gather(*(self._run(i, self.envs[i].astep(a)) for i, a in zip(env_ids, actions)))
+        obs, rewards, terminations, truncations, infos = zip(*(result[1:] for result in results))
+        return np.stack(obs), np.array(rewards), np.array(terminations), np.array(truncations), list(infos)
+
+    async def step_as_completed(self, actions, env_ids=None):
+        """
+        Step environments concurrently, and yield their results as they complete.
+
+        :param actions: one action per environment of ``env_ids``
+        :param env_ids: ids of the environments to step, all of them by default
+        :return: async iterator of (env id, observation, reward, terminated, truncated, info)
+        """
+        env_ids = range(self.num_envs) if env_ids is None else env_ids
+        tasks = [asyncio.ensure_future(self._run(i, self.envs[i].astep(a))) for i, a in zip(env_ids, actions)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            # The steps of the remaining tasks cannot be interrupted, wait for them
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, env_id, coroutine):
+        if env_id in self._in_flight:
+            coroutine.close()
+            raise RuntimeError(f"Environment {env_id} already has a reset or step in flight")
+        self._in_flight.add(env_id)
+        try:
+            return (env_id, *await coroutine)
+        finally:
+            self._in_flight.discard(env_id)
+
+    def close(self):
+        """
+        Wait for the steps in flight, and close the environments.
+        """
+        self.executor.shutdown()
+        for env in self.envs:
+            env.close()
@@ -0,0 +1,210 @@
+from typing import TYPE_CHECKING
+
+import gymnasium
+import numpy as np
+from gymnasium.envs.registration import load_env_creator
+from gymnasium.vector.utils import batch_space
+
+if TYPE_CHECKING:
+    from gymnasium.vector import AutoresetMode
+else:
+    # Imported from here by the other vector envs
+    try:
+        from gymnasium.vector import AutoresetMode
+    except ImportError:  # gymnasium < 1.1, next step autoreset only
+        AutoresetMode = None
+
+
+def is_same_step(autoreset_mode):
+    """
+    :param autoreset_mode: ``None`` or an ``AutoresetMode`` (or its value) among NEXT_STEP and SAME_STEP
+    :return: whether ``autoreset_mode`` is SAME_STEP
+    """
+    if autoreset_mode is None:
+        return False
+    if AutoresetMode is None:
+        raise ValueError("autoreset_mode needs gymnasium >= 1.1, older versions only have next step autoreset")
+    autoreset_mode = AutoresetMode(autoreset_mode)
+    if autoreset_mode not in (AutoresetMode.NEXT_STEP, AutoresetMode.SAME_STEP):
+        raise ValueError(f"Unsupported autoreset mode {autoreset_mode}, expected NEXT_STEP or SAME_STEP")
+    return autoreset_mode == AutoresetMode.SAME_STEP
+
+
+class BulletVectorEnv(gymnasium.vector.VectorEnv):
+    """
+    Vectorized environment that steps ``num_envs`` Bullet environments in a loop, in the current process.
+    Each environment owns its own DIRECT physics client, observations, rewards, terminations
+    and truncations are written into preallocated batch arrays.
+    Environments are reset on the step after they terminate or get truncated (next step autoreset),
+    like ``gymnasium.vector.SyncVectorEnv`` does. With ``autoreset_mode=AutoresetMode.SAME_STEP``,
+    they are reset within the step that ends their episode: terminated ones by the environments themselves
+    (their ``autoreset`` attribute is set), the observations are the first of the next episodes, and the last ones are in
+    ``infos["final_obs"]`` and ``infos["final_info"]``.
+
+    Registered as ``vector_entry_point`` of all the environments of this package:
+    ``gym.make_vec("HopperBulletEnv-v0", num_envs=8)`` creates a ``BulletVectorEnv``.
+
+    :param entry_point: environment class, or its "module:Class" path
+    :param num_envs: number of environments
+    :param max_episode_steps: truncate episodes after that many steps, ``None`` for no limit
+    :param copy: return copies of the batch arrays instead of the arrays themselves,
+        which are overwritten by the next step() or reset()
+    :param autoreset_mode: ``AutoresetMode.NEXT_STEP`` (default) or ``AutoresetMode.SAME_STEP``
+    :param kwargs: keyword arguments for the environment constructor
+    """
+
+    def __init__(self, entry_point, num_envs=1, max_episode_steps=None, copy=True, autoreset_mode=None, **kwargs):
+        super().__init__()
+        env_creator = load_env_creator(entry_point) if isinstance(entry_point, str) else entry_point
+        # the observations are copied in the batch array, no need for a copy per env
+        kwargs["obs_view"] = True
+        self.same_step_autoreset = is_same_step(autoreset_mode)
+        self.envs = [env_creator(**kwargs) for _ in range(num_envs)]
+        for env in self.envs:
+            env.autoreset = self.same_step_autoreset
+        self.entry_point = entry_point
+        self.num_envs = num_envs
+        self.max_episode_steps = max_episode_steps
+        self.copy = copy
+
+        self.metadata = dict(self.envs[0].metadata)
+        if AutoresetMode is not None:
+            self.metadata["autoreset_mode"] = AutoresetMode.SAME_STEP if self.same_step_autoreset else AutoresetMode.NEXT_STEP
+        self.render_mode = self.envs[0].render_mode
+        self.single_observation_space = self.envs[0].observation_space
+        self.single_action_space = self.envs[0].action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        self._observations = np.zeros(self.observation_space.shape, dtype=self.observation_space.dtype)
+        self._rewards = np.zeros(num_envs, dtype=np.float64)
+        self._terminations = np.zeros(num_envs, dtype=np.bool_)
+        self._truncations = np.zeros(num_envs, dtype=np.bool_)
+        self._autoreset_envs = np.zeros(num_envs, dtype=np.bool_)
+        self._episode_steps = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self, *, seed=None, options=None):
+        """
+        Reset all the environments, or the ones selected by ``options["reset_mask"]``.
+
+        :param seed: ``None``, an int (env ``i`` is seeded with ``seed + i``) or a list of seeds
+        :param options: passed to each environment reset, except ``reset_mask``
+        :return: batch of observations, and infos
+        """
+        if seed is None:
+            seed = [None] * self.num_envs
+        elif isinstance(seed, int):
+            seed = [seed + i for i in range(self.num_envs)]
+        if len(seed) != self.num_envs:
+            raise ValueError(f"If seeds are passed as a list the length must match num_envs={self.num_envs}, got {len(seed)}")
+
+        reset_mask = np.ones(self.num_envs, dtype=np.bool_)
+        if options is not None and "reset_mask" in options:
+            options = dict(options)
+            reset_mask = options.pop("reset_mask")
+            if not isinstance(reset_mask, np.ndarray) or reset_mask.shape != (self.num_envs,) or reset_mask.dtype != np.bool_:
+                raise ValueError(f"options['reset_mask'] must be a boolean array of shape ({self.num_envs},)")
+
+        infos = {}
+        for i in np.flatnonzero(reset_mask):
+            self._observations[i], info = self.envs[i].reset(seed=seed[i], options=options)
+            infos = self._add_info(infos, info, i)
+        self._terminations[reset_mask] = False
+        self._truncations[reset_mask] = False
+        self._autoreset_envs[reset_mask] = False
+        self._episode_steps[reset_mask] = 0
+        return self._output(self._observations), infos
+
+    def step(self, actions):
+        """
+        Step all the environments, the ones that ended on the previous step are reset instead.
+
+        :param actions: batch of actions
+        :return: batch of observations, rewards, terminations, truncations, and infos
+        """
+        actions = np.asarray(actions)
+        self._simulate(actions)
+        infos = {}
+        for i, env in enumerate(self.envs):
+            if self._autoreset_envs[i]:
+                self._observations[i], info = env.reset()
+                self._rewards[i] = 0.0
+                self._terminations[i] = False
+                self._truncations[i] = False
+                self._episode_steps[i] = 0
+            elif self.same_step_autoreset:
+                obs, self._rewards[i], self._terminations[i], self._truncations[i], info = self._step_env(env, actions[i])
+                self._episode_steps[i] += 1
+                if self.max_episode_steps is not None and self._episode_steps[i] >= self.max_episode_steps:
+                    self._truncations[i] = True
+                if self._terminations[i] or self._truncations[i]:
+                    if "final_obs" not in info:  # truncated, the environment only resets terminated episodes
+                        final = {"final_obs": np.array(obs), "final_info": info}
+                        obs, info = env.reset()
+                        info = {**info, **final}
+                    self._episode_steps[i] = 0
+                self._observations[i] = obs
+            else:
+                self._observations[i], self._rewards[i], self._terminations[i], self._truncations[i], info = self._step_env(
+                    env, actions[i]
+                )
+                self._episode_steps[i] += 1
+                if self.max_episode_steps is not None and self._episode_steps[i] >= self.max_episode_steps:
+                    self._truncations[i] = True
+            if info:
+                infos = self._add_info(infos, info, i)
+        if not self.same_step_autoreset:
+            np.logical_or(self._terminations, self._truncations, out=self._autoreset_envs)
+        return (
+            self._output(self._observations),
+            self._output(self._rewards),
+            self._output(self._terminations),
+            self._output(self._truncations),
+            infos,
+        )
+
+    def _simulate(self, actions):
+        """
+        Called by step() before stepping the environments one after the other, does nothing by default.
+
+        :param actions: batch of actions, the environments in ``_autoreset_envs`` are reset instead of stepped
+        """
+
+    def _step_env(self, env, action):
+        """
+        :return: result of the step of one environment
+        """
+        return env.step(action)
+
+    def _output(self, batch):
+        return batch.copy() if self.copy else batch
+
+    def render(self):
+        """
+        :return: the frames rendered by each environment
+        """
+        return tuple(env.render() for env in self.envs)
+
+    def call(self, name, *args, **kwargs):
+        """
+        Call a method of each environment, or get an attribute.
+
+        :param name: name of the method or attribute
+        :return: tuple of results, one per environment
+        """
+        results = []
+        for env in self.envs:
+            function = getattr(env, name)
+            results.append(function(*args, **kwargs) if callable(function) else function)
+        return tuple(results)
+
+    def get_attr(self, name):
+        """
+        :param name: name of the attribute
+        :return: tuple of values, one per environment
+        """
+        return tuple(getattr(env, name) for env in self.envs)
+
+    def close_extras(self, **kwargs):
+        for env in self.envs:
+            env.close()
@@ -0,0 +1,138 @@
+"""
+Placement of the worker processes of the multiprocess vector envs on the CPUs (Linux only).
+
+A placement policy is one of:
+
+- ``None``: no pinning, the scheduler moves the workers between CPUs
+- ``"compact"``: fill the CPUs in topology order, NUMA node by node and core by core,
+  hyper-threads of a core next to each other: workers share caches and memory
+- ``"spread"``: take one CPU per node in turn, and the first hyper-thread of every core before the second ones:
+  workers get as many caches and memory controllers as possible
+- explicit CPU lists, one per worker, e.g. ``[[0, 1], [2, 3]]``
+
+Workers are pinned with ``os.sched_setaffinity()`` before they create their environments,
+so that the memory of the environments is allocated on the node of their CPUs.
+"""
+
+import collections
+import glob
+import os
+
+CpuInfo = collections.namedtuple("CpuInfo", ["cpu", "node", "package", "core"])
+
+
+def _read_int(path, default):
+    try:
+        with open(path) as file:
+            return int(file.read())
+    except (OSError, ValueError):
+        return default
+
+
+def _parse_cpu_list(cpu_list):
+    """
+    :param cpu_list: CPU list of the Linux sysfs, e.g. "0-3,8-11"
+    :return: the CPU numbers
+    """
+    cpus = []
+    for part in cpu_list.strip().split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.extend(range(int(first), int(last) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+
+def cpu_topology():
+    """
+    Topology of the CPUs available to the current process, read from ``/sys/devices/system``.
+    Without sysfs, every CPU is its own core on node 0.
+
+    :return: list of ``CpuInfo(cpu, node, package, core)``, sorted by CPU number
+    """
+    available = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    node_of_cpu = {}
+    for node_path in glob.glob("/sys/devices/system/node/node[0-9]*"):
+        try:
+            with open(os.path.join(node_path, "cpulist")) as file:
+                cpus = _parse_cpu_list(file.read())
+        except OSError:
+            continue
+        node = int(os.path.basename(node_path)[len("node") :])
+        node_of_cpu.update(dict.fromkeys(cpus, node))
+    topology = []
+    for cpu in available:
+        topology_path = f"/sys/devices/system/cpu/cpu{cpu}/topology"
+        topology.append(
+            CpuInfo(
+                cpu=cpu,
+                node=node_of_cpu.get(cpu, 0),
+                package=_read_int(os.path.join(topology_path, "physical_package_id"), 0),
+                core=_read_int(os.path.join(topology_path, "core_id"), cpu),
+            )
+        )
+    return topology
+
+
+def worker_cpus(num_workers, policy, topology=None):
+    """
+    :param num_workers: number of worker processes
+    :param policy: placement policy, see the module docstring
+    :param topology: result of ``cpu_topology()``, read by default
+    :return: the set of CPUs of each worker, or ``None`` for each worker if the policy is ``None``.
+        Workers share CPUs when there are more workers than CPUs.
+    """
+    if policy is None:
+        return [None] * num_workers
+    if not hasattr(os, "sched_setaffinity"):
+        raise ValueError("CPU placement policies need os.sched_setaffinity(), which is only available on Linux")
+    if not isinstance(policy, str):
+        cpus = [set(worker_policy) for worker_policy in policy]
+        if len(cpus) != num_workers or not all(cpus):
+            raise ValueError(f"Expected {num_workers} non-empty CPU lists, one per worker, got {policy!r}")
+        return cpus
+
+    topology = cpu_topology() if topology is None else topology
+    if policy == "compact":
+        order = sorted(topology, key=lambda info: (info.node, info.package, info.core, info.cpu))
+    elif policy == "spread":
+        # Rank of each CPU among the hyper-threads of its core, and of its core within its node
+        thread_rank, by_node = {}, collections.defaultdict(list)
+        for info in sorted(topology, key=lambda info: (info.node, info.package, info.core, info.cpu)):
+            core_cpus = [other for other in by_node[info.node] if (other.package, other.core) == (info.package, info.core)]
+            thread_rank[info.cpu] = len(core_cpus)
+            by_node[info.node].append(info)
+        # Nodes take turns, within a node: first hyper-thread of every core, then the second ones
+        node_orders = [sorted(infos, key=lambda info: thread_rank[info.cpu]) for _, infos in sorted(by_node.items())]
+        order = [infos[i] for i in range(max(map(len, node_orders))) for infos in node_orders if i < len(infos)]
+    else:
+        raise ValueError(f"Unknown placement policy {policy!r}, expected None, 'compact', 'spread' or CPU lists")
+    return [{order[i % len(order)].cpu} for i in range(num_workers)]
+
+
+def pin_process(cpus):
+    """
+    Pin the current process to ``cpus``, does nothing if ``cpus`` is ``None``.
+    """
+    if cpus is not None:
+        os.sched_setaffinity(0, cpus)
+
+
+def placement_report(cpus, topology=None):
+    """
+    :param cpus: set of CPUs of each worker, result of ``worker_cpus()``
+    :param topology: result of ``cpu_topology()``, read by default
+    :return: one line per worker with its CPUs, NUMA nodes and physical cores
+    """
+    topology = {info.cpu: info for info in (cpu_topology() if topology is None else topology)}
+    lines = []
+    for worker_index, worker_cpu_set in enumerate(cpus):
+        if worker_cpu_set is None:
+            lines.append(f"worker {worker_index}: not pinned")
+            continue
+        infos = [topology[cpu] for cpu in sorted(worker_cpu_set) if cpu in topology]
+        nodes = sorted({info.node for info in infos})
+        cores = sorted({(info.package, info.core) for info in infos})
+        lines.append(f"worker {worker_index}: cpus {sorted(worker_cpu_set)}, nodes {nodes}, (package, core) {cores}")
+    return "\n".join(lines)
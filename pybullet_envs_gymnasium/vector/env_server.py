@@ -0,0 +1,379 @@
+"""
+Bullet environments served over TCP or Unix sockets, to spread rollouts over several machines.
+
+Every message is a header, the message kind (or the status of a response) and the payload size
+as little-endian ``uint8`` and ``uint32``, followed by the payload: the raw buffers of NumPy arrays,
+one after the other. Both sides know the shapes and dtypes of the arrays from the spec exchanged
+when the client connects, the only JSON message:
+
+- ``SPEC``: no payload, the response is the JSON spec of the served vector env
+- ``RESET``: seeds (``int64``), seeded flags and reset mask (``bool``), one per env.
+  The response is the batch of observations.
+- ``STEP``: the batch of actions. The response is the batch of observations, rewards (``float64``),
+  terminations and truncations (``bool``).
+- ``CLOSE``: no payload and no response, the server waits for the next client
+
+A failed request gets an ``ERROR`` response with the traceback, in UTF-8, as payload.
+
+Serve a vector env from the command line::
+
+    python -m pybullet_envs_gymnasium.vector.env_server HopperBulletEnv-v0 --num-envs 64 --port 5555
+"""
+
+import argparse
+import json
+import os
+import socket
+import struct
+import traceback
+
+import gymnasium
+import numpy as np
+from gymnasium.vector.utils import batch_space
+
+from pybullet_envs_gymnasium.vector.bullet_vector_env import AutoresetMode, BulletVectorEnv
+
+# Message kinds, sent by the client
+SPEC, RESET, STEP, CLOSE = 0, 1, 2, 3
+# Response statuses, sent by the server
+OK, ERROR = 0, 1
+# Message kind or response status, payload size in bytes
+HEADER = struct.Struct("<BI")
+
+
+def _open_socket(address):
+    """
+    :param address: (host, port) for TCP, or the path of a Unix socket
+    """
+    if isinstance(address, str):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock = socket.socket(socket.AF_INET6 if ":" in address[0] else socket.AF_INET, socket.SOCK_STREAM)
+    # Messages are small and request/response: do not wait to fill packets
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def send_message(sock, kind, *arrays):
+    """
+    Send a header and the raw buffers of ``arrays``, in one system call.
+
+    :param sock: connected socket
+    :param kind: message kind or response status
+    :param arrays: C-contiguous NumPy arrays, or bytes
+    """
+    payload = b"".join(memoryview(array).cast("B") for array in arrays)
+    sock.sendall(HEADER.pack(kind, len(payload)) + payload)
+
+
+def recv_into(sock, buffer):
+    """
+    Fill ``buffer`` with the next bytes received, without intermediate copies.
+
+    :param sock: connected socket
+    :param buffer: writable C-contiguous NumPy array or bytearray
+    """
+    view = memoryview(buffer).cast("B")
+    while view.nbytes > 0:
+        n_bytes = sock.recv_into(view)
+        if n_bytes == 0:
+            raise ConnectionError("Connection closed by the peer")
+        view = view[n_bytes:]
+
+
+def recv_header(sock):
+    """
+    :param sock: connected socket
+    :return: message kind or response status, and payload size in bytes
+    """
+    header = bytearray(HEADER.size)
+    recv_into(sock, header)
+    return HEADER.unpack(header)
+
+
+def _space_spec(space):
+    return {"shape": space.shape, "dtype": space.dtype.name, "low": space.low.tolist(), "high": space.high.tolist()}
+
+
+def _space_from_spec(spec):
+    dtype = np.dtype(spec["dtype"])
+    return gymnasium.spaces.Box(np.array(spec["low"], dtype=dtype), np.array(spec["high"], dtype=dtype), dtype=dtype)
+
+
+class EnvServer:
+    """
+    Server of a vector env of registered Bullet environments, for one client at a time.
+
+    :param env_id: id of a registered environment
+    :param num_envs: number of environments
+    :param address: (host, port) to listen to over TCP, port 0 picks a free port, or the path of a Unix socket
+    :param max_episode_steps: truncate episodes after that many steps, the limit of the registered environment by default
+    :param vector_env_class: class of the vector env, ``BulletVectorEnv`` or one of its subclasses,
+        e.g. ``StadiumVectorEnv`` to run many locomotion robots in one physics world
+    :param kwargs: keyword arguments for the environment constructor
+    """
+
+    def __init__(
+        self, env_id, num_envs=1, address=("127.0.0.1", 0), max_episode_steps=None, vector_env_class=BulletVectorEnv, **kwargs
+    ):
+        spec = gymnasium.spec(env_id)
+        if max_episode_steps is None:
+            max_episode_steps = spec.max_episode_steps
+        self.envs = vector_env_class(
+            spec.entry_point, num_envs=num_envs, max_episode_steps=max_episode_steps, copy=False, **{**spec.kwargs, **kwargs}
+        )
+        self.spec = {
+            "env_id": env_id,
+            "num_envs": num_envs,
+            "max_episode_steps": max_episode_steps,
+            "observation_space": _space_spec(self.envs.single_observation_space),
+            "action_space": _space_spec(self.envs.single_action_space),
+        }
+        self._actions = np.zeros(self.envs.action_space.shape, dtype=self.envs.action_space.dtype)
+        self._seeds = np.zeros(num_envs, dtype=np.int64)
+        self._seeded = np.zeros(num_envs, dtype=np.bool_)
+        self._reset_mask = np.zeros(num_envs, dtype=np.bool_)
+
+        self.socket = _open_socket(address)
+        if not isinstance(address, str):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind(address)
+        self.socket.listen()
+        # the actual port when listening to port 0
+        self.address = self.socket.getsockname()
+
+    def serve_forever(self):
+        """
+        Serve clients one after the other, until the server is closed.
+        """
+        while True:
+            try:
+                connection, _ = self.socket.accept()
+            except OSError:  # closed
+                return
+            with connection:
+                if not isinstance(self.address, str):
+                    connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                try:
+                    self._serve(connection)
+                except ConnectionError:
+                    pass
+
+    def _serve(self, connection):
+        payload_sizes = {
+            SPEC: 0,
+            RESET: self._seeds.nbytes + self._seeded.nbytes + self._reset_mask.nbytes,
+            STEP: self._actions.nbytes,
+        }
+        while True:
+            kind, size = recv_header(connection)
+            if kind == CLOSE:
+                return
+            try:
+                if payload_sizes.get(kind) != size:
+                    recv_into(connection, bytearray(size))
+                    raise ValueError(f"Unexpected message kind {kind} or payload size {size}")
+                if kind == SPEC:
+                    send_message(connection, OK, json.dumps(self.spec).encode())
+                elif kind == RESET:
+                    recv_into(connection, self._seeds)
+                    recv_into(connection, self._seeded)
+                    recv_into(connection, self._reset_mask)
+                    seeds = [int(seed) if seeded else None for seed, seeded in zip(self._seeds, self._seeded)]
+                    obs, _ = self.envs.reset(seed=seeds, options={"reset_mask": self._reset_mask.copy()})
+                    send_message(connection, OK, obs)
+                elif kind == STEP:
+                    recv_into(connection, self._actions)
+                    obs, rewards, terminations, truncations, _ = self.envs.step(self._actions)
+                    send_message(connection, OK, obs, rewards, terminations, truncations)
+            except ConnectionError:
+                raise
+            except Exception:
+                send_message(connection, ERROR, traceback.format_exc().encode())
+
+    def close(self):
+        """
+        Stop listening, and close the environments.
+        """
+        try:
+            # wakes up accept() in serve_forever()
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.socket.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+        self.envs.close()
+
+
+class RemoteVectorEnv(gymnasium.vector.VectorEnv):
+    """
+    Vectorized environment whose environments are hosted by one or more ``EnvServer``:
+    the batch is the concatenation of the vector envs of the servers, in the order of ``addresses``.
+    step() and reset() send the requests to all the servers before waiting for the first response,
+    the servers work in parallel. Responses are received straight into the batch arrays.
+    Environments are reset on the step after they terminate or get truncated (next step autoreset),
+    on the server side. The info dicts of the environments are not transported.
+
+    :param addresses: addresses of the servers, (host, port) for TCP or the path of a Unix socket
+    :param copy: return copies of the batch arrays instead of the arrays themselves,
+        which are overwritten by the next step() or reset()
+    :param timeout: socket timeout (s), ``None`` to wait forever
+    """
+
+    def __init__(self, addresses, copy=True, timeout=None):
+        super().__init__()
+        self.sockets = []
+        specs = []
+        for address in addresses:
+            sock = _open_socket(address)
+            sock.settimeout(timeout)
+            sock.connect(address)
+            self.sockets.append(sock)
+            send_message(sock, SPEC)
+            specs.append(json.loads(self._recv_response(sock)))
+        for spec in specs[1:]:
+            for key in ("env_id", "observation_space", "action_space"):
+                if spec[key] != specs[0][key]:
+                    raise ValueError(f"The servers do not serve the same environment: {spec[key]} != {specs[0][key]}")
+
+        self.env_id = specs[0]["env_id"]
+        self.metadata = {"autoreset_mode": AutoresetMode.NEXT_STEP} if AutoresetMode is not None else {}
+        self.single_observation_space = _space_from_spec(specs[0]["observation_space"])
+        self.single_action_space = _space_from_spec(specs[0]["action_space"])
+        sizes = [spec["num_envs"] for spec in specs]
+        self.num_envs = sum(sizes)
+        self.observation_space = batch_space(self.single_observation_space, self.num_envs)
+        self.action_space = batch_space(self.single_action_space, self.num_envs)
+        bounds = np.cumsum([0, *sizes])
+        self.slices = [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+        self.copy = copy
+
+        self._observations = np.zeros(self.observation_space.shape, dtype=self.observation_space.dtype)
+        self._rewards = np.zeros(self.num_envs, dtype=np.float64)
+        self._terminations = np.zeros(self.num_envs, dtype=np.bool_)
+        self._truncations = np.zeros(self.num_envs, dtype=np.bool_)
+
+    def reset(self, *, seed=None, options=None):
+        """
+        Reset all the environments, or the ones selected by ``options["reset_mask"]``.
+
+        :param seed: ``None``, an int (env ``i`` is seeded with ``seed + i``) or a list of seeds
+        :param options: only ``reset_mask`` is supported, the other options are not transported
+        :return: batch of observations, and infos
+        """
+        if seed is None:
+            seed = [None] * self.num_envs
+        elif isinstance(seed, int):
+            seed = [seed + i for i in range(self.num_envs)]
+        if len(seed) != self.num_envs:
+            raise ValueError(f"If seeds are passed as a list the length must match num_envs={self.num_envs}, got {len(seed)}")
+        reset_mask = np.ones(self.num_envs, dtype=np.bool_)
+        if options is not None and "reset_mask" in options:
+            reset_mask = options["reset_mask"]
+            if not isinstance(reset_mask, np.ndarray) or reset_mask.shape != (self.num_envs,) or reset_mask.dtype != np.bool_:
+                raise ValueError(f"options['reset_mask'] must be a boolean array of shape ({self.num_envs},)")
+
+        seeded = np.array([s is not None for s in seed], dtype=np.bool_)
+        seeds = np.array([0 if s is None else s for s in seed], dtype=np.int64)
+        for sock, envs in zip(self.sockets, self.slices):
+            send_message(sock, RESET, seeds[envs], seeded[envs], np.ascontiguousarray(reset_mask[envs]))
+        self._recv_responses([(self._observations[envs],) for envs in self.slices])
+        self._terminations[reset_mask] = False
+        self._truncations[reset_mask] = False
+        return self._output(self._observations), {}
+
+    def step(self, actions):
+        """
+        Step all the environments, the ones that ended on the previous step are reset instead.
+
+        :param actions: batch of actions
+        :return: batch of observations, rewards, terminations, truncations, and infos
+        """
+        actions = np.ascontiguousarray(actions, dtype=self.action_space.dtype)
+        for sock, envs in zip(self.sockets, self.slices):
+            send_message(sock, STEP, actions[envs])
+        self._recv_responses(
+            [
+                (self._observations[envs], self._rewards[envs], self._terminations[envs], self._truncations[envs])
+                for envs in self.slices
+            ]
+        )
+        return (
+            self._output(self._observations),
+            self._output(self._rewards),
+            self._output(self._terminations),
+            self._output(self._truncations),
+            {},
+        )
+
+    def _recv_responses(self, arrays_per_server):
+        """
+        Receive the response of every server, then raise the errors of the ones that failed:
+        an error does not leave the responses of the next servers unread for the next request.
+
+        :param arrays_per_server: per server, the arrays to receive its response into
+        """
+        errors = []
+        for sock, arrays in zip(self.sockets, arrays_per_server):
+            try:
+                self._recv_response(sock, *arrays)
+            except RuntimeError as error:
+                errors.append(str(error))
+        if errors:
+            raise RuntimeError("\n".join(errors))
+
+    @staticmethod
+    def _recv_response(sock, *arrays):
+        """
+        Receive a response into ``arrays``.
+
+        :return: the payload if no array is given
+        """
+        status, size = recv_header(sock)
+        if status == ERROR or not arrays:
+            payload = bytearray(size)
+            recv_into(sock, payload)
+            if status == ERROR:
+                raise RuntimeError("Error in env server:\n" + payload.decode())
+            return payload
+        if size != sum(array.nbytes for array in arrays):
+            raise RuntimeError(f"Unexpected response size {size}")
+        for array in arrays:
+            recv_into(sock, array)
+        return None
+
+    def _output(self, batch):
+        return batch.copy() if self.copy else batch
+
+    def close_extras(self, **kwargs):
+        for sock in self.sockets:
+            try:
+                send_message(sock, CLOSE)
+            except OSError:
+                pass
+            sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a vector env of registered Bullet environments")
+    parser.add_argument("env", help="Environment id, e.g. HopperBulletEnv-v0")
+    parser.add_argument("--num-envs", type=int, default=1, help="Number of environments")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen to, 0.0.0.0 for all the interfaces")
+    parser.add_argument("--port", type=int, default=5555, help="TCP port")
+    parser.add_argument("--unix-socket", help="Listen to this Unix socket instead of TCP")
+    parser.add_argument("--max-episode-steps", type=int, help="Truncate episodes after that many steps")
+    args = parser.parse_args()
+
+    address = args.unix_socket if args.unix_socket else (args.host, args.port)
+    server = EnvServer(args.env, num_envs=args.num_envs, address=address, max_episode_steps=args.max_episode_steps)
+    print(f"Serving {args.num_envs} {args.env} on {server.address}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Population evaluation for evolution strategies (ES) and augmented random search (ARS).
+
+The Gaussian perturbations are slices of one large noise table, created once in shared memory and attached
+by every worker. The current parameters are in shared memory as well, so a perturbation is only described by
+an ``(offset, sign, seed)`` triple: the worker evaluates ``params + sign * noise_std * noise[offset : offset + n_params]``
+on an episode seeded with ``seed``, with ``rollout()``, and sends back its return and length.
+"""
+
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any
+
+import gymnasium as gym
+import numpy as np
+
+from pybullet_envs_gymnasium.vector.rollout import _init_worker as _init_rollout_worker
+from pybullet_envs_gymnasium.vector.rollout import n_policy_params, rollout
+
+
+class SharedNoiseTable:
+    """
+    Table of standard Gaussian noise (float32) in a ``multiprocessing.shared_memory`` block.
+    Pickling it only sends the name of the block: workers attach to it without any copy.
+
+    :param size: number of values, 25 million (100 MB) by default
+    :param seed: seed of the noise
+    """
+
+    def __init__(self, size=25_000_000, seed=0):
+        self.size = size
+        self.shm = shared_memory.SharedMemory(create=True, size=size * np.dtype(np.float32).itemsize)
+        self.noise = np.ndarray((size,), dtype=np.float32, buffer=self.shm.buf)
+        np.random.default_rng(seed).standard_normal(size, dtype=np.float32, out=self.noise)
+
+    def __getstate__(self):
+        return {"size": self.size, "shm": self.shm}
+
+    def __setstate__(self, state):
+        self.size = state["size"]
+        self.shm = state["shm"]
+        self.noise = np.ndarray((self.size,), dtype=np.float32, buffer=self.shm.buf)
+
+    def get(self, offset, dim):
+        """
+        :return: the ``dim`` values from ``offset``, a view of the table
+        """
+        return self.noise[offset : offset + dim]
+
+    def sample_offsets(self, rng, dim, n):
+        """
+        :param rng: ``np.random.Generator``
+        :param dim: size of a perturbation
+        :param n: number of offsets
+        :return: ``n`` random offsets of perturbations of size ``dim``
+        """
+        if dim > self.size:
+            raise ValueError(f"Perturbations of size {dim} do not fit in a noise table of size {self.size}")
+        return rng.integers(0, self.size - dim + 1, size=n)
+
+    def close(self, unlink=False):
+        """
+        :param unlink: also free the block, only the process that created it does it
+        """
+        del self.noise
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# Per worker: noise table, shared parameters and rollout arguments, set by _init_worker()
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(noise_table, params_shm, n_params, noise_std, env_id, rollout_kwargs):
+    _init_rollout_worker()
+    _worker.update(
+        noise_table=noise_table,
+        params_shm=params_shm,
+        params=np.ndarray((n_params,), dtype=np.float64, buffer=params_shm.buf),
+        noise_std=noise_std,
+        env_id=env_id,
+        rollout_kwargs=rollout_kwargs,
+    )
+
+
+def _evaluate_perturbation(offset, sign, seed):
+    params = _worker["params"]
+    perturbed = params + sign * _worker["noise_std"] * _worker["noise_table"].get(offset, len(params))
+    result = rollout(_worker["env_id"], perturbed, seed=seed, **_worker["rollout_kwargs"])
+    return result.returns[0], result.lengths[0]
+
+
+class PopulationEvaluator:
+    """
+    Evaluate perturbations of a NumPy policy (see ``pybullet_envs_gymnasium.vector.rollout``) in a process pool.
+    Each generation, ``evaluate()`` writes the parameters into shared memory once, then sends the workers
+    ``(offset, sign, seed)`` triples only.
+
+    :param env_id: registered environment id, e.g. "HopperBulletEnv-v0" or "HalfCheetahBulletEnv-v0"
+    :param noise_table: ``SharedNoiseTable``, one is created (and freed by ``close()``) if ``None``
+    :param noise_std: standard deviation of the perturbations
+    :param policy_kind: "linear" or "mlp"
+    :param hidden_sizes: units of the hidden layers of an MLP
+    :param n_steps: maximum length of an episode, ``max_episode_steps`` of the env id by default
+    :param num_workers: number of worker processes, one per CPU by default
+    :param context: multiprocessing start method, see ``multiprocessing.get_context()``
+    :param kwargs: keyword arguments for the environment constructor
+    """
+
+    def __init__(
+        self,
+        env_id,
+        noise_table=None,
+        noise_std=0.02,
+        policy_kind="linear",
+        hidden_sizes=(32,),
+        n_steps=None,
+        num_workers=None,
+        context=None,
+        **kwargs,
+    ):
+        env = gym.make(env_id)
+        self.n_params = n_policy_params(policy_kind, env.observation_space.shape[0], env.action_space.shape[0], hidden_sizes)
+        env.close()
+        self._owns_noise_table = noise_table is None
+        self.noise_table = SharedNoiseTable() if noise_table is None else noise_table
+        if self.n_params > self.noise_table.size:
+            raise ValueError(
+                f"The policy has {self.n_params} parameters, more than the noise table size {self.noise_table.size}"
+            )
+        self.noise_std = noise_std
+        self._params_shm = shared_memory.SharedMemory(create=True, size=self.n_params * np.dtype(np.float64).itemsize)
+        self.params = np.ndarray((self.n_params,), dtype=np.float64, buffer=self._params_shm.buf)
+        self.params[:] = 0.0
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        rollout_kwargs = {"policy_kind": policy_kind, "hidden_sizes": hidden_sizes, "n_steps": n_steps, **kwargs}
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context(context),
+            initializer=functools.partial(
+                _init_worker, self.noise_table, self._params_shm, self.n_params, noise_std, env_id, rollout_kwargs
+            ),
+        )
+        self.closed = False
+
+    def evaluate(self, params, offsets, signs, seeds=None, chunksize=None):
+        """
+        Evaluate the perturbations ``params + signs[i] * noise_std * noise[offsets[i] : offsets[i] + n_params]``,
+        one episode each. Antithetic pairs use each offset twice, with signs 1 and -1.
+
+        :param params: flat parameter vector of the policy
+        :param offsets: offsets of the perturbations in the noise table, see ``SharedNoiseTable.sample_offsets()``
+        :param signs: 1 or -1 per perturbation, 0 evaluates ``params`` itself
+        :param seeds: seed (a non-negative int or ``None``) of the episode of each perturbation,
+            or one seed for all of them
+        :param chunksize: perturbations per task, by default about 4 tasks per worker
+        :return: episode returns and lengths, in the order of ``offsets``
+        """
+        offsets, signs = np.asarray(offsets, dtype=np.int64), np.asarray(signs, dtype=np.float64)
+        if offsets.shape != signs.shape or offsets.ndim != 1:
+            raise ValueError(f"Expected offsets and signs of the same 1D shape, got {offsets.shape} and {signs.shape}")
+        if len(offsets) and (offsets.min() < 0 or offsets.max() + self.n_params > self.noise_table.size):
+            raise ValueError("Perturbations out of the noise table")
+        if seeds is None or isinstance(seeds, (int, np.integer)):
+            seeds = [seeds] * len(offsets)
+        if len(seeds) != len(offsets):
+            raise ValueError(f"Expected {len(offsets)} seeds, one per perturbation, got {len(seeds)}")
+        seeds = [None if seed is None else int(seed) for seed in seeds]
+        if any(seed is not None and seed < 0 for seed in seeds):
+            raise ValueError("Seeds must be non-negative ints or None")
+        # Read by the workers, no task is in flight between two calls
+        self.params[:] = params
+        chunksize = chunksize or max(1, len(offsets) // (4 * self.num_workers))
+        results = list(self.executor.map(_evaluate_perturbation, offsets, signs, seeds, chunksize=chunksize))
+        returns = np.array([episode_return for episode_return, _ in results])
+        lengths = np.array([length for _, length in results], dtype=np.int64)
+        return returns, lengths
+
+    def close(self):
+        if self.closed:
+            return
+        self.executor.shutdown()
+        del self.params
+        self._params_shm.close()
+        self._params_shm.unlink()
+        if self._owns_noise_table:
+            self.noise_table.close(unlink=True)
+        self.closed = True
@@ -0,0 +1,213 @@
+"""
+Rollouts of small NumPy policies (linear or MLP) next to the environments, for evolution strategies and random search.
+
+The policy parameters go to the process that runs the environment once per rollout, and only the returns
+and episode lengths come back (optionally compact trajectories): no inter-process communication per step.
+``rollout()`` runs in the current process, ``RolloutPool`` runs them in a process pool.
+
+Policy parameters are flat vectors, the weights ``W`` (shape ``(n_out, n_in)``) and biases ``b`` of each layer
+one after the other. A linear policy is ``W @ obs + b``, an MLP has ``tanh`` hidden layers of ``hidden_sizes`` units
+and a linear output layer. Actions are clipped to the bounds of the action space.
+"""
+
+import collections
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.envs.registration import load_env_creator
+
+POLICY_KINDS = ("linear", "mlp")
+
+RolloutResult = collections.namedtuple("RolloutResult", ["returns", "lengths", "trajectories"])
+Trajectory = collections.namedtuple("Trajectory", ["observations", "actions", "rewards"])
+
+# Environments of the current process, by env id and constructor kwargs, reused by the next rollouts
+_envs: dict[tuple, gym.Env] = {}
+
+
+def policy_shapes(policy_kind, obs_dim, act_dim, hidden_sizes=(32,)):
+    """
+    :param policy_kind: "linear" or "mlp"
+    :param obs_dim: size of the observations
+    :param act_dim: size of the actions
+    :param hidden_sizes: units of the hidden layers of an MLP
+    :return: shapes of the weights and biases of the layers, in the order of the flat parameters
+    """
+    if policy_kind == "linear":
+        sizes = [obs_dim, act_dim]
+    elif policy_kind == "mlp":
+        sizes = [obs_dim, *hidden_sizes, act_dim]
+    else:
+        raise ValueError(f"Unknown policy kind {policy_kind!r}, expected one of {POLICY_KINDS}")
+    shapes = []
+    for n_in, n_out in zip(sizes[:-1], sizes[1:]):
+        shapes += [(n_out, n_in), (n_out,)]
+    return shapes
+
+
+def n_policy_params(policy_kind, obs_dim, act_dim, hidden_sizes=(32,)):
+    """
+    :return: size of the flat parameter vector of a policy, see ``policy_shapes()``
+    """
+    return sum(int(np.prod(shape)) for shape in policy_shapes(policy_kind, obs_dim, act_dim, hidden_sizes))
+
+
+class NumpyPolicy:
+    """
+    Linear or MLP policy whose layers are views of a flat parameter vector.
+
+    :param policy_kind: "linear" or "mlp"
+    :param policy_params: flat parameter vector, see ``policy_shapes()``
+    :param obs_dim: size of the observations
+    :param act_dim: size of the actions
+    :param hidden_sizes: units of the hidden layers of an MLP
+    """
+
+    def __init__(self, policy_kind, policy_params, obs_dim, act_dim, hidden_sizes=(32,)):
+        shapes = policy_shapes(policy_kind, obs_dim, act_dim, hidden_sizes)
+        policy_params = np.asarray(policy_params, dtype=np.float64)
+        n_params = sum(int(np.prod(shape)) for shape in shapes)
+        if policy_params.shape != (n_params,):
+            raise ValueError(f"Expected {n_params} parameters for a {policy_kind} policy, got shape {policy_params.shape}")
+        arrays, offset = [], 0
+        for shape in shapes:
+            size = int(np.prod(shape))
+            arrays.append(policy_params[offset : offset + size].reshape(shape))
+            offset += size
+        self.layers = list(zip(arrays[::2], arrays[1::2]))
+
+    def __call__(self, obs):
+        x = obs
+        for i, (weights, biases) in enumerate(self.layers):
+            x = weights @ x + biases
+            if i < len(self.layers) - 1:
+                np.tanh(x, out=x)
+        return x
+
+
+def _get_env(env_id, env_kwargs):
+    key = (env_id, tuple(sorted(env_kwargs.items())))
+    if key not in _envs:
+        # observations are only read by the policy before the next step, views spare the copies
+        _envs[key] = load_env_creator(gym.spec(env_id).entry_point)(**{"obs_view": True, **env_kwargs})
+    return _envs[key]
+
+
+def rollout(
+    env_id,
+    policy_params,
+    policy_kind="linear",
+    n_steps=None,
+    seed=None,
+    n_episodes=1,
+    hidden_sizes=(32,),
+    return_trajectories=False,
+    **kwargs,
+):
+    """
+    Run whole episodes of a registered environment with a NumPy policy, in the current process.
+    The environment is created by the first rollout and reused by the next ones with the same id and kwargs.
+
+    :param env_id: registered environment id
+    :param policy_params: flat parameter vector of the policy
+    :param policy_kind: "linear" or "mlp"
+    :param n_steps: maximum length of an episode, ``max_episode_steps`` of the env id by default
+    :param seed: seed of the first reset, the next episodes follow. ``None`` continues the random stream
+        of the reused environment: the rollout is not reproducible.
+    :param n_episodes: number of episodes
+    :param hidden_sizes: units of the hidden layers of an MLP
+    :param return_trajectories: also return the observations, actions and rewards of each episode, as float32
+    :param kwargs: keyword arguments for the environment constructor
+    :return: ``RolloutResult(returns, lengths, trajectories)``, ``trajectories`` is ``None``
+        unless ``return_trajectories``, a list of ``Trajectory(observations, actions, rewards)`` otherwise
+    """
+    if n_steps is None:
+        n_steps = gym.spec(env_id).max_episode_steps
+    if not isinstance(n_steps, (int, np.integer)) or n_steps < 1:
+        raise ValueError(f"n_steps must be a positive int, or None for the max_episode_steps of {env_id}, got {n_steps!r}")
+    env = _get_env(env_id, kwargs)
+    low, high = env.action_space.low, env.action_space.high
+    obs_dim, act_dim = env.observation_space.shape[0], env.action_space.shape[0]
+    policy = NumpyPolicy(policy_kind, policy_params, obs_dim, act_dim, hidden_sizes)
+    returns = np.zeros(n_episodes)
+    lengths = np.zeros(n_episodes, dtype=np.int64)
+    trajectories = [] if return_trajectories else None
+    for episode in range(n_episodes):
+        obs, _ = env.reset(seed=seed if episode == 0 else None)
+        if return_trajectories:
+            observations = np.zeros((n_steps, obs_dim), dtype=np.float32)
+            actions = np.zeros((n_steps, act_dim), dtype=np.float32)
+            rewards = np.zeros(n_steps, dtype=np.float32)
+        length = 0
+        for t in range(n_steps):
+            # in the dtype of the action space, so that the recorded trajectories replay exactly
+            action = np.clip(policy(obs), low, high).astype(env.action_space.dtype)
+            if return_trajectories:
+                observations[t] = obs
+                actions[t] = action
+            obs, reward, terminated, _, _ = env.step(action)
+            length += 1
+            returns[episode] += reward
+            if return_trajectories:
+                rewards[t] = reward
+            if terminated:
+                break
+        lengths[episode] = length
+        if return_trajectories:
+            trajectories.append(Trajectory(observations[:length].copy(), actions[:length].copy(), rewards[:length].copy()))
+    return RolloutResult(returns, lengths, trajectories)
+
+
+def _init_worker():
+    # forked workers start without the environments of the parent process
+    _envs.clear()
+
+
+def _rollout_with_seed(env_id, rollout_kwargs, policy_params, seed):
+    return rollout(env_id, policy_params, seed=seed, **rollout_kwargs)
+
+
+class RolloutPool:
+    """
+    Process pool for ``rollout()``. Each worker keeps its environments from one task to the next,
+    a task only carries the policy parameters and its result only the returns and lengths.
+
+    :param num_workers: number of worker processes, one per CPU by default
+    :param context: multiprocessing start method, see ``multiprocessing.get_context()``
+    """
+
+    def __init__(self, num_workers=None, context=None):
+        self.executor = ProcessPoolExecutor(
+            max_workers=num_workers, mp_context=multiprocessing.get_context(context), initializer=_init_worker
+        )
+
+    def submit(self, env_id, policy_params, policy_kind="linear", n_steps=None, seed=None, **kwargs):
+        """
+        Start one rollout, see ``rollout()`` for the arguments.
+
+        :return: a ``concurrent.futures.Future`` of its ``RolloutResult``
+        """
+        return self.executor.submit(rollout, env_id, policy_params, policy_kind, n_steps, seed, **kwargs)
+
+    def map(self, env_id, population, policy_kind="linear", n_steps=None, seeds=None, chunksize=1, **kwargs):
+        """
+        Evaluate a population of policies, see ``rollout()`` for the other arguments.
+
+        :param population: flat parameter vectors, e.g. the rows of a 2D array
+        :param seeds: one seed per policy, or an int for all of them (common random numbers: the policies
+            start from the same states), or ``None``
+        :param chunksize: number of rollouts per task, more amortize the task overhead for short episodes
+        :return: the ``RolloutResult`` of each policy, in the order of ``population``
+        """
+        if seeds is None or isinstance(seeds, int):
+            seeds = [seeds] * len(population)
+        if len(seeds) != len(population):
+            raise ValueError(f"Expected {len(population)} seeds, one per policy, got {len(seeds)}")
+        run = functools.partial(_rollout_with_seed, env_id, {"policy_kind": policy_kind, "n_steps": n_steps, **kwargs})
+        return list(self.executor.map(run, population, seeds, chunksize=chunksize))
+
+    def close(self):
+        self.executor.shutdown()
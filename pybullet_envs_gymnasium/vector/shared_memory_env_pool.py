@@ -0,0 +1,273 @@
+import multiprocessing
+import sys
+import traceback
+
+import numpy as np
+from gymnasium.envs.registration import load_env_creator
+
+from pybullet_envs_gymnasium.vector.cpu_affinity import placement_report, worker_cpus
+from pybullet_envs_gymnasium.vector.shared_memory_vector_env import (
+    RESET,
+    STEP,
+    SharedMemoryBatch,
+    _make_envs,
+    _prefetch_resets,
+    _run_command,
+    auto_envs_per_worker,
+)
+
+
+def _pool_worker(entry_point, env_kwargs, env_ids, cpus, prefetch_resets, batch, pipe, ready_queue):
+    envs = {}
+    try:
+        envs = dict(zip(env_ids, _make_envs(entry_point, env_kwargs, env_ids, batch, cpus)))
+        ready_queue.put(None)
+    except Exception:
+        ready_queue.put((None, traceback.format_exc()))
+    prefetch_error = None
+    while True:
+        if prefetch_resets and prefetch_error is None:
+            try:
+                _prefetch_resets(envs.values(), pipe.poll)
+            except Exception:
+                # reported with the result of the next command
+                prefetch_error = traceback.format_exc()
+        sent_ids = pipe.recv()
+        if sent_ids is None:
+            break
+        for env_id in sent_ids:
+            try:
+                if prefetch_error is not None:
+                    raise RuntimeError(f"Error while prefetching resets:\n{prefetch_error}")
+                _run_command(env_id, envs[env_id], batch)
+                ready_queue.put(env_id)
+            except Exception:
+                ready_queue.put((env_id, traceback.format_exc()))
+        # reported once, with the results of these environments
+        prefetch_error = None
+    for env in envs.values():
+        env.close()
+    batch.close()
+    pipe.close()
+
+
+class SharedMemoryEnvPool:
+    """
+    Pool of Bullet environments stepped asynchronously in worker processes, with the ``send()`` / ``recv()``
+    interface of EnvPool: ``send()`` hands actions to some environments and returns immediately,
+    ``recv()`` returns the results of the first ``batch_size`` environments that finish, with their ids,
+    and the other environments stay in flight. A vector step no longer waits for the slowest environment,
+    e.g. one that is being reset. With ``prefetch_resets``, workers sample the initial states of the next
+    episodes while they wait for actions, like ``SharedMemoryVectorEnv`` does.
+
+    Results go through the shared memory batch arrays of ``SharedMemoryVectorEnv``, only the ids of the
+    environments to run and of the finished ones are pickled. Environments are reset on the step
+    after they terminate or get truncated (next step autoreset). The info dicts of the environments
+    are not transported.
+
+    :param entry_point: environment class, or its "module:Class" path
+    :param num_envs: number of environments
+    :param batch_size: number of environments returned by ``recv()``, ``num_envs`` by default
+    :param envs_per_worker: number of environments per worker process, or "auto" for one worker per CPU available.
+        A worker runs its environments one after the other, one per worker lets them finish in any order.
+    :param max_episode_steps: truncate episodes after that many steps, ``None`` for no limit
+    :param context: multiprocessing start method, see ``multiprocessing.get_context()``
+    :param placement: CPU placement policy of the workers: ``None``, "compact", "spread" or one CPU list per worker,
+        see ``pybullet_envs_gymnasium.vector.cpu_affinity``
+    :param prefetch_resets: fill the reset pools of the environments in the idle time of the workers,
+        with ``reset_pool_size=1`` unless the environment kwargs set it
+    :param kwargs: keyword arguments for the environment constructor
+    """
+
+    def __init__(
+        self,
+        entry_point,
+        num_envs=1,
+        batch_size=None,
+        envs_per_worker=1,
+        max_episode_steps=None,
+        context=None,
+        placement=None,
+        prefetch_resets=False,
+        **kwargs,
+    ):
+        env_creator = load_env_creator(entry_point) if isinstance(entry_point, str) else entry_point
+        if prefetch_resets:
+            kwargs.setdefault("reset_pool_size", 1)
+        # The environments do not connect to the physics server before their first reset
+        dummy_env = env_creator(**kwargs)
+        self.single_observation_space = dummy_env.observation_space
+        self.single_action_space = dummy_env.action_space
+        dummy_env.close()
+        self.num_envs = num_envs
+        self.batch_size = num_envs if batch_size is None else batch_size
+        if not 1 <= self.batch_size <= num_envs:
+            raise ValueError(f"batch_size must be between 1 and num_envs={num_envs}, got {batch_size}")
+        if envs_per_worker == "auto":
+            envs_per_worker = auto_envs_per_worker(num_envs)
+        if not isinstance(envs_per_worker, int) or envs_per_worker < 1:
+            raise ValueError(f"envs_per_worker must be a positive int or 'auto', got {envs_per_worker!r}")
+        self.num_workers = -(-num_envs // envs_per_worker)
+        self.worker_cpus = worker_cpus(self.num_workers, placement)
+        self.max_episode_steps = max_episode_steps
+
+        self._in_flight = np.zeros(num_envs, dtype=np.bool_)
+        self._autoreset_envs = np.zeros(num_envs, dtype=np.bool_)
+        self._episode_steps = np.zeros(num_envs, dtype=np.int64)
+        self.batch = SharedMemoryBatch(num_envs, self.num_workers, self.single_observation_space, self.single_action_space)
+
+        kwargs["obs_view"] = True
+        ctx = multiprocessing.get_context(context)
+        self._ready_queue = ctx.SimpleQueue()
+        self._worker_of_env = np.zeros(num_envs, dtype=np.int64)
+        self.pipes, self.processes = [], []
+        for worker_index, env_ids in enumerate(np.array_split(np.arange(num_envs), self.num_workers)):
+            self._worker_of_env[env_ids] = worker_index
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_pool_worker,
+                name=f"Worker<{type(self).__name__}>-{worker_index}",
+                args=(
+                    entry_point,
+                    kwargs,
+                    env_ids.tolist(),
+                    self.worker_cpus[worker_index],
+                    prefetch_resets,
+                    self.batch,
+                    child_pipe,
+                    self._ready_queue,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child_pipe.close()
+            self.pipes.append(parent_pipe)
+            self.processes.append(process)
+        errors = [message[1] for message in (self._ready_queue.get() for _ in self.processes) if message is not None]
+        self.closed = False
+        if errors:
+            self.close()
+            raise RuntimeError("Error in worker process:\n" + "\n".join(errors))
+
+    def async_reset(self, seed=None):
+        """
+        Start resetting all the environments, ``recv()`` returns the first observations.
+
+        :param seed: ``None``, an int (env ``i`` is seeded with ``seed + i``) or a list of seeds
+        """
+        if seed is None:
+            seed = [None] * self.num_envs
+        elif isinstance(seed, int):
+            seed = [seed + i for i in range(self.num_envs)]
+        if len(seed) != self.num_envs:
+            raise ValueError(f"If seeds are passed as a list the length must match num_envs={self.num_envs}, got {len(seed)}")
+        if self._in_flight.any():
+            raise RuntimeError("Cannot reset while environments are in flight, recv() their results first")
+        batch = self.batch
+        batch.seeded[:] = [s is not None for s in seed]
+        batch.seeds[:] = [0 if s is None else s for s in seed]
+        batch.commands[:] = RESET
+        self._dispatch(np.arange(self.num_envs))
+
+    def send(self, actions, env_ids=None):
+        """
+        Start stepping environments, the ones that ended on their previous step are reset instead.
+
+        :param actions: one action per environment of ``env_ids``
+        :param env_ids: ids of the environments to step, all of them by default.
+            Usually the ids returned by the previous ``recv()``.
+        """
+        env_ids = np.arange(self.num_envs) if env_ids is None else np.asarray(env_ids, dtype=np.int64)
+        if len(actions) != len(env_ids):
+            raise ValueError(f"Got {len(actions)} actions for {len(env_ids)} environments")
+        if self._in_flight[env_ids].any() or len(np.unique(env_ids)) != len(env_ids):
+            raise RuntimeError(f"Environments {env_ids[self._in_flight[env_ids]].tolist()} are already in flight")
+        batch = self.batch
+        batch.actions[env_ids] = actions
+        batch.seeded[env_ids] = False
+        batch.commands[env_ids] = np.where(self._autoreset_envs[env_ids], RESET, STEP)
+        self._dispatch(env_ids)
+
+    def _dispatch(self, env_ids):
+        self._in_flight[env_ids] = True
+        workers = self._worker_of_env[env_ids]
+        for worker_index in np.unique(workers):
+            self.pipes[worker_index].send(env_ids[workers == worker_index].tolist())
+
+    def recv(self):
+        """
+        Wait for the first ``batch_size`` environments to finish, or for all the ones in flight if there are fewer.
+
+        :return: observations, rewards, terminations, truncations of these environments,
+            and infos, ``infos["env_id"]`` holds their ids
+        """
+        n_envs = min(self.batch_size, int(self._in_flight.sum()))
+        if n_envs == 0:
+            raise RuntimeError("No environment in flight, send() actions first")
+        env_ids, errors = [], []
+        while len(env_ids) + len(errors) < n_envs:
+            message = self._ready_queue.get()
+            if isinstance(message, tuple):
+                self._in_flight[message[0]] = False
+                errors.append(message[1])
+            else:
+                env_ids.append(message)
+        env_ids = np.array(env_ids, dtype=np.int64)
+        # Also on error: the environments that finished can be sent actions again
+        self._in_flight[env_ids] = False
+        if errors:
+            raise RuntimeError("Error in worker process:\n" + "\n".join(errors))
+
+        batch = self.batch
+        reset = batch.commands[env_ids] == RESET
+        batch.rewards[env_ids[reset]] = 0.0
+        batch.terminations[env_ids[reset]] = False
+        batch.truncations[env_ids[reset]] = False
+        self._episode_steps[env_ids[reset]] = 0
+        self._episode_steps[env_ids[~reset]] += 1
+        if self.max_episode_steps is not None:
+            batch.truncations[env_ids] |= self._episode_steps[env_ids] >= self.max_episode_steps
+        self._autoreset_envs[env_ids] = batch.terminations[env_ids] | batch.truncations[env_ids]
+        return (
+            batch.observations[env_ids],
+            batch.rewards[env_ids],
+            batch.terminations[env_ids],
+            batch.truncations[env_ids],
+            {"env_id": env_ids},
+        )
+
+    def placement_report(self):
+        """
+        :return: one line per worker with its CPUs, NUMA nodes and physical cores
+        """
+        return placement_report(self.worker_cpus)
+
+    def reset_pool_counters(self):
+        """
+        :return: per environment, the number of resets that restored a state of the reset pool (hits),
+            and of resets that found the pool empty and sampled states first (misses)
+        """
+        return self.batch.reset_pool_hits.copy(), self.batch.reset_pool_misses.copy()
+
+    def close(self, terminate=False):
+        """
+        :param terminate: kill the workers instead of letting them finish and close their environments
+        """
+        if self.closed:
+            return
+        self.closed = True
+        for pipe, process in zip(self.pipes, self.processes):
+            if terminate:
+                process.terminate()
+            else:
+                pipe.send(None)
+        for process in self.processes:
+            process.join()
+        for pipe in self.pipes:
+            pipe.close()
+        self._ready_queue.close()
+        self.batch.close(unlink=True)
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close(terminate=sys.is_finalizing())
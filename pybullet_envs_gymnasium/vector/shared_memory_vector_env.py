@@ -0,0 +1,488 @@
+import multiprocessing
+import os
+import sys
+import traceback
+from multiprocessing import shared_memory
+
+import gymnasium
+import numpy as np
+from gymnasium.envs.registration import load_env_creator
+from gymnasium.vector.utils import batch_space
+
+from pybullet_envs_gymnasium.vector.bullet_vector_env import AutoresetMode, is_same_step
+from pybullet_envs_gymnasium.vector.cpu_affinity import pin_process, placement_report, worker_cpus
+
+# Per-env commands, written in the shared ``commands`` array.
+# LAST_STEP: step, then reset unless the environment did on termination, the episode reached max_episode_steps
+NOOP, STEP, RESET, LAST_STEP = 0, 1, 2, 3
+# Per-worker requests, written in the shared ``requests`` array
+RUN, CALL, CLOSE = 0, 1, 2
+
+
+class SharedMemoryBatch:
+    """
+    Batch arrays of a vector env in one ``multiprocessing.shared_memory`` block,
+    readable and writable by the main process and the workers without any copy or pickling.
+
+    :param num_envs: number of environments
+    :param num_workers: number of worker processes
+    :param observation_space: observation space of one environment
+    :param action_space: action space of one environment (a Box)
+    """
+
+    def __init__(self, num_envs, num_workers, observation_space, action_space):
+        self.layout = [
+            ("observations", (num_envs, *observation_space.shape), observation_space.dtype),
+            ("final_observations", (num_envs, *observation_space.shape), observation_space.dtype),
+            ("actions", (num_envs, *action_space.shape), action_space.dtype),
+            ("rewards", (num_envs,), np.float64),
+            ("terminations", (num_envs,), np.bool_),
+            ("truncations", (num_envs,), np.bool_),
+            ("seeds", (num_envs,), np.int64),
+            ("seeded", (num_envs,), np.bool_),
+            ("commands", (num_envs,), np.int8),
+            ("reset_pool_hits", (num_envs,), np.int64),
+            ("reset_pool_misses", (num_envs,), np.int64),
+            ("requests", (num_workers,), np.int8),
+            ("errors", (num_workers,), np.bool_),
+        ]
+        size = sum(self._aligned_size(shape, dtype) for _, shape, dtype in self.layout)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self._map_arrays()
+
+    @staticmethod
+    def _aligned_size(shape, dtype):
+        return -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // 8) * 8
+
+    def _map_arrays(self):
+        offset = 0
+        for name, shape, dtype in self.layout:
+            setattr(self, name, np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset))
+            offset += self._aligned_size(shape, dtype)
+
+    def __getstate__(self):
+        # Workers started with "spawn" or "forkserver" attach to the block by name
+        return {"layout": self.layout, "shm": self.shm}
+
+    def __setstate__(self, state):
+        self.layout = state["layout"]
+        self.shm = state["shm"]
+        self._map_arrays()
+
+    def close(self, unlink=False):
+        """
+        :param unlink: also free the block, only the process that created it does it
+        """
+        for name, _, _ in self.layout:
+            delattr(self, name)
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def _make_envs(entry_point, env_kwargs, env_ids, batch, cpus, autoreset=False):
+    # Pinned first: the environments allocate their memory on the NUMA node of the worker
+    pin_process(cpus)
+    env_creator = load_env_creator(entry_point) if isinstance(entry_point, str) else entry_point
+    envs = [env_creator(**env_kwargs) for _ in env_ids]
+    # calc_state() writes the observations straight into the shared batch array
+    for env_id, env in zip(env_ids, envs):
+        env.robot.obs_buffer = batch.observations[env_id]
+        env.autoreset = autoreset
+    return envs
+
+
+def _run_command(env_id, env, batch):
+    """
+    Run the command of ``batch.commands[env_id]`` and write its results in the batch arrays.
+    """
+    command = batch.commands[env_id]
+    if command == STEP or command == LAST_STEP:
+        obs, reward, terminated, truncated, info = env.step(batch.actions[env_id])
+        batch.rewards[env_id] = reward
+        batch.terminations[env_id] = terminated
+        batch.truncations[env_id] = truncated
+        # Same step autoreset
+        if "final_obs" in info:
+            batch.final_observations[env_id] = info["final_obs"]
+        elif command == LAST_STEP:
+            batch.final_observations[env_id] = obs
+            obs, _ = env.reset()
+    elif command == RESET:
+        seed = int(batch.seeds[env_id]) if batch.seeded[env_id] else None
+        obs, _ = env.reset(seed=seed)
+    else:
+        return
+    # obs is usually a view of obs_buffer, the row of env_id in the shared batch array
+    # (not obs.base: numpy collapses it to the whole batch array)
+    if not np.shares_memory(obs, env.robot.obs_buffer):
+        batch.observations[env_id] = obs
+    batch.reset_pool_hits[env_id] = env.reset_pool_hits
+    batch.reset_pool_misses[env_id] = env.reset_pool_misses
+
+
+def _prefetch_resets(envs, busy):
+    """
+    Sample initial states into the reset pools of ``envs`` while the worker has nothing else to do,
+    one state at a time, the emptiest pool first, so that the next resets only restore a state.
+
+    :param envs: environments of the worker
+    :param busy: function that tells whether a request is waiting
+    """
+    while not busy():
+        env = max(envs, key=lambda env: env.missing_reset_states(), default=None)
+        if env is None or env.missing_reset_states() == 0:
+            return
+        env.fill_reset_pool(n_states=1)
+
+
+def _worker(
+    worker_index, entry_point, env_kwargs, env_ids, cpus, autoreset, prefetch_resets, batch, run_event, done_event, pipe
+):
+    envs = []
+    try:
+        envs = _make_envs(entry_point, env_kwargs, env_ids, batch, cpus, autoreset)
+    except Exception:
+        batch.errors[worker_index] = True
+        pipe.send(traceback.format_exc())
+    done_event.set()
+    prefetch_error = None
+    while True:
+        if prefetch_resets and prefetch_error is None:
+            try:
+                _prefetch_resets(envs, run_event.is_set)
+            except Exception:
+                # reported with the result of the next request
+                prefetch_error = traceback.format_exc()
+        run_event.wait()
+        run_event.clear()
+        request = batch.requests[worker_index]
+        if request == CLOSE:
+            break
+        try:
+            if request == CALL:
+                # read before any error, not to leave it in the pipe
+                name, args, kwargs = pipe.recv()
+            if prefetch_error is not None:
+                error, prefetch_error = prefetch_error, None
+                raise RuntimeError(f"Error while prefetching resets:\n{error}")
+            if request == RUN:
+                for env_id, env in zip(env_ids, envs):
+                    _run_command(env_id, env, batch)
+            elif request == CALL:
+                results = []
+                for env in envs:
+                    function = getattr(env, name)
+                    results.append(function(*args, **kwargs) if callable(function) else function)
+                pipe.send(results)
+        except Exception:
+            batch.errors[worker_index] = True
+            pipe.send(traceback.format_exc())
+        done_event.set()
+    for env in envs:
+        env.close()
+    batch.close()
+    pipe.close()
+
+
+def auto_envs_per_worker(num_envs):
+    """
+    :param num_envs: number of environments
+    :return: the number of environments per worker that gives one worker per available CPU
+    """
+    n_cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    return -(-num_envs // n_cpus)
+
+
+class SharedMemoryVectorEnv(gymnasium.vector.VectorEnv):
+    """
+    Vectorized environment that steps Bullet environments in worker processes.
+    Workers write observations, rewards, terminations and truncations straight into batch arrays
+    in shared memory, and read the actions from there: nothing is pickled on step() or reset(),
+    the main process and the workers only signal each other with one pair of events per worker.
+    Each worker hosts ``envs_per_worker`` environments, a contiguous slice of the batch, and steps them
+    one after the other: the main process exchanges one batch with each worker, not one message per environment.
+    Environments are reset on the step after they terminate or get truncated (next step autoreset),
+    like ``BulletVectorEnv`` does. With ``autoreset_mode=AutoresetMode.SAME_STEP``, workers reset them
+    within the step that ends their episode, the last observations are in ``infos["final_obs"]``.
+    The info dicts of the environments are not transported.
+
+    With ``prefetch_resets``, workers sample the initial states of the next episodes into the reset pools
+    of their environments (see ``MJCFBaseBulletEnv.fill_reset_pool()``) while they wait for the next request:
+    resets then only restore a saved state. A request that arrives during a prefetch waits for it,
+    one initial state at most. ``reset_pool_counters()`` tells how many resets found a state ready.
+
+    :param entry_point: environment class, or its "module:Class" path
+    :param num_envs: number of environments
+    :param envs_per_worker: number of environments per worker process, or "auto" to spread
+        the environments over as many workers as there are CPUs available, see ``auto_envs_per_worker()``
+    :param max_episode_steps: truncate episodes after that many steps, ``None`` for no limit
+    :param copy: return copies of the batch arrays instead of the arrays themselves,
+        which are overwritten by the next step() or reset()
+    :param context: multiprocessing start method, see ``multiprocessing.get_context()``
+    :param placement: CPU placement policy of the workers: ``None``, "compact", "spread" or one CPU list per worker,
+        see ``pybullet_envs_gymnasium.vector.cpu_affinity``
+    :param autoreset_mode: ``AutoresetMode.NEXT_STEP`` (default) or ``AutoresetMode.SAME_STEP``
+    :param prefetch_resets: fill the reset pools of the environments in the idle time of the workers,
+        with ``reset_pool_size=1`` unless the environment kwargs set it
+    :param kwargs: keyword arguments for the environment constructor
+    """
+
+    def __init__(
+        self,
+        entry_point,
+        num_envs=1,
+        envs_per_worker=1,
+        max_episode_steps=None,
+        copy=True,
+        context=None,
+        placement=None,
+        autoreset_mode=None,
+        prefetch_resets=False,
+        **kwargs,
+    ):
+        super().__init__()
+        env_creator = load_env_creator(entry_point) if isinstance(entry_point, str) else entry_point
+        if prefetch_resets:
+            kwargs.setdefault("reset_pool_size", 1)
+        self.same_step_autoreset = is_same_step(autoreset_mode)
+        # The environments do not connect to the physics server before their first reset
+        dummy_env = env_creator(**kwargs)
+        self.metadata = dict(dummy_env.metadata)
+        if AutoresetMode is not None:
+            self.metadata["autoreset_mode"] = AutoresetMode.SAME_STEP if self.same_step_autoreset else AutoresetMode.NEXT_STEP
+        self.render_mode = dummy_env.render_mode
+        self.single_observation_space = dummy_env.observation_space
+        self.single_action_space = dummy_env.action_space
+        dummy_env.close()
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.entry_point = entry_point
+        self.num_envs = num_envs
+        if envs_per_worker == "auto":
+            envs_per_worker = auto_envs_per_worker(num_envs)
+        if not isinstance(envs_per_worker, int) or envs_per_worker < 1:
+            raise ValueError(f"envs_per_worker must be a positive int or 'auto', got {envs_per_worker!r}")
+        self.envs_per_worker = envs_per_worker
+        self.num_workers = -(-num_envs // envs_per_worker)
+        self.worker_cpus = worker_cpus(self.num_workers, placement)
+        self.max_episode_steps = max_episode_steps
+        self.copy = copy
+
+        self._autoreset_envs = np.zeros(num_envs, dtype=np.bool_)
+        self._episode_steps = np.zeros(num_envs, dtype=np.int64)
+        self.batch = SharedMemoryBatch(num_envs, self.num_workers, self.single_observation_space, self.single_action_space)
+
+        # the observations are written in the batch array, no need for a copy per env
+        kwargs["obs_view"] = True
+        ctx = multiprocessing.get_context(context)
+        self.env_ids = np.array_split(np.arange(num_envs), self.num_workers)
+        self.run_events, self.done_events, self.pipes, self.processes = [], [], [], []
+        for worker_index, env_ids in enumerate(self.env_ids):
+            run_event, done_event = ctx.Event(), ctx.Event()
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                name=f"Worker<{type(self).__name__}>-{worker_index}",
+                args=(
+                    worker_index,
+                    entry_point,
+                    kwargs,
+                    env_ids.tolist(),
+                    self.worker_cpus[worker_index],
+                    self.same_step_autoreset,
+                    prefetch_resets,
+                    self.batch,
+                    run_event,
+                    done_event,
+                    child_pipe,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child_pipe.close()
+            self.run_events.append(run_event)
+            self.done_events.append(done_event)
+            self.pipes.append(parent_pipe)
+            self.processes.append(process)
+        try:
+            self._wait()
+        except RuntimeError:
+            # stop the workers that did create their environments, and free the shared memory
+            self.close()
+            raise
+
+    def reset(self, *, seed=None, options=None):
+        """
+        Reset all the environments, or the ones selected by ``options["reset_mask"]``.
+
+        :param seed: ``None``, an int (env ``i`` is seeded with ``seed + i``) or a list of seeds
+        :param options: only ``reset_mask`` is supported, the other options are not transported
+        :return: batch of observations, and infos
+        """
+        if seed is None:
+            seed = [None] * self.num_envs
+        elif isinstance(seed, int):
+            seed = [seed + i for i in range(self.num_envs)]
+        if len(seed) != self.num_envs:
+            raise ValueError(f"If seeds are passed as a list the length must match num_envs={self.num_envs}, got {len(seed)}")
+
+        reset_mask = np.ones(self.num_envs, dtype=np.bool_)
+        if options is not None and "reset_mask" in options:
+            reset_mask = options["reset_mask"]
+            if not isinstance(reset_mask, np.ndarray) or reset_mask.shape != (self.num_envs,) or reset_mask.dtype != np.bool_:
+                raise ValueError(f"options['reset_mask'] must be a boolean array of shape ({self.num_envs},)")
+
+        batch = self.batch
+        batch.seeded[:] = [s is not None for s in seed]
+        batch.seeds[:] = [0 if s is None else s for s in seed]
+        batch.commands[:] = np.where(reset_mask, RESET, NOOP)
+        self._run(RUN)
+        batch.terminations[reset_mask] = False
+        batch.truncations[reset_mask] = False
+        self._autoreset_envs[reset_mask] = False
+        self._episode_steps[reset_mask] = 0
+        return self._output(batch.observations), {}
+
+    def step(self, actions):
+        """
+        Step all the environments, the ones that ended on the previous step are reset instead.
+
+        :param actions: batch of actions
+        :return: batch of observations, rewards, terminations, truncations, and infos
+        """
+        if self.same_step_autoreset:
+            return self._step_same_step(actions)
+        batch = self.batch
+        batch.actions[:] = actions
+        batch.seeded[:] = False
+        batch.commands[:] = np.where(self._autoreset_envs, RESET, STEP)
+        self._run(RUN)
+
+        autoreset = self._autoreset_envs
+        batch.rewards[autoreset] = 0.0
+        batch.terminations[autoreset] = False
+        batch.truncations[autoreset] = False
+        self._episode_steps[autoreset] = 0
+        self._episode_steps[~autoreset] += 1
+        if self.max_episode_steps is not None:
+            batch.truncations |= self._episode_steps >= self.max_episode_steps
+        np.logical_or(batch.terminations, batch.truncations, out=self._autoreset_envs)
+        return (
+            self._output(batch.observations),
+            self._output(batch.rewards),
+            self._output(batch.terminations),
+            self._output(batch.truncations),
+            {},
+        )
+
+    def _step_same_step(self, actions):
+        batch = self.batch
+        batch.actions[:] = actions
+        batch.seeded[:] = False
+        self._episode_steps += 1
+        if self.max_episode_steps is None:
+            batch.commands[:] = STEP
+        else:
+            batch.commands[:] = np.where(self._episode_steps >= self.max_episode_steps, LAST_STEP, STEP)
+        self._run(RUN)
+
+        if self.max_episode_steps is not None:
+            batch.truncations |= self._episode_steps >= self.max_episode_steps
+        ended = batch.terminations | batch.truncations
+        infos = {}
+        if ended.any():
+            self._episode_steps[ended] = 0
+            final_obs = np.full(self.num_envs, None, dtype=object)
+            for i in np.flatnonzero(ended):
+                final_obs[i] = batch.final_observations[i].copy()
+            infos = {"final_obs": final_obs, "_final_obs": ended}
+        return (
+            self._output(batch.observations),
+            self._output(batch.rewards),
+            self._output(batch.terminations),
+            self._output(batch.truncations),
+            infos,
+        )
+
+    def _run(self, request):
+        self.batch.requests[:] = request
+        for event in self.run_events:
+            event.set()
+        self._wait(request)
+
+    def _wait(self, request=RUN):
+        for event in self.done_events:
+            event.wait()
+            event.clear()
+        if self.batch.errors.any():
+            errors = []
+            for worker_index, pipe in enumerate(self.pipes):
+                if self.batch.errors[worker_index]:
+                    errors.append(pipe.recv())
+                elif request == CALL:
+                    pipe.recv()  # discard the results of the other workers
+            self.batch.errors[:] = False
+            raise RuntimeError("Error in worker process:\n" + "\n".join(errors))
+
+    def _output(self, batch):
+        return batch.copy() if self.copy else batch
+
+    def placement_report(self):
+        """
+        :return: one line per worker with its CPUs, NUMA nodes and physical cores
+        """
+        return placement_report(self.worker_cpus)
+
+    def reset_pool_counters(self):
+        """
+        :return: per environment, the number of resets that restored a state of the reset pool (hits),
+            and of resets that found the pool empty and sampled states first (misses)
+        """
+        return self.batch.reset_pool_hits.copy(), self.batch.reset_pool_misses.copy()
+
+    def render(self):
+        """
+        :return: the frames rendered by each environment
+        """
+        return self.call("render")
+
+    def call(self, name, *args, **kwargs):
+        """
+        Call a method of each environment, or get an attribute. Arguments and results are pickled.
+
+        :param name: name of the method or attribute
+        :return: tuple of results, one per environment
+        """
+        for pipe in self.pipes:
+            pipe.send((name, args, kwargs))
+        self._run(CALL)
+        return tuple(result for pipe in self.pipes for result in pipe.recv())
+
+    def get_attr(self, name):
+        """
+        :param name: name of the attribute
+        :return: tuple of values, one per environment
+        """
+        return self.call(name)
+
+    def close_extras(self, terminate=False, **kwargs):
+        """
+        :param terminate: kill the workers instead of letting them close their environments
+        """
+        if terminate:
+            for process in self.processes:
+                process.terminate()
+        else:
+            self.batch.requests[:] = CLOSE
+            for event in self.run_events:
+                event.set()
+        for process in self.processes:
+            process.join()
+        for pipe in self.pipes:
+            pipe.close()
+        self.batch.close(unlink=True)
+
+    def __del__(self):
+        if not getattr(self, "closed", True) and hasattr(self, "processes"):
+            self.close(terminate=sys.is_finalizing())
@@ -0,0 +1,78 @@
+import numpy as np
+import pybullet
+from pybullet_utils import bullet_client
+
+from pybullet_envs_gymnasium.gym_locomotion_envs import WalkerBaseBulletEnv
+from pybullet_envs_gymnasium.scene_stadium import MultiplayerStadiumScene
+from pybullet_envs_gymnasium.vector.bullet_vector_env import BulletVectorEnv
+
+
+class StadiumVectorEnv(BulletVectorEnv):
+    """
+    Vectorized locomotion environment that runs ``num_envs`` robots in a single Bullet world:
+    the robots share one physics client and the stadium plane, each one runs in its own lane,
+    and they go through each other. Every step applies the actions of all the robots, advances
+    the world with one ``stepSimulation()``, then computes the observations and rewards of each robot.
+
+    A single robot follows the same trajectories as in its own world. With several robots, the walk target
+    of each one is shifted with its lane, so observations and rewards do not depend on the lane:
+    Hopper, Walker2D and HalfCheetah robots follow the trajectories of separate environments in every lane.
+    The contacts of Ant and Humanoid robots away from the origin round differently, their trajectories
+    drift apart from the ones of separate environments after a few steps.
+    Resetting a robot puts its bodies back to their loaded state instead of restoring a saved state.
+    Robots that start with a random yaw are not supported.
+
+    :param entry_point: locomotion environment class, or its "module:Class" path
+    :param num_envs: number of robots
+    :param max_episode_steps: truncate episodes after that many steps, ``None`` for no limit
+    :param copy: return copies of the batch arrays instead of the arrays themselves,
+        which are overwritten by the next step() or reset()
+    :param autoreset_mode: ``AutoresetMode.NEXT_STEP`` (default) or ``AutoresetMode.SAME_STEP``
+    :param lane_width: distance between two lanes (m)
+    :param kwargs: keyword arguments for the environment constructor
+    """
+
+    def __init__(
+        self, entry_point, num_envs=1, max_episode_steps=None, copy=True, autoreset_mode=None, lane_width=1.0, **kwargs
+    ):
+        super().__init__(
+            entry_point,
+            num_envs=num_envs,
+            max_episode_steps=max_episode_steps,
+            copy=copy,
+            autoreset_mode=autoreset_mode,
+            **kwargs,
+        )
+        for env in self.envs:
+            if not isinstance(env, WalkerBaseBulletEnv):
+                raise ValueError(f"{type(env).__name__} is not a locomotion environment")
+            if getattr(env.robot, "random_yaw", False):
+                raise ValueError(f"{type(env.robot).__name__} starts with a random yaw, it would leave its lane")
+
+        if self.render_mode == "human":
+            self._p = bullet_client.BulletClient(connection_mode=pybullet.GUI)
+        else:
+            self._p = bullet_client.BulletClient()
+        self._p.resetSimulation()
+        self._p.setPhysicsEngineParameter(deterministicOverlappingPairs=1)
+        self._p.configureDebugVisualizer(pybullet.COV_ENABLE_GUI, 0)
+        # Same world as WalkerBaseBulletEnv.create_single_player_scene()
+        self.scene = MultiplayerStadiumScene(self._p, gravity=9.8, timestep=0.0165 / 4, frame_skip=4)
+        self.scene.players_count = num_envs
+        self.scene.lane_width = lane_width
+        self.scene.episode_restart(self._p)
+        for i, env in enumerate(self.envs):
+            env.join_scene(self._p, self.scene, i)
+
+    def _simulate(self, actions):
+        # One simulation step for all the robots, step() of the environments of
+        # a multiplayer scene then only computes the observation and the reward
+        stepping = np.flatnonzero(~self._autoreset_envs)
+        for i in stepping:
+            self.envs[i].robot.apply_action(actions[i])
+        if stepping.size > 0:
+            self.scene.global_step()
+
+    def close_extras(self, **kwargs):
+        super().close_extras(**kwargs)
+        self._p.disconnect()
@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from pybullet_envs_gymnasium.vector.bullet_vector_env import BulletVectorEnv
+
+
+class ThreadedVectorEnv(BulletVectorEnv):
+    """
+    Vectorized environment that runs the physics of the environments on a thread pool:
+    each thread applies the actions and advances the simulation of a slice of the environments
+    (``env.simulate()``), then the calling thread computes the observations and rewards (``env.finish_step()``)
+    and resets the environments that ended on the previous step.
+
+    Each environment owns its own DIRECT physics client, but pybullet holds the GIL during all its calls,
+    ``stepSimulation()`` included: the threads take turns and this backend does not run faster than
+    ``BulletVectorEnv``, see ``benchmarks/bench_threaded_vector_env.py``.
+    It would with a pybullet build that releases the GIL.
+
+    :param entry_point: environment class, or its "module:Class" path
+    :param num_envs: number of environments
+    :param num_threads: number of threads of the pool, the number of CPUs available by default
+    :param max_episode_steps: truncate episodes after that many steps, ``None`` for no limit
+    :param copy: return copies of the batch arrays instead of the arrays themselves,
+        which are overwritten by the next step() or reset()
+    :param autoreset_mode: ``AutoresetMode.NEXT_STEP`` (default) or ``AutoresetMode.SAME_STEP``
+    :param kwargs: keyword arguments for the environment constructor
+    """
+
+    def __init__(
+        self, entry_point, num_envs=1, num_threads=None, max_episode_steps=None, copy=True, autoreset_mode=None, **kwargs
+    ):
+        super().__init__(
+            entry_point,
+            num_envs=num_envs,
+            max_episode_steps=max_episode_steps,
+            copy=copy,
+            autoreset_mode=autoreset_mode,
+            **kwargs,
+        )
+        if num_threads is None:
+            num_threads = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+        self.num_threads = min(num_threads, num_envs)
+        self._executor = ThreadPoolExecutor(max_workers=self.num_threads, thread_name_prefix=type(self).__name__)
+
+    def _simulate(self, actions):
+        stepping = np.flatnonzero(~self._autoreset_envs)
+        futures = [
+            self._executor.submit(self._simulate_envs, env_ids, actions)
+            for env_ids in np.array_split(stepping, self.num_threads)
+            if env_ids.size > 0
+        ]
+        for future in futures:
+            future.result()
+
+    def _simulate_envs(self, env_ids, actions):
+        for i in env_ids:
+            self.envs[i].simulate(actions[i])
+
+    def _step_env(self, env, action):
+        return env.finish_step(action)
+
+    def close_extras(self, **kwargs):
+        self._executor.shutdown()
+        super().close_extras(**kwargs)
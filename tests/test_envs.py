@@ -1,4 +1,5 @@
 import gymnasium as gym
+import numpy as np
 import pytest
 from gymnasium.utils.env_checker import check_env as gym_check_env
 from stable_baselines3.common.env_checker import check_env
@@ -14,3 +15,258 @@ def test_envs(env_id):
     # requires a X11 display
     gym_check_env(env, skip_render_check=True)
     check_env(env)
+
+
+@pytest.mark.parametrize("env_id", ["HopperBulletEnv-v0", "AntBulletEnv-v0", "HumanoidBulletEnv-v0"])
+def test_batched_joint_state(env_id):
+    env = gym.make(env_id)
+    env.reset(seed=0)
+    for _ in range(10):
+        env.step(env.action_space.sample())
+    robot = env.unwrapped.robot
+    expected = np.array([j.current_relative_position() for j in robot.ordered_joints], dtype=np.float32)
+    assert np.array_equal(robot.calc_joint_state(), expected)
+    env.close()
+
+
+@pytest.mark.parametrize("env_id", ["HopperBulletEnv-v0", "HumanoidBulletEnv-v0", "PusherBulletEnv-v0"])
+def test_batched_part_poses(env_id):
+    env = gym.make(env_id)
+    env.reset(seed=0)
+    for _ in range(10):
+        env.step(env.action_space.sample())
+    robot = env.unwrapped.robot
+    expected = np.array([p.get_pose() for p in robot.parts.values()])
+    poses = robot.calc_part_poses()
+    assert np.array_equal(poses[: len(robot.parts)], expected)
+    if robot.robot_body is not None:
+        assert np.array_equal(poses[robot.robot_body_slot], robot.robot_body.get_pose())
+    env.close()
+
+
+def test_joint_group_views():
+    env = gym.make("Walker2DBulletEnv-v0")
+    env.reset(seed=0)
+    robot = env.unwrapped.robot
+    group = robot.joint_group
+    assert len(group) == len(robot.ordered_joints)
+    foot = robot.jdict["foot_joint"]
+    slot = robot.ordered_joints.index(foot)
+    assert foot.power_coef == group.power_coef[slot] == 30.0
+    foot.power_coef = 12.0
+    assert group.power_coef[slot] == 12.0
+    assert foot.get_mid_point() == group.mid_points[slot]
+
+    group.reset_states(np.linspace(-0.1, 0.1, len(group)), 0.5)
+    positions, velocities = group.read_state()
+    assert np.allclose(positions, np.linspace(-0.1, 0.1, len(group)))
+    assert np.allclose(velocities, 0.5)
+    assert np.allclose([j.get_position() for j in robot.ordered_joints], positions)
+    env.close()
+
+
+def test_pose_cache():
+    env = gym.make("ThrowerBulletEnv-v0")
+    env.reset(seed=0)
+    env.step(env.action_space.sample())
+    robot = env.unwrapped.robot
+    pose = robot.fingertip.get_pose()
+    # Cached for the current simulation frame
+    assert robot.fingertip.get_pose() is pose
+    assert robot.fingertip.speed() is robot.fingertip.speed()
+    assert not pose.flags.writeable
+    env.step(env.action_space.sample())
+    assert robot.fingertip.get_pose() is not pose
+    body_id = robot.fingertip.bodies[robot.fingertip.bodyIndex]
+    assert np.array_equal(
+        robot.fingertip.get_pose(), robot.fingertip.state_fields_of_pose_of(body_id, robot.fingertip.bodyPartIndex)
+    )
+    # Resets invalidate the cache
+    robot.object.reset_pose([0.1, 0.2, 0.3], [0, 0, 0, 1])
+    assert np.allclose(robot.object.current_position(), [0.1, 0.2, 0.3])
+    env.close()
+
+
+@pytest.mark.parametrize("env_id", ["HalfCheetahBulletEnv-v0", "AntBulletEnv-v0"])
+def test_feet_contact(env_id):
+    env = gym.make(env_id)
+    env.reset(seed=0)
+    unwrapped = env.unwrapped
+    robot = unwrapped.robot
+    n_contacts = 0
+    for _ in range(50):
+        env.step(env.action_space.sample())
+        # one query per foot
+        expected = [float(bool(unwrapped.ground_ids & {(x[2], x[4]) for x in foot.contact_list()})) for foot in robot.feet]
+        assert np.array_equal(robot.calc_feet_contact(unwrapped.ground_ids), expected)
+        n_contacts += sum(expected)
+    assert n_contacts > 0
+    env.close()
+
+
+@pytest.mark.parametrize("env_id", ["InvertedDoublePendulumBulletEnv-v0", "ReacherBulletEnv-v0", "AntBulletEnv-v0"])
+def test_obs_view(env_id):
+    env = gym.make(env_id).unwrapped
+    view_env = gym.make(env_id, obs_view=True).unwrapped
+    obs, _ = env.reset(seed=0)
+    view, _ = view_env.reset(seed=0)
+    assert view.dtype == np.float32 and not view.flags.writeable
+    for _ in range(5):
+        action = env.action_space.sample()
+        previous_obs = obs
+        obs = env.step(action)[0]
+        new_view = view_env.step(action)[0]
+        # the view is refreshed in place, copies are not
+        assert new_view is view
+        assert np.array_equal(view, obs)
+        assert not np.shares_memory(obs, previous_obs)
+    # also when the robot buffer is itself a view, e.g. a row of a batch array
+    batch = np.zeros((2, *view_env.observation_space.shape), dtype=np.float32)
+    view_env.robot.obs_buffer = batch[1]
+    view = view_env.step(action)[0]
+    assert view_env.step(action)[0] is view and np.shares_memory(view, batch)
+    env.close()
+    view_env.close()
+
+
+@pytest.mark.parametrize("env_id", ["InvertedDoublePendulumBulletEnv-v0", "ThrowerBulletEnv-v0", "HopperBulletEnv-v0"])
+def test_reward_breakdown(env_id):
+    env = gym.make(env_id, reward_info=True)
+    env.reset(seed=0)
+    unwrapped = env.unwrapped
+    for _ in range(5):
+        _, reward, _, _, info = env.step(env.action_space.sample())
+        assert info["rewards"] is unwrapped.reward_buffer
+        assert info["rewards"].dtype.names == unwrapped.reward_fields
+        assert reward == pytest.approx(sum(unwrapped.rewards))
+        # positional access, as with the former list of rewards
+        assert unwrapped.rewards[0] == info["rewards"][unwrapped.reward_fields[0]]
+    env.close()
+    assert "rewards" not in gym.make(env_id).unwrapped._get_info()
+
+
+def test_scene_tables_cached():
+    env = gym.make("AntBulletEnv-v0").unwrapped
+    env.reset(seed=0)
+    parts, joint_group, ground_ids = env.parts, env.robot.joint_group, env.ground_ids
+    env.reset()
+    assert env.robot.parts is parts and env.robot.joint_group is joint_group and env.ground_ids is ground_ids
+    assert "floor" in parts
+    # resolving the tables again gives the same episode
+    obs = env.reset(seed=1)[0]
+    env.ground_ids = None
+    assert np.array_equal(env.reset(seed=1)[0], obs)
+    assert env.ground_ids == ground_ids
+    env.close()
+
+
+@pytest.mark.parametrize("env_id", ["InvertedDoublePendulumBulletEnv-v0", "HopperBulletEnv-v0", "HumanoidBulletEnv-v0"])
+def test_reset_pool(env_id):
+    def episode_starts(**kwargs):
+        env = gym.make(env_id, **kwargs).unwrapped
+        obs = [env.reset(seed=0)[0]]
+        for i in range(6):
+            env.step(np.full(env.action_space.shape, 0.5, dtype=np.float32))
+            if i == 2:
+                env.fill_reset_pool()
+            # reseeding discards the pool
+            obs.append(env.reset(seed=1 if i == 3 else None)[0])
+        env.close()
+        return np.array(obs)
+
+    assert np.array_equal(episode_starts(), episode_starts(reset_pool_size=3))
+    with pytest.raises(ValueError):
+        gym.make("ReacherBulletEnv-v0", reset_pool_size=3)
+
+
+@pytest.mark.parametrize("env_id", ["HopperBulletEnv-v0", "HumanoidBulletEnv-v0"])
+def test_first_episode(env_id):
+    # The first reset loads the robot and the ground: the episode must not differ from the next ones
+    def episode(env):
+        obs, _ = env.reset(seed=0)
+        transitions = [(obs, env.potential)]
+        for action in np.random.default_rng(0).uniform(-1, 1, size=(20, *env.action_space.shape)):
+            obs, reward, _, _, _ = env.step(action)
+            transitions.append((obs, reward))
+        return transitions
+
+    new_env, used_env = gym.make(env_id).unwrapped, gym.make(env_id).unwrapped
+    used_env.reset(seed=1)
+    for (obs, value), (expected_obs, expected_value) in zip(episode(new_env), episode(used_env)):
+        assert np.array_equal(obs, expected_obs)
+        assert value == expected_value
+
+
+@pytest.mark.parametrize("env_id", ["InvertedDoublePendulumBulletEnv-v0", "ReacherBulletEnv-v0", "HopperBulletEnv-v0"])
+def test_step_many(env_id):
+    env = gym.make(env_id).unwrapped
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(50, *env.action_space.shape)).astype(np.float32)
+    env.reset(seed=0)
+    expected = []
+    for action in actions:
+        obs, reward, terminated, _, _ = env.step(action)
+        expected.append((obs, reward, terminated))
+        if terminated:
+            break
+
+    env.reset(seed=0)
+    observations, rewards, terminations, n_steps = env.step_many(actions)
+    assert n_steps == len(expected) and observations.shape == (50, *env.observation_space.shape)
+    assert np.array_equal(observations[:n_steps], [obs for obs, _, _ in expected])
+    assert np.array_equal(rewards[:n_steps], [reward for _, reward, _ in expected])
+    assert np.array_equal(terminations[:n_steps], [terminated for _, _, terminated in expected])
+    assert not observations[n_steps:].any()
+    # the robot buffer holds the last observation, as after step()
+    assert np.array_equal(env.robot.obs_buffer, expected[-1][0])
+
+    env.reset(seed=0)
+    out = (None, np.zeros(50), np.zeros(50, dtype=bool))
+    last_obs, rewards, _, n_steps = env.step_many(actions, all_observations=False, out=out)
+    assert rewards is out[1] and n_steps == len(expected)
+    assert np.array_equal(last_obs, expected[-1][0])
+    assert np.array_equal(rewards[:n_steps], [reward for _, reward, _ in expected])
+    env.close()
+
+
+@pytest.mark.parametrize(
+    "env_id", ["InvertedDoublePendulumBulletEnv-v0", "ReacherBulletEnv-v0", "HumanoidFlagrunHarderBulletEnv-v0"]
+)
+def test_clone_state(env_id):
+    env = gym.make(env_id, state_pool_size=3).unwrapped
+    env.reset(seed=0)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(40, *env.action_space.shape)).astype(np.float32)
+    for action in actions[:10]:
+        env.step(action)
+
+    def play():
+        results = []
+        for action in actions[10:]:
+            obs, reward, terminated, _, _ = env.step(action)
+            results.append((obs, reward))
+            if terminated:
+                break
+        return results, env.np_random.random()
+
+    obs = env.robot.obs_buffer.copy()
+    handle = env.clone_state()
+    expected = play()
+    for _ in range(2):
+        # the handle stays valid
+        assert np.array_equal(env.restore_state(handle), obs)
+        results = play()
+        assert len(results[0]) == len(expected[0]) and results[1] == expected[1]
+        for (obs_a, reward_a), (obs_b, reward_b) in zip(results[0], expected[0]):
+            assert np.array_equal(obs_a, obs_b) and reward_a == reward_b
+
+    # Least recently used states are evicted
+    handles = [handle, env.clone_state(), env.clone_state()]
+    env.restore_state(handle)
+    handles.append(env.clone_state())
+    env.restore_state(handle)
+    with pytest.raises(ValueError):
+        env.restore_state(handles[1])
+    env.release_state(handle)
+    with pytest.raises(ValueError):
+        env.restore_state(handle)
+    env.restore_state(handles[2])
+    env.close()
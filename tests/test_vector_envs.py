@@ -0,0 +1,547 @@
+import asyncio
+import multiprocessing
+import os
+
+import gymnasium as gym
+import numpy as np
+import pytest
+from gymnasium.envs.registration import load_env_creator
+
+import pybullet_envs_gymnasium  # noqa: F401
+from pybullet_envs_gymnasium.gym_locomotion_envs import HopperBulletEnv
+from pybullet_envs_gymnasium.vector import (
+    AsyncEnvPool,
+    BulletVectorEnv,
+    EnvServer,
+    RemoteVectorEnv,
+    SharedMemoryEnvPool,
+    SharedMemoryVectorEnv,
+    StadiumVectorEnv,
+    ThreadedVectorEnv,
+)
+from pybullet_envs_gymnasium.vector.cpu_affinity import CpuInfo, placement_report, worker_cpus
+from pybullet_envs_gymnasium.vector.env_server import send_message
+from pybullet_envs_gymnasium.vector.es_evaluator import PopulationEvaluator, SharedNoiseTable
+from pybullet_envs_gymnasium.vector.rollout import RolloutPool, n_policy_params, rollout
+from pybullet_envs_gymnasium.vector.shared_memory_vector_env import RESET, STEP, SharedMemoryBatch, _make_envs, _run_command
+
+
+@pytest.mark.parametrize("env_id", ["InvertedDoublePendulumBulletEnv-v0", "HopperBulletEnv-v0"])
+def test_bullet_vector_env(env_id):
+    envs = gym.make_vec(env_id, num_envs=3, max_episode_steps=20)
+    assert isinstance(envs, BulletVectorEnv)
+    reference = gym.make_vec(env_id, num_envs=3, max_episode_steps=20, vectorization_mode="sync")
+    assert envs.observation_space == reference.observation_space
+    assert np.array_equal(envs.reset(seed=0)[0], reference.reset(seed=0)[0])
+    rng = np.random.default_rng(0)
+    n_autoresets = 0
+    for _ in range(50):
+        actions = rng.uniform(-1, 1, size=envs.action_space.shape).astype(np.float32)
+        results, expected = envs.step(actions), reference.step(actions)
+        for result, expected_result in zip(results[:4], expected[:4]):
+            assert np.array_equal(result, expected_result)
+        n_autoresets += np.sum(results[2] | results[3])
+    assert n_autoresets > 0
+
+    reset_mask = np.array([False, True, False])
+    obs, _ = envs.reset(options={"reset_mask": reset_mask})
+    expected_obs, _ = reference.reset(options={"reset_mask": reset_mask})
+    assert np.array_equal(obs, expected_obs)
+    envs.close()
+    reference.close()
+
+
+def test_stadium_vector_env():
+    entry_point = gym.spec("Walker2DBulletEnv-v0").entry_point
+    # A single robot in the stadium follows the same trajectories as in its own world
+    envs = StadiumVectorEnv(entry_point, num_envs=1, max_episode_steps=20)
+    reference = BulletVectorEnv(entry_point, num_envs=1, max_episode_steps=20)
+    assert np.array_equal(envs.reset(seed=0)[0], reference.reset(seed=0)[0])
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        actions = rng.uniform(-1, 1, size=envs.action_space.shape).astype(np.float32)
+        for result, expected_result in zip(envs.step(actions)[:4], reference.step(actions)[:4]):
+            assert np.array_equal(result, expected_result)
+    envs.close()
+    reference.close()
+
+    # All robots in one world, in the same lane: they go through each other
+    envs = StadiumVectorEnv(gym.spec("HopperBulletEnv-v0").entry_point, num_envs=3, lane_width=0.0, max_episode_steps=20)
+    obs, _ = envs.reset(seed=0)
+    assert obs.shape == (3, 15)
+    assert len({env.physicsClientId for env in envs.envs}) == 1
+    bodies = [env.robot.objects[0] for env in envs.envs]
+    for _ in range(50):
+        obs, rewards, _, _, _ = envs.step(rng.uniform(-1, 1, size=envs.action_space.shape))
+        assert obs.shape == (3, 15) and rewards.shape == (3,)
+        for i, body_a in enumerate(bodies):
+            for body_b in bodies[i + 1 :]:
+                assert envs._p.getContactPoints(bodyA=body_a, bodyB=body_b) == ()
+    envs.close()
+
+    # Each robot in its own lane follows the trajectories of a separate environment
+    envs = StadiumVectorEnv(gym.spec("HopperBulletEnv-v0").entry_point, num_envs=3, max_episode_steps=20)
+    references = [BulletVectorEnv(gym.spec("HopperBulletEnv-v0").entry_point, max_episode_steps=20) for _ in range(3)]
+    obs, _ = envs.reset(seed=0)
+    assert [env.robot.body_real_xyz[1] for env in envs.envs] == [-1.0, 0.0, 1.0]
+    for i, reference in enumerate(references):
+        assert np.array_equal(obs[i], reference.reset(seed=i)[0][0])
+    for _ in range(30):
+        actions = rng.uniform(-1, 1, size=envs.action_space.shape).astype(np.float32)
+        results = envs.step(actions)[:4]
+        for i, reference in enumerate(references):
+            for result, expected_result in zip(results, reference.step(actions[i : i + 1])[:4]):
+                assert np.array_equal(result[i], expected_result[0])
+    envs.close()
+    for reference in references:
+        reference.close()
+    with pytest.raises(ValueError):
+        StadiumVectorEnv(gym.spec("InvertedPendulumBulletEnv-v0").entry_point, num_envs=2)
+
+
+@pytest.mark.parametrize("envs_per_worker", [1, 2, "auto"])
+def test_shared_memory_vector_env(envs_per_worker):
+    entry_point = gym.spec("HopperBulletEnv-v0").entry_point
+    envs = SharedMemoryVectorEnv(entry_point, num_envs=3, envs_per_worker=envs_per_worker, max_episode_steps=20)
+    reference = BulletVectorEnv(entry_point, num_envs=3, max_episode_steps=20)
+    assert envs.observation_space == reference.observation_space
+    assert np.array_equal(envs.reset(seed=0)[0], reference.reset(seed=0)[0])
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        actions = rng.uniform(-1, 1, size=envs.action_space.shape).astype(np.float32)
+        for result, expected_result in zip(envs.step(actions)[:4], reference.step(actions)[:4]):
+            assert np.array_equal(result, expected_result)
+
+    reset_mask = np.array([False, True, False])
+    obs, _ = envs.reset(options={"reset_mask": reset_mask})
+    expected_obs, _ = reference.reset(options={"reset_mask": reset_mask})
+    assert np.array_equal(obs, expected_obs)
+    assert envs.get_attr("reward_fields") == reference.get_attr("reward_fields")
+    with pytest.raises(RuntimeError, match="AttributeError"):
+        envs.call("not_a_method")
+    assert envs.call("seed", 0) == reference.call("seed", 0)
+    envs.close()
+    reference.close()
+
+
+class _RecordedRows:
+    def __init__(self, array):
+        self.array = array
+        self.written = []
+
+    def __setitem__(self, index, value):
+        self.written.append(index)
+        self.array[index] = value
+
+
+@pytest.mark.parametrize("obs_view", [True, False])
+def test_run_command_observations(obs_view):
+    entry_point = gym.spec("HopperBulletEnv-v0").entry_point
+    reference = load_env_creator(entry_point)()
+    batch = SharedMemoryBatch(1, 1, reference.observation_space, reference.action_space)
+    (env,) = _make_envs(entry_point, {"obs_view": obs_view}, [0], batch, None)
+    observations = batch.observations
+    batch.observations = _RecordedRows(observations)
+    batch.commands[0], batch.seeded[0], batch.seeds[0] = RESET, True, 0
+    _run_command(0, env, batch)
+    assert np.array_equal(observations[0], reference.reset(seed=0)[0])
+    batch.commands[0] = STEP
+    _run_command(0, env, batch)
+    assert np.array_equal(observations[0], reference.step(batch.actions[0])[0])
+    # The environments write their observations in the batch row, only copies are copied there
+    assert batch.observations.written == ([] if obs_view else [0, 0])
+    batch.observations = observations
+    env.close()
+    reference.close()
+    batch.close(unlink=True)
+
+
+class _WorkerFailingEnv(HopperBulletEnv):
+    def __init__(self, **kwargs):
+        if multiprocessing.parent_process() is not None:
+            raise RuntimeError("No environment in the workers")
+        super().__init__(**kwargs)
+
+
+def test_shared_memory_vector_env_worker_error():
+    shm_files = set(os.listdir("/dev/shm"))
+    with pytest.raises(RuntimeError, match="No environment in the workers") as error:
+        SharedMemoryVectorEnv(_WorkerFailingEnv, num_envs=2, context="fork")
+    # The workers are stopped and the shared memory freed, not only once the traceback is collected
+    assert error.traceback
+    assert not multiprocessing.active_children()
+    assert set(os.listdir("/dev/shm")) == shm_files
+
+
+@pytest.mark.parametrize("env_id", ["ReacherBulletEnv-v0", "HopperBulletEnv-v0"])
+def test_threaded_vector_env(env_id):
+    entry_point = gym.spec(env_id).entry_point
+    envs = ThreadedVectorEnv(entry_point, num_envs=3, num_threads=2, max_episode_steps=20)
+    reference = BulletVectorEnv(entry_point, num_envs=3, max_episode_steps=20)
+    assert np.array_equal(envs.reset(seed=0)[0], reference.reset(seed=0)[0])
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        actions = rng.uniform(-1, 1, size=envs.action_space.shape).astype(np.float32)
+        for result, expected_result in zip(envs.step(actions)[:4], reference.step(actions)[:4]):
+            assert np.array_equal(result, expected_result)
+    envs.close()
+    reference.close()
+
+
+def test_async_env_pool():
+    entry_point = gym.spec("HopperBulletEnv-v0").entry_point
+    reference = [load_env_creator(entry_point)() for _ in range(4)]
+    pool = AsyncEnvPool(entry_point, num_envs=4, max_workers=2)
+
+    async def run():
+        obs, _ = await pool.reset(seed=0)
+        assert np.array_equal(obs, [env.reset(seed=i)[0] for i, env in enumerate(reference)])
+        rng = np.random.default_rng(0)
+        for _ in range(10):
+            actions = rng.uniform(-1, 1, size=(4, *pool.single_action_space.shape)).astype(np.float32)
+            obs, rewards, _, _, _ = await pool.step(actions)
+            expected = [env.step(action) for env, action in zip(reference, actions)]
+            assert np.array_equal(obs, [result[0] for result in expected])
+            assert np.array_equal(rewards, [result[1] for result in expected])
+
+        env_ids = [3, 1]
+        actions = rng.uniform(-1, 1, size=(2, *pool.single_action_space.shape)).astype(np.float32)
+        results = {}
+        async for env_id, obs, reward, *_ in pool.step_as_completed(actions, env_ids):
+            results[env_id] = obs, reward
+        assert sorted(results) == sorted(env_ids)
+        for env_id, action in zip(env_ids, actions):
+            obs, reward, *_ = reference[env_id].step(action)
+            assert np.array_equal(results[env_id][0], obs) and results[env_id][1] == reward
+
+        # One step in flight per environment
+        with pytest.raises(RuntimeError, match="in flight"):
+            await pool.step(actions[[0, 0]], env_ids=[2, 2])
+        obs, _, _, _, _ = await pool.step(actions[:1], env_ids=[0])
+        assert obs.shape == (1, *pool.single_observation_space.shape)
+
+    asyncio.run(run())
+    pool.close()
+    for env in reference:
+        env.close()
+
+
+@pytest.mark.parametrize("envs_per_worker", [1, 2])
+def test_shared_memory_env_pool(envs_per_worker):
+    entry_point = gym.spec("HopperBulletEnv-v0").entry_point
+    pool = SharedMemoryEnvPool(entry_point, num_envs=4, batch_size=2, envs_per_worker=envs_per_worker, max_episode_steps=15)
+    pool.async_reset(seed=0)
+    rng = np.random.default_rng(0)
+    # Results received and actions sent, per env
+    results, actions = [[] for _ in range(4)], [[] for _ in range(4)]
+    for _ in range(40):
+        *batch_results, infos = pool.recv()
+        assert len(infos["env_id"]) == 2
+        batch_actions = rng.uniform(-1, 1, size=(2, *pool.single_action_space.shape)).astype(np.float32)
+        for j, env_id in enumerate(infos["env_id"]):
+            results[env_id].append([result[j] for result in batch_results])
+            actions[env_id].append(batch_actions[j])
+        pool.send(batch_actions, infos["env_id"])
+    with pytest.raises(RuntimeError, match="in flight"):
+        pool.send(batch_actions, infos["env_id"])
+    pool.close()
+
+    # After a worker error, all the environments received are out of flight
+    pool = SharedMemoryEnvPool(entry_point, num_envs=2, envs_per_worker=envs_per_worker)
+    pool.async_reset(seed=0)
+    pool.recv()
+    batch_actions = np.zeros((2, *pool.single_action_space.shape), dtype=np.float32)
+    batch_actions[0] = np.nan
+    pool.send(batch_actions)
+    with pytest.raises(RuntimeError, match="AssertionError"):
+        pool.recv()
+    pool.send(np.zeros_like(batch_actions))
+    assert sorted(pool.recv()[-1]["env_id"]) == [0, 1]
+    pool.close()
+
+    # Every env follows the trajectory of its own vector env
+    for env_id in range(4):
+        reference = BulletVectorEnv(entry_point, num_envs=1, max_episode_steps=15)
+        expected = [reference.reset(seed=env_id)[0], np.zeros(1), np.zeros(1, dtype=bool), np.zeros(1, dtype=bool)]
+        for result, action in zip(results[env_id], actions[env_id]):
+            for value, expected_value in zip(result, expected):
+                assert np.array_equal(value, expected_value[0])
+            expected = reference.step(action[None])[:4]
+        reference.close()
+
+
+def _serve(env_id, num_envs, address, addresses):
+    server = EnvServer(env_id, num_envs=num_envs, address=address, max_episode_steps=15)
+    addresses.put(server.address)
+    server.serve_forever()
+
+
+def test_remote_vector_env(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    addresses = ctx.Queue()
+    # One server over TCP with 2 envs, one over a Unix socket with 1 env
+    servers = [
+        ctx.Process(target=_serve, args=("HopperBulletEnv-v0", 2, ("127.0.0.1", 0), addresses), daemon=True),
+        ctx.Process(target=_serve, args=("HopperBulletEnv-v0", 1, str(tmp_path / "server.sock"), addresses), daemon=True),
+    ]
+    try:
+        for server in servers:
+            server.start()
+        server_addresses = sorted((addresses.get(timeout=30) for _ in servers), key=lambda address: isinstance(address, str))
+        envs = RemoteVectorEnv(server_addresses, timeout=30)
+        reference = BulletVectorEnv(gym.spec("HopperBulletEnv-v0").entry_point, num_envs=3, max_episode_steps=15)
+        assert envs.num_envs == 3
+        assert envs.single_observation_space == reference.single_observation_space
+        assert envs.single_action_space == reference.single_action_space
+        assert np.array_equal(envs.reset(seed=0)[0], reference.reset(seed=0)[0])
+        rng = np.random.default_rng(0)
+        for _ in range(40):
+            actions = rng.uniform(-1, 1, size=envs.action_space.shape).astype(np.float32)
+            for result, expected_result in zip(envs.step(actions)[:4], reference.step(actions)[:4]):
+                assert np.array_equal(result, expected_result)
+        reset_mask = np.array([False, True, True])
+        obs, _ = envs.reset(seed=[None, 3, 4], options={"reset_mask": reset_mask})
+        assert np.array_equal(obs, reference.reset(seed=[None, 3, 4], options={"reset_mask": reset_mask})[0])
+        # An error of the first server does not leave the response of the second one unread
+        actions[0] = np.nan
+        with pytest.raises(RuntimeError, match="AssertionError"):
+            envs.step(actions)
+        assert np.array_equal(envs.reset(seed=0)[0], reference.reset(seed=0)[0])
+
+        send_message(envs.sockets[0], 42)
+        with pytest.raises(RuntimeError, match="Unexpected message kind 42"):
+            envs._recv_response(envs.sockets[0])
+        envs.close()
+        reference.close()
+        # A server serves the next client once the previous one is closed
+        envs = RemoteVectorEnv(server_addresses[:1], timeout=30)
+        assert envs.reset(seed=0)[0].shape == (2, *envs.single_observation_space.shape)
+        envs.close()
+    finally:
+        for server in servers:
+            server.terminate()
+            server.join()
+
+
+def test_cpu_placement():
+    # 2 NUMA nodes, 2 cores per node, 2 hyper-threads per core, numbered like Linux does:
+    # the second hyper-threads of all the cores come after the first ones
+    topology = [CpuInfo(cpu=cpu, node=(cpu % 4) // 2, package=(cpu % 4) // 2, core=cpu % 2) for cpu in range(8)]
+    assert worker_cpus(3, None, topology) == [None] * 3
+    assert worker_cpus(4, "compact", topology) == [{0}, {4}, {1}, {5}]
+    assert worker_cpus(5, "spread", topology) == [{0}, {2}, {1}, {3}, {4}]
+    # More workers than CPUs: they share
+    assert worker_cpus(9, "compact", topology)[8] == {0}
+    assert worker_cpus(2, [[0, 1], [2]], topology) == [{0, 1}, {2}]
+    with pytest.raises(ValueError, match="CPU lists"):
+        worker_cpus(3, [[0, 1], [2]], topology)
+    with pytest.raises(ValueError, match="Unknown placement"):
+        worker_cpus(2, "random", topology)
+    assert placement_report([{2, 3}, None], topology).splitlines() == [
+        "worker 0: cpus [2, 3], nodes [1], (package, core) [(1, 0), (1, 1)]",
+        "worker 1: not pinned",
+    ]
+
+    cpu = min(os.sched_getaffinity(0))
+    entry_point = gym.spec("HopperBulletEnv-v0").entry_point
+    envs = SharedMemoryVectorEnv(entry_point, num_envs=2, placement=[[cpu], [cpu]])
+    assert [os.sched_getaffinity(process.pid) for process in envs.processes] == [{cpu}, {cpu}]
+    envs.reset(seed=0)
+    assert "worker 1: cpus" in envs.placement_report()
+    envs.close()
+    pool = SharedMemoryEnvPool(entry_point, num_envs=2, placement="spread")
+    assert all(len(os.sched_getaffinity(process.pid)) == 1 for process in pool.processes)
+    pool.close()
+
+
+def test_same_step_autoreset():
+    from gymnasium.vector import AutoresetMode, SyncVectorEnv
+    from gymnasium.wrappers import TimeLimit
+
+    entry_point = gym.spec("HopperBulletEnv-v0").entry_point
+    env_creator = load_env_creator(entry_point)
+    reference = SyncVectorEnv([lambda: TimeLimit(env_creator(), 10) for _ in range(3)], autoreset_mode=AutoresetMode.SAME_STEP)
+    backends = [
+        BulletVectorEnv(entry_point, num_envs=3, max_episode_steps=10, autoreset_mode=AutoresetMode.SAME_STEP),
+        ThreadedVectorEnv(entry_point, num_envs=3, max_episode_steps=10, autoreset_mode=AutoresetMode.SAME_STEP),
+        SharedMemoryVectorEnv(
+            entry_point, num_envs=3, envs_per_worker=2, max_episode_steps=10, autoreset_mode=AutoresetMode.SAME_STEP
+        ),
+    ]
+    expected_obs, _ = reference.reset(seed=0)
+    for envs in backends:
+        assert envs.metadata["autoreset_mode"] == AutoresetMode.SAME_STEP
+        assert np.array_equal(envs.reset(seed=0)[0], expected_obs)
+    rng = np.random.default_rng(0)
+    n_terminations = n_truncations = 0
+    for _ in range(60):
+        actions = rng.uniform(-1, 1, size=reference.action_space.shape).astype(np.float32)
+        *expected, expected_infos = reference.step(actions)
+        ended = expected[2] | expected[3]
+        n_terminations += expected[2].sum()
+        n_truncations += expected[3].sum()
+        for envs in backends:
+            *results, infos = envs.step(actions)
+            for result, expected_result in zip(results, expected):
+                assert np.array_equal(result, expected_result)
+            if ended.any():
+                assert np.array_equal(infos["_final_obs"], ended)
+                for i in np.flatnonzero(ended):
+                    assert np.array_equal(infos["final_obs"][i], expected_infos["final_obs"][i])
+            else:
+                assert "final_obs" not in infos
+    assert n_terminations > 0 and n_truncations > 0
+    for envs in [reference, *backends]:
+        envs.close()
+
+    # The environment resets itself on termination
+    env = env_creator()
+    env.autoreset = True
+    env.reset(seed=0)
+    terminated = False
+    while not terminated:
+        obs, _, terminated, _, info = env.step(env.action_space.sample())
+    assert info["final_obs"].shape == obs.shape
+    assert info["final_info"] == {}
+    assert env.frame == 0
+    env.close()
+    # Not under the gym.make() wrappers, whose state (e.g. the TimeLimit step counter) the reset would bypass
+    with pytest.raises(TypeError, match="autoreset"):
+        gym.make("HopperBulletEnv-v0", autoreset=True)
+
+
+def test_prefetch_resets():
+    entry_point = gym.spec("HopperBulletEnv-v0").entry_point
+    reference = BulletVectorEnv(entry_point, num_envs=3, max_episode_steps=20)
+    backends = [
+        SharedMemoryVectorEnv(entry_point, num_envs=3, envs_per_worker=2, max_episode_steps=20, prefetch_resets=True),
+        SharedMemoryEnvPool(entry_point, num_envs=3, envs_per_worker=2, max_episode_steps=20, prefetch_resets=True),
+    ]
+    expected_obs, _ = reference.reset(seed=0)
+    assert np.array_equal(backends[0].reset(seed=0)[0], expected_obs)
+    backends[1].async_reset(seed=0)
+    obs, *_, infos = backends[1].recv()
+    assert np.array_equal(obs[np.argsort(infos["env_id"])], expected_obs)
+    rng = np.random.default_rng(0)
+    n_resets = np.zeros(3, dtype=np.int64)
+    for _ in range(60):
+        actions = rng.uniform(-1, 1, size=reference.action_space.shape).astype(np.float32)
+        *expected, _ = reference.step(actions)
+        n_resets += expected[2] | expected[3]
+        for envs in backends:
+            if isinstance(envs, SharedMemoryEnvPool):
+                envs.send(actions)
+                *results, infos = envs.recv()
+                results = [result[np.argsort(infos["env_id"])] for result in results]
+            else:
+                *results, _ = envs.step(actions)
+            for result, expected_result in zip(results, expected):
+                assert np.array_equal(result, expected_result)
+    assert n_resets.sum() > 0
+    for envs in backends:
+        hits, misses = envs.reset_pool_counters()
+        # The last autoresets may not have happened yet
+        assert np.all(hits + misses <= n_resets) and hits.sum() > 0
+    for envs in [reference, *backends]:
+        envs.close()
+
+
+class _PrefetchFailingEnv(HopperBulletEnv):
+    # The first reset works, sampling the next initial state fails once and sets ``failed``
+    def __init__(self, failed, **kwargs):
+        super().__init__(**kwargs)
+        robot_specific_reset = self.robot.robot_specific_reset
+        n_calls = [0]
+
+        def failing_reset(bullet_client):
+            n_calls[0] += 1
+            if n_calls[0] == 2:
+                failed.set()
+                raise RuntimeError("Cannot sample an initial state")
+            robot_specific_reset(bullet_client)
+
+        self.robot.robot_specific_reset = failing_reset
+
+
+def test_prefetch_error():
+    ctx = multiprocessing.get_context("fork")
+    failed = ctx.Event()
+    envs = SharedMemoryVectorEnv(_PrefetchFailingEnv, num_envs=1, context="fork", prefetch_resets=True, failed=failed)
+    envs.reset(seed=0)
+    assert failed.wait(timeout=30)
+    # Reported once, the message of the call is not left in the pipe
+    with pytest.raises(RuntimeError, match="Cannot sample an initial state"):
+        envs.get_attr("reward_fields")
+    assert envs.get_attr("reward_fields") == (HopperBulletEnv.reward_fields,)
+    assert envs.step(np.zeros(envs.action_space.shape, dtype=np.float32))[0].shape == envs.observation_space.shape
+    envs.close()
+
+
+def test_rollout():
+    env_id = "HopperBulletEnv-v0"
+    env = gym.make(env_id)
+    obs_dim, act_dim = env.observation_space.shape[0], env.action_space.shape[0]
+    n_params = n_policy_params("mlp", obs_dim, act_dim, hidden_sizes=(8,))
+    assert n_params == 8 * obs_dim + 8 + act_dim * 8 + act_dim
+    population = np.random.default_rng(0).normal(scale=0.5, size=(4, n_params))
+
+    # The policy runs like in a step loop
+    result = rollout(env_id, population[0], "mlp", n_steps=50, seed=0, hidden_sizes=(8,), return_trajectories=True)
+    (trajectory,) = result.trajectories
+    obs, _ = env.reset(seed=0)
+    rewards = []
+    for t in range(result.lengths[0]):
+        assert np.array_equal(trajectory.observations[t], obs)
+        obs, reward, terminated, _, _ = env.step(trajectory.actions[t])
+        rewards.append(reward)
+    assert terminated or result.lengths[0] == 50
+    assert np.array_equal(trajectory.rewards, np.float32(rewards))
+    assert result.returns[0] == pytest.approx(sum(rewards))
+    env.close()
+
+    # Same results from the pool workers, a linear policy of zeros stands still
+    expected = [rollout(env_id, params, "mlp", n_steps=50, seed=1, hidden_sizes=(8,)) for params in population]
+    pool = RolloutPool(num_workers=2)
+    results = pool.map(env_id, population, "mlp", n_steps=50, seeds=1, hidden_sizes=(8,))
+    for result, expected_result in zip(results, expected):
+        assert np.array_equal(result.returns, expected_result.returns)
+        assert np.array_equal(result.lengths, expected_result.lengths) and result.trajectories is None
+    result = pool.submit(
+        env_id, np.zeros(n_policy_params("linear", obs_dim, act_dim)), n_steps=20, seed=0, n_episodes=2
+    ).result()
+    assert np.array_equal(result.lengths, [20, 20])
+    with pytest.raises(ValueError):
+        pool.map(env_id, population, "mlp", seeds=[0], hidden_sizes=(8,))
+    pool.close()
+    with pytest.raises(ValueError):
+        rollout(env_id, population[0], "linear")
+    with pytest.raises(ValueError):
+        rollout(env_id, population[0], "cnn")
+    with pytest.raises(ValueError, match="n_steps"):
+        rollout(env_id, population[0], "mlp", n_steps=0, hidden_sizes=(8,))
+
+
+def test_population_evaluator():
+    env_id = "HopperBulletEnv-v0"
+    noise_table = SharedNoiseTable(size=10_000, seed=0)
+    evaluator = PopulationEvaluator(env_id, noise_table, noise_std=0.5, n_steps=30, num_workers=2)
+    rng = np.random.default_rng(0)
+    params = rng.normal(scale=0.1, size=evaluator.n_params)
+    # antithetic pairs, and the unperturbed policy
+    offsets = np.repeat(noise_table.sample_offsets(rng, evaluator.n_params, 3), 2)
+    offsets = np.append(offsets, 0)
+    signs = np.array([1, -1, 1, -1, 1, -1, 0])
+    returns, lengths = evaluator.evaluate(params, offsets, signs, seeds=1)
+    for offset, sign, episode_return, length in zip(offsets, signs, returns, lengths):
+        perturbed = params + sign * 0.5 * noise_table.noise[offset : offset + evaluator.n_params]
+        expected = rollout(env_id, perturbed, n_steps=30, seed=1)
+        assert episode_return == expected.returns[0] and length == expected.lengths[0]
+    assert len(set(returns)) == len(returns)
+    with pytest.raises(ValueError):
+        evaluator.evaluate(params, [noise_table.size], [1])
+    with pytest.raises(ValueError):
+        evaluator.evaluate(params, [0, 1], [1])
+    with pytest.raises(ValueError, match="non-negative"):
+        evaluator.evaluate(params, [0, 1], [1, -1], seeds=[None, -1])
+    evaluator.close()
+    noise_table.close(unlink=True)